@@ -147,8 +147,8 @@ def save_and_load_config():
     # Save configuration to file
     config.save_config("my_custom_config.yaml")
     
-    # Load configuration from file (happens automatically)
-    new_config = PipelineConfig()
+    # Load configuration from the environment and config files
+    new_config = PipelineConfig.load()
     print(f"Loaded config: {new_config.output_base_dir}")
 
 def check_environment():
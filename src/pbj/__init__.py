@@ -15,7 +15,7 @@ All classes support consistent method naming:
 - `process()` - Main processing method
 - `process_file()` - Process single file (Butter, Jelly)
 - `process_folder()` - Process folder of files (Butter, Jelly)
-- `process_async()` - Async processing
+- `process_async()` - Async processing (awaitable on Butter)
 
 ## Quick Start:
 ```python
@@ -58,24 +58,62 @@ complete = pipeline.process("document.pdf")  # or pipeline.make()
 ```
 """
 
-from .peanut import Peanut
-from .butter import Butter
-from .jelly import Jelly
-from .sandwich import Sandwich
+from typing import TYPE_CHECKING
 
 __version__ = "1.0.0"
 __author__ = "Dylan Hubert"
 __email__ = "TBA"
 
+# STAGE MODULES PULL IN OPENAI, LLAMAPARSE AND FRIENDS, SO THEY ARE ONLY
+# IMPORTED WHEN ONE OF THEIR CLASSES IS FIRST ACCESSED (PEP 562)
+_LAZY_CLASSES = {
+    'Peanut': 'peanut',
+    'Butter': 'butter',
+    'Jelly': 'jelly',
+    'Sandwich': 'sandwich',
+}
+
 # Fun aliases for the themed experience
-Parse = Peanut
-Better = Butter
-JSON = Jelly
-Pipeline = Sandwich
+_ALIASES = {
+    'Parse': 'Peanut',
+    'Better': 'Butter',
+    'JSON': 'Jelly',
+    'Pipeline': 'Sandwich',
+}
+
+if TYPE_CHECKING:
+    from .peanut import Peanut
+    from .butter import Butter
+    from .jelly import Jelly
+    from .sandwich import Sandwich
+
+    Parse = Peanut
+    Better = Butter
+    JSON = Jelly
+    Pipeline = Sandwich
+
+
+def __getattr__(name):
+    class_name = _ALIASES.get(name, name)
+    if class_name not in _LAZY_CLASSES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    import importlib
+    module = importlib.import_module(f".{_LAZY_CLASSES[class_name]}", __name__)
+    cls = getattr(module, class_name)
+    
+    # CACHE ON THE PACKAGE SO LATER LOOKUPS SKIP __getattr__
+    globals()[name] = cls
+    return cls
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_CLASSES) + list(_ALIASES))
+
 
 __all__ = [
     # Main classes
     'Peanut', 'Butter', 'Jelly', 'Sandwich',
     # Fun aliases
     'Parse', 'Better', 'JSON', 'Pipeline'
-] 
\ No newline at end of file
+] 
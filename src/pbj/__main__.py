@@ -0,0 +1,11 @@
+"""
+🥪 PB&J Pipeline - Module Entry Point
+=====================================
+
+Allows the pipeline to be run with `python -m pbj document.pdf`.
+"""
+
+from .sandwich import main
+
+if __name__ == "__main__":
+    main()
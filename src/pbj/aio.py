@@ -0,0 +1,122 @@
+"""
+🔁 Loop Runner - Persistent Event Loop Helper
+=============================================
+
+Runs coroutines from synchronous entry points on one long-lived event loop so
+async OpenAI clients (and their connection pools) survive across calls instead
+of being stranded on a loop that `asyncio.run` has already closed, plus a
+requests-per-minute limiter and a concurrency cap for those clients that
+several stages can share even when they run on different threads and loops.
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Deque, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopRunner:
+    """Run coroutines to completion on a lazily created, reusable event loop"""
+    
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the persistent loop and return its result"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+    
+    def close(self):
+        """Shut down async generators and close the loop"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+        self._loop = None
+
+
+class RateLimiter:
+    """Space out calls so no more than requests_per_minute start in any minute"""
+    
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()  # CALLERS MAY BE ON DIFFERENT THREADS' LOOPS
+    
+    async def wait(self):
+        """Sleep until this caller's slot comes up"""
+        # RESERVE THE SLOT BEFORE SLEEPING SO CONCURRENT CALLERS QUEUE BEHIND IT
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ApiLimit:
+    """
+    Cap on in-flight OpenAI calls plus optional requests-per-minute spacing
+    
+    Unlike asyncio.Semaphore it is not tied to one event loop, so stages that
+    run at the same time on different threads can share a single budget.
+    """
+    
+    def __init__(self, concurrency: int, requests_per_minute: float = 0):
+        self._lock = threading.Lock()
+        self._available = max(1, concurrency)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = deque()
+        self._rate_limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+    
+    async def _acquire(self):
+        """Wait for a free slot (FIFO across every loop using this limit)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._available and not self._waiters:
+                self._available -= 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                    handed_over = False
+                except ValueError:
+                    handed_over = True  # release() ALREADY GAVE US THE SLOT
+            if handed_over:
+                self._release()
+            raise
+    
+    def _release(self):
+        """Hand the slot straight to the oldest waiter, or return it to the pool"""
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(_wake, waiter)
+                    return
+            self._available += 1
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a concurrency slot, and wait for the rate limit, around one call"""
+        await self._acquire()
+        try:
+            if self._rate_limiter:
+                await self._rate_limiter.wait()
+            yield
+        finally:
+            self._release()
+
+
+def _wake(waiter: "asyncio.Future[None]"):
+    """Resolve a waiter on its own loop (a cancelled one has already returned its slot)"""
+    if not waiter.done():
+        waiter.set_result(None)
@@ -9,19 +9,209 @@ improved column names, integrated footnotes, and standardized formatting using O
 
 import os
 import re
+import time
+import hashlib
 import asyncio
+import logging
 from pathlib import Path
+from functools import lru_cache
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
-from openai import OpenAI
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+# IMPORT CONFIGURATION
+from .config import PipelineConfig, load_env_file
+from .aio import ApiLimit, LoopRunner
+from .cache import ResponseCache, SemanticCache, content_hash, normalized_hash, is_up_to_date, record_source
+from . import jsonio
+from .jsonio import read_json, write_json
+from .tokens import context_limit, count_tokens
 
 # LOAD ENVIRONMENT VARIABLES FROM .ENV FILE
-load_dotenv()
+load_env_file()
+
+logger = logging.getLogger(__name__)
+
+# FEWEST DOCUMENTS WORTH SENDING THROUGH THE BATCH API
+BATCH_MIN_DOCUMENTS = 4
+
+# TABLE HEADER CELLS, USED TO DETECT IMPROVED COLUMN NAMES
+_TH_RE = re.compile(r'<th[^>]*>([^<]+)</th>')
+
+# WHOLE HTML TABLES, KEPT INTACT WHEN CHUNKING
+_TABLE_TAG_RE = re.compile(r'<table[^>]*>.*?</table>', re.DOTALL)
+
+# FIXED FRAMING AROUND THE MARKDOWN IN EVERY USER MESSAGE
+_PROMPT_PREFIX = "MARKDOWN CONTENT TO ENHANCE:\n"
+_PROMPT_SUFFIX = "\n\nENHANCED OUTPUT:"
+
+# PACKING SMALL DOCUMENTS: LARGEST SINGLE DOCUMENT AND LARGEST COMBINED INPUT,
+# AS FRACTIONS OF max_tokens
+GROUP_DOCUMENT_FRACTION = 0.4
+GROUP_TOKEN_FRACTION = 0.6
+
+# USER MESSAGE PREAMBLE FOR PACKED DOCUMENTS (FOLLOWED BY THE JSON PAYLOAD)
+_GROUP_PROMPT = (
+    "Enhance each document below independently, following the instructions above. "
+    "Respond with a JSON object of the form "
+    '{"documents": [{"id": "<id>", "enhanced": "<enhanced markdown>"}]} '
+    "containing every id exactly once.\n\nDOCUMENTS:\n"
+)
+
+# FILES ABOVE THIS SIZE ARE READ AND ENHANCED SECTION BY SECTION
+LARGE_FILE_BYTES = 1024 * 1024
+
+# UPPER BOUND ON THREADS USED FOR PARALLEL FILE READS/WRITES
+MAX_IO_WORKERS = 32
+
+# EMBEDDING MODEL FOR NEAR-DUPLICATE CACHE LOOKUPS
+CACHE_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# WHERE A FRESH ENHANCEMENT IS CACHED: (RESPONSE CACHE KEY, SEMANTIC DIGEST, EMBEDDING)
+_CacheKeys = Tuple[Optional[str], Optional[str], Optional[List[float]]]
+
+# ALREADY-ENHANCED DETECTION: MINIMUM SCORE TO SKIP, PLACEHOLDER COLUMN NAMES
+# THAT MEAN A TABLE STILL NEEDS WORK, AND THE HEADER BUTTER WRITES ON ITS OUTPUT
+ALREADY_ENHANCED_SCORE = 0.8
+_STUB_HEADER_RE = re.compile(r'\b(?:col(?:umn)?[\s_]*\d+|unnamed(?::\s*\d+)?)\b', re.IGNORECASE)
+_BUTTER_OUTPUT_MARKER = "**Enhancement Notes:**"
+
+# CONTENT-DEFINED BLOCKS: A BLOCK ENDS AFTER ANY PARAGRAPH WHOSE HASH HAS THESE
+# LOW BITS CLEAR (ABOUT ONE PARAGRAPH IN FOUR), SO BOUNDARIES DEPEND ONLY ON CONTENT
+BLOCK_BOUNDARY_MASK = 0x03
+
+# CHAT FORMAT TOKENS WRAPPED AROUND THE SYSTEM AND USER MESSAGES OF A REQUEST
+MESSAGE_FORMAT_TOKENS = 8
+
+# COMPLETION BUDGET: EXPECTED OUTPUT/INPUT TOKEN RATIO FOR AN ENHANCED PAGE, AND
+# HEADROOM KEPT FREE IN THE CONTEXT WINDOW
+OUTPUT_EXPANSION_RATIO = 1.4
+COMPLETION_SAFETY_TOKENS = 256
+
+
+@lru_cache(maxsize=None)
+def _read_prompt_file(prompt_path: str) -> str:
+    """Read a pantry prompt once per process (prompts do not change while running)"""
+    if not os.path.exists(prompt_path):
+        raise FileNotFoundError(f"Enhancement prompt file not found: {prompt_path}")
+    
+    # LOAD PROMPT FROM SIMPLE TEXT FILE
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+
+def _batch_custom_id(filename: str, chunk_index: int) -> str:
+    """Batch request id for one chunk of a file (readable in the OpenAI dashboard)"""
+    return f"{filename}#{chunk_index}"
+
+
+def _content_defined_blocks(text: str) -> List[str]:
+    """
+    Split markdown into groups of paragraphs at content-defined boundaries
+    
+    Because each boundary depends only on the paragraph before it, repeated
+    boilerplate (headers, footers, legends) lands in identical blocks on every
+    page, and an edit on one page never shifts the blocks of another.
+    """
+    blocks = []
+    current: List[str] = []
+    for paragraph in text.split('\n\n'):
+        current.append(paragraph)
+        if hashlib.blake2b(paragraph.encode('utf-8'), digest_size=8).digest()[0] & BLOCK_BOUNDARY_MASK == 0:
+            blocks.append('\n\n'.join(current))
+            current = []
+    if current:
+        blocks.append('\n\n'.join(current))
+    return blocks
+
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort (start, end) spans and merge overlapping ones"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _find_table_headers(text: str) -> List[str]:
+    """Extract <th> cell text, skipping the regex entirely when no '<th' literal is present"""
+    if '<th' not in text:
+        return []
+    return _TH_RE.findall(text)
+
+
+def _has_html_comment(text: str) -> bool:
+    """True if the text contains both HTML comment markers (such output is discarded)"""
+    return '<!--' in text and '-->' in text
+
+
+def _enhancement_score(text: str) -> float:
+    """
+    Cheap 0-1 estimate of how well structured a markdown document already is
+    
+    Butter's own output scores 1; placeholder column names score 0; otherwise
+    the score averages descriptive table headers and section headings.
+    """
+    if _BUTTER_OUTPUT_MARKER in text:
+        return 1.0
+    if _STUB_HEADER_RE.search(text):
+        return 0.0
+    
+    headers = _find_table_headers(text)
+    if headers:
+        descriptive = sum(1 for header in headers if sum(c.isalpha() for c in header) > 6)
+        header_score = descriptive / len(headers)
+    else:
+        header_score = 1.0
+    heading_score = 1.0 if text.startswith('## ') or '\n## ' in text else 0.0
+    return (header_score + heading_score) / 2
+
+
+def _list_markdown_files(folder: Path) -> List[Path]:
+    """Sorted *.md files in a folder, from one scandir pass (dentry type, no per-file stat)"""
+    with os.scandir(folder) as entries:
+        # SORT PLAIN STRINGS; COMPARING Path OBJECTS IS SLOWER
+        paths = sorted(entry.path for entry in entries if entry.name.endswith('.md') and entry.is_file())
+    return [Path(path) for path in paths]
 
-# IMPORT CONFIGURATION
-from .config import PipelineConfig
+
+def _prefetch_files(paths: List[Path]):
+    """Hint the kernel to read files into the page cache ahead of use (no-op where unsupported)"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue  # THE REAL READ WILL REPORT THE ERROR
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _write_text_atomic(path: Path, content: str):
+    """Write to a .part file and rename it into place so a crash never leaves a truncated file"""
+    part_path = path.with_name(path.name + ".part")
+    
+    # ENCODE ONCE AND HAND THE WHOLE BUFFER TO THE KERNEL (NO TEXT/BUFFERED IO LAYERS)
+    data = memoryview(content.encode('utf-8'))
+    fd = os.open(part_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
+    os.replace(part_path, path)
 
 @dataclass
 class EnhancedDocument:
@@ -40,7 +230,7 @@ class Butter:
     improved column names, integrated footnotes, and standardized formatting using OpenAI.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4", config: Optional[PipelineConfig] = None):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4", config: Optional[PipelineConfig] = None, http_client: Optional[httpx.Client] = None, api_limit: Optional[ApiLimit] = None):
         """
         Initialize the markdown enhancer
         
@@ -48,6 +238,9 @@ class Butter:
             api_key: OpenAI API key (if not provided, will try to get from env)
             model: OpenAI model to use for enhancement
             config: PipelineConfig object with settings including max_tokens
+            http_client: Optional shared httpx client for the synchronous client (Batch API calls);
+                real-time requests always use this instance's own async pool
+            api_limit: Optional OpenAI concurrency/rate budget shared with other stages
         """
         # GET API KEY FROM ENVIRONMENT OR PARAMETER
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -57,10 +250,59 @@ class Butter:
                 "or pass it directly to the constructor."
             )
         
-        # INITIALIZE OPENAI CLIENT
-        self.client = OpenAI(api_key=self.api_key)
+        # RETRY TRANSIENT FAILURES (429, 5XX, CONNECTION ERRORS) WITH THE SDK'S
+        # JITTERED EXPONENTIAL BACKOFF, AND BOUND EVERY ATTEMPT BY A TIMEOUT
+        max_retries = config.openai_max_retries if config else 5
+        timeout = config.openai_timeout if config else 60.0
+        
+        # SYNCHRONOUS CLIENT FOR BATCH API CALLS (OPTIONALLY ON A SHARED CONNECTION POOL)
+        self.client = OpenAI(api_key=self.api_key, http_client=http_client, max_retries=max_retries, timeout=timeout)
+        
+        # ASYNC CLIENT FOR CONCURRENT ENHANCEMENT REQUESTS, ON ITS OWN POOL SIZED
+        # WELL ABOVE THE CONCURRENCY LIMIT SO REQUESTS NEVER QUEUE FOR A CONNECTION
+        self._async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=128),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        self.aclient = AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=self._async_http_client,
+            max_retries=max_retries,
+            timeout=timeout
+        )
         self.model = model
         
+        # MAXIMUM NUMBER OF IN-FLIGHT OPENAI REQUESTS FOR FOLDER PROCESSING
+        self.concurrency = config.openai_concurrency if config else 16
+        
+        # ROUTE PIPELINE FOLDER RUNS THROUGH THE (HALF-PRICE, OFFLINE) BATCH API
+        self.use_batch_api = config.use_batch_api if config else False
+        
+        # PACK UP TO THIS MANY SMALL DOCUMENTS INTO ONE REQUEST (1 = NEVER PACK)
+        self.group_size = config.enhancement_group_size if config else 1
+        
+        # SPLIT PAGES AT CONTENT-DEFINED BOUNDARIES AND ENHANCE EACH DISTINCT BLOCK ONCE
+        self.block_dedupe = config.block_dedupe if config else False
+        self._block_results: Dict[str, Tuple[str, List[str]]] = {}
+        self._block_inflight: Dict[str, "asyncio.Future[Optional[EnhancedDocument]]"] = {}
+        
+        # PASS THROUGH DOCUMENTS THAT ALREADY LOOK ENHANCED
+        self.skip_already_enhanced = config.skip_already_enhanced if config else False
+        self.already_enhanced_skips = 0
+        
+        # REUSE SAVED PAGES WHOSE PARSED INPUT HAS NOT CHANGED SINCE THEY WERE ENHANCED
+        self.force_reprocess = config.force_reprocess if config else False
+        self.unchanged_page_skips = 0
+        
+        # ONE EVENT LOOP FOR THE LIFETIME OF THIS INSTANCE SO THE ASYNC CLIENT'S
+        # CONNECTION POOL IS NEVER STRANDED ON A CLOSED LOOP
+        self._runner = LoopRunner()
+        
+        # CAP ON IN-FLIGHT OPENAI CALLS (CHUNKS, PAGES AND GROUPS ALIKE) PLUS THE OPTIONAL
+        # REQUESTS-PER-MINUTE CAP; PASS api_limit TO SHARE ONE BUDGET WITH OTHER STAGES
+        requests_per_minute = config.openai_requests_per_minute if config else 0
+        self._api_limit = api_limit or ApiLimit(self.concurrency, requests_per_minute)
+        
         # SET MAX TOKENS FROM CONFIG WITH SAFETY CHECK
         if config and hasattr(config, 'max_tokens'):
             # SAFETY CHECK: PREVENT CONTEXT OVERFLOW
@@ -71,34 +313,60 @@ class Butter:
         # LOAD PROMPTS FROM CONFIG FILE
         self.prompts = self._load_prompts()
         
-        print(f"INITIALIZED MARKDOWN ENHANCER WITH MODEL: {model}, MAX_TOKENS: {self.max_tokens}")
+        # BUILD THE SYSTEM MESSAGE ONCE: A BYTE-IDENTICAL PREFIX ON EVERY REQUEST
+        # LETS OPENAI'S AUTOMATIC PROMPT CACHING REUSE IT ACROSS A FOLDER RUN
+        self._system_message = {
+            "role": "system",
+            "content": (
+                "You are an expert document enhancement specialist focusing on technical and medical documents.\n\n"
+                + self.prompts['enhancement_prompt']
+            )
+        }
+        
+        # MEASURE THE FIXED PART OF EVERY REQUEST ONCE: SYSTEM MESSAGE, USER FRAMING
+        # AND CHAT FORMATTING; ONLY THE MARKDOWN ITSELF IS COUNTED PER CHUNK
+        self._prompt_overhead = (
+            count_tokens(self._system_message["content"], model)
+            + count_tokens(_PROMPT_PREFIX + _PROMPT_SUFFIX, model)
+            + MESSAGE_FORMAT_TOKENS
+        )
+        self._context_limit = context_limit(model)
+        
+        # LARGEST REQUEST INPUT (OVERHEAD INCLUDED) WHOSE EXPECTED REPLY STILL FITS BOTH
+        # max_tokens AND WHAT THE CONTEXT WINDOW HAS LEFT, SO A FULL CHUNK IS NEVER CUT OFF
+        context_room = self._context_limit - self._prompt_overhead - 2 * COMPLETION_SAFETY_TOKENS
+        content_limit = min(
+            context_room / (1 + OUTPUT_EXPANSION_RATIO),
+            (self.max_tokens - COMPLETION_SAFETY_TOKENS) / OUTPUT_EXPANSION_RATIO
+        )
+        self._chunk_tokens = self._prompt_overhead + max(int(content_limit), 1)
+        
+        # OPTIONAL CACHES OF PAST ENHANCEMENTS, SCOPED TO THIS MODEL AND PROMPT
+        self._prompt_hash = content_hash(self._system_message["content"])
+        self.response_cache = None
+        if config and config.response_cache:
+            self.response_cache = ResponseCache(Path(config.cache_dir) / "butter_responses.sqlite3")
+        
+        self.cache = None
+        if config and config.enhancement_cache:
+            namespace = content_hash(f"{model}\n{self.prompts['enhancement_prompt']}")
+            self.cache = SemanticCache(
+                Path(config.cache_dir) / "butter_semantic.jsonl", namespace, threshold=config.semantic_cache_threshold
+            )
+        
+        logger.info("INITIALIZED MARKDOWN ENHANCER WITH MODEL: %s, MAX_TOKENS: %s", model, self.max_tokens)
     
     def _load_prompts(self):
         """Load prompts from pantry - much cleaner approach"""
         # GET PANTRY PATH RELATIVE TO THIS MODULE
         pantry_path = Path(__file__).parent / "pantry"
-        prompt_path = pantry_path / "butter.txt"
-        
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Enhancement prompt file not found: {prompt_path}")
-        
-        # LOAD PROMPT FROM SIMPLE TEXT FILE
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            enhancement_prompt = f.read().strip()
-        
         return {
-            'enhancement_prompt': enhancement_prompt
+            'enhancement_prompt': _read_prompt_file(str(pantry_path / "butter.txt"))
         }
     
     def _create_enhancement_prompt(self, markdown_content: str) -> str:
-        """Create the prompt for OpenAI to enhance the markdown structure only"""
-        
-        return f"""{self.prompts['enhancement_prompt']}
-
-MARKDOWN CONTENT TO ENHANCE:
-{markdown_content}
-
-ENHANCED OUTPUT:"""
+        """Create the per-document user message (instructions live in the system message)"""
+        return _PROMPT_PREFIX + markdown_content + _PROMPT_SUFFIX
 
     async def enhance_markdown_async(self, markdown_content: str, filename: str) -> Optional[EnhancedDocument]:
         """
@@ -111,136 +379,720 @@ ENHANCED OUTPUT:"""
         Returns:
             EnhancedDocument: Enhanced markdown with improvements
         """
-        print(f"ENHANCING MARKDOWN: {filename}")
+        logger.info("ENHANCING MARKDOWN: %s", filename)
+        
+        # SKIP THE ROUND-TRIP FOR CONTENT THAT IS ALREADY WELL STRUCTURED
+        skipped = self._already_enhanced_document(markdown_content, filename)
+        if skipped:
+            return skipped
         
-        # Check if content needs chunking
-        chunks = self._chunk_content(markdown_content, self.max_tokens)
+        # Check if content needs chunking (BLOCK DEDUPE ALSO SPLITS AT CONTENT-DEFINED
+        # BOUNDARIES SO REPEATED BOILERPLATE FORMS IDENTICAL, SHAREABLE BLOCKS)
+        if self.block_dedupe:
+            chunks = [
+                piece
+                for block in _content_defined_blocks(markdown_content)
+                for piece in self._chunk_content(block, self._chunk_tokens)
+            ]
+        else:
+            chunks = self._chunk_content(markdown_content, self._chunk_tokens)
         
         if len(chunks) == 1:
             # No chunking needed - process normally
-            return await self._enhance_single_chunk(chunks[0], filename)
+            return await self._enhance_chunk(chunks[0], filename)
         else:
-            # Chunking required - process each chunk and merge
-            print(f"🔄 PROCESSING {len(chunks)} CHUNKS FOR LARGE DOCUMENT")
-            enhanced_chunks = []
-            
-            for i, chunk in enumerate(chunks):
-                print(f"   📄 PROCESSING CHUNK {i+1}/{len(chunks)}")
-                enhanced_chunk = await self._enhance_single_chunk(chunk, f"{filename}_chunk_{i+1}")
-                if enhanced_chunk:
-                    enhanced_chunks.append(enhanced_chunk)
-            
-            if not enhanced_chunks:
-                print(f"❌ ALL CHUNKS FAILED TO ENHANCE")
-                return None
+            # Chunking required - enhance all chunks concurrently and merge in order
+            logger.info("🔄 PROCESSING %s CHUNKS FOR LARGE DOCUMENT", len(chunks))
+            results = await asyncio.gather(
+                *[self._enhance_chunk(chunk, f"{filename}_chunk_{i+1}") for i, chunk in enumerate(chunks)],
+                return_exceptions=True
+            )
             
-            # Merge enhanced chunks
-            merged_content = "\n\n---\n\n".join([chunk.enhanced_content for chunk in enhanced_chunks])
-            merged_notes = []
-            for chunk in enhanced_chunks:
-                merged_notes.extend(chunk.enhancement_notes)
+            enhanced_chunks = []
+            for i, result in enumerate(results):
+                if isinstance(result, BaseException):
+                    logger.error("❌ CHUNK %s/%s FAILED: %s", i+1, len(chunks), result)
+                elif result:
+                    enhanced_chunks.append(result)
             
-            # Create merged enhanced document
-            enhanced_doc = EnhancedDocument(
-                enhanced_content=merged_content,
-                original_content=markdown_content,
-                filename=filename,
-                enhancement_timestamp=datetime.now(),
-                enhancement_notes=merged_notes
+            # CONTENT-DEFINED BLOCKS ARE PARAGRAPH GROUPS, SO REJOIN THEM AS PARAGRAPHS
+            separator = "\n\n" if self.block_dedupe else "\n\n---\n\n"
+            return self._merge_enhanced_chunks(enhanced_chunks, markdown_content, filename, len(chunks), separator)
+    
+    def _already_enhanced_document(self, markdown_content: str, filename: str) -> Optional[EnhancedDocument]:
+        """Pass-through document for content that already looks enhanced (None if it needs enhancing)"""
+        if not self.skip_already_enhanced or _enhancement_score(markdown_content) < ALREADY_ENHANCED_SCORE:
+            return None
+        self.already_enhanced_skips += 1
+        logger.info("⏭️  ALREADY ENHANCED, SKIPPING OPENAI: %s", filename)
+        return EnhancedDocument(
+            enhanced_content=markdown_content,
+            original_content=markdown_content,
+            filename=filename,
+            enhancement_timestamp=datetime.now(),
+            enhancement_notes=["Already enhanced - skipped"]
+        )
+    
+    def _reused_block(self, chunk: str, name: str) -> Optional[EnhancedDocument]:
+        """Enhancement of an identical block finished earlier by this instance, if any"""
+        reused = self._block_results.get(content_hash(chunk))
+        if reused is None:
+            return None
+        enhanced_content, enhancement_notes = reused
+        logger.info("♻️  REUSING ENHANCED BLOCK: %s", name)
+        return EnhancedDocument(
+            enhanced_content=enhanced_content,
+            original_content=chunk,
+            filename=name,
+            enhancement_timestamp=datetime.now(),
+            enhancement_notes=list(enhancement_notes)
+        )
+    
+    async def _enhance_chunk(self, chunk: str, name: str) -> Optional[EnhancedDocument]:
+        """
+        Enhance one chunk; with block_dedupe on, identical chunks share a single
+        OpenAI call (in flight or finished) for the lifetime of this instance
+        """
+        if not self.block_dedupe:
+            return await self._enhance_single_chunk(chunk, name)
+        
+        reused = self._reused_block(chunk, name)
+        if reused:
+            return reused
+        
+        # JOIN AN IDENTICAL REQUEST THAT IS ALREADY IN FLIGHT, OR START ONE
+        digest = content_hash(chunk)
+        task = self._block_inflight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self._enhance_single_chunk(chunk, name))
+            self._block_inflight[digest] = task
+            task.add_done_callback(lambda _: self._block_inflight.pop(digest, None))
+        enhanced_doc = await task
+        if enhanced_doc is None:
+            return None
+        
+        self._block_results[digest] = (enhanced_doc.enhanced_content, enhanced_doc.enhancement_notes)
+        if enhanced_doc.filename != name:
+            return EnhancedDocument(
+                enhanced_content=enhanced_doc.enhanced_content,
+                original_content=chunk,
+                filename=name,
+                enhancement_timestamp=enhanced_doc.enhancement_timestamp,
+                enhancement_notes=list(enhanced_doc.enhancement_notes)
             )
-            
-            print(f"✅ ENHANCED: {len(merged_notes)} improvements across {len(chunks)} chunks")
-            return enhanced_doc
+        return enhanced_doc
+    
+    def _merge_enhanced_chunks(self, enhanced_chunks: List[EnhancedDocument], markdown_content: str, filename: str, chunk_count: int, separator: str = "\n\n---\n\n") -> Optional[EnhancedDocument]:
+        """Merge the enhanced chunks of one large document back into a single document"""
+        if not enhanced_chunks:
+            logger.error("❌ ALL CHUNKS FAILED TO ENHANCE")
+            return None
+        
+        # Merge enhanced chunks
+        merged_content = separator.join([chunk.enhanced_content for chunk in enhanced_chunks])
+        merged_notes = []
+        for chunk in enhanced_chunks:
+            merged_notes.extend(chunk.enhancement_notes)
+        
+        # Create merged enhanced document
+        enhanced_doc = EnhancedDocument(
+            enhanced_content=merged_content,
+            original_content=markdown_content,
+            filename=filename,
+            enhancement_timestamp=datetime.now(),
+            enhancement_notes=merged_notes
+        )
+        
+        logger.info("✅ ENHANCED: %s improvements across %s chunks", len(merged_notes), chunk_count)
+        return enhanced_doc
     
     async def _enhance_single_chunk(self, markdown_content: str, filename: str) -> Optional[EnhancedDocument]:
         """
         Enhance a single chunk of markdown content
         """
-        # CREATE ENHANCEMENT PROMPT
-        prompt = self._create_enhancement_prompt(markdown_content)
+        cached, cache_keys = await self._cached_enhancement(markdown_content, filename)
+        if cached:
+            return cached
+        return await self._request_enhancement(markdown_content, filename, cache_keys)
+    
+    async def _cached_enhancement(self, markdown_content: str, filename: str) -> Tuple[Optional[EnhancedDocument], _CacheKeys]:
+        """
+        Look content up in the response and semantic caches
+        
+        Returns:
+            The cached EnhancedDocument (or None on a miss) and the keys a fresh
+            result should be stored under with _store_enhancement
+        """
+        # TIER 1: EXACT (MODEL, PROMPT, CONTENT) MATCH FROM ANY EARLIER RUN
+        cached = response_key = None
+        if self.response_cache:
+            response_key = ResponseCache.make_key(self.model, self._prompt_hash, markdown_content)
+            cached = self.response_cache.get(response_key)
+        
+        # TIER 2: SAME TEXT UP TO WHITESPACE/CASE, THEN NEAR-IDENTICAL CONTENT
+        digest = embedding = None
+        if cached is None and self.cache:
+            digest = normalized_hash(markdown_content)
+            cached = self.cache.get_exact(digest)
+            if cached is None:
+                embedding = await self._embed(markdown_content)
+                cached = self.cache.get_similar(embedding) if embedding else None
         
+        if not cached:
+            return None, (response_key, digest, embedding)
+        
+        logger.info("🗄️  CACHE HIT: %s", filename)
+        return EnhancedDocument(
+            enhanced_content=cached["enhanced_content"],
+            original_content=markdown_content,
+            filename=filename,
+            enhancement_timestamp=datetime.now(),
+            enhancement_notes=list(cached["enhancement_notes"])
+        ), (response_key, digest, embedding)
+    
+    def _store_enhancement(self, cache_keys: _CacheKeys, enhanced_content: str, enhanced_doc: EnhancedDocument):
+        """Store a fresh enhancement under the keys _cached_enhancement returned"""
+        # ONLY CACHE RESPONSES THAT PASSED THE SAFETY CHECK, SO A RERUN RETRIES THE OTHERS
+        if _has_html_comment(enhanced_content):
+            return
+        
+        response_key, digest, embedding = cache_keys
+        if response_key:
+            self.response_cache.set(response_key, {
+                "enhanced_content": enhanced_doc.enhanced_content,
+                "enhancement_notes": enhanced_doc.enhancement_notes
+            })
+        if embedding:
+            self.cache.add(digest, embedding, enhanced_doc.enhanced_content, enhanced_doc.enhancement_notes)
+    
+    async def _request_enhancement(self, markdown_content: str, filename: str, cache_keys: _CacheKeys) -> Optional[EnhancedDocument]:
+        """Enhance one chunk with OpenAI (after a cache miss) and store the result"""
         try:
-            # CALL OPENAI TO ENHANCE THE MARKDOWN
-            print("SENDING TO OPENAI FOR ENHANCEMENT...")
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert document enhancement specialist focusing on technical and medical documents."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.0,  # ZERO TEMPERATURE FOR DETERMINISTIC OUTPUT
-                max_tokens=self.max_tokens   # USE MAX_TOKENS FROM CONFIG
-            )
-            
-            # EXTRACT ENHANCED CONTENT
-            enhanced_content = response.choices[0].message.content
-            if not enhanced_content:
-                raise ValueError("Empty response from OpenAI")
-            
-            # SAFETY CHECK: DETECT HTML COMMENTS AND FALLBACK TO ORIGINAL
-            if '<!--' in enhanced_content and '-->' in enhanced_content:
-                print(f"⚠️  WARNING: HTML comments detected in enhanced content for {filename}")
-                print(f"   Falling back to original markdown to preserve data integrity")
-                print(f"   HTML comment found: {enhanced_content[enhanced_content.find('<!--'):enhanced_content.find('<!--')+100]}...")
-                enhanced_content = markdown_content  # FALLBACK TO ORIGINAL
-            
-            # ANALYZE ENHANCEMENTS MADE
-            enhancement_notes = self._analyze_enhancements(markdown_content, enhanced_content)
-            
-            # CREATE ENHANCED DOCUMENT
-            enhanced_doc = EnhancedDocument(
-                enhanced_content=enhanced_content,
-                original_content=markdown_content,
-                filename=filename,
-                enhancement_timestamp=datetime.now(),
-                enhancement_notes=enhancement_notes
-            )
-            
-            print(f"✅ ENHANCED: {len(enhancement_notes)} improvements made")
-            for note in enhancement_notes[:3]:  # SHOW FIRST 3 IMPROVEMENTS
-                print(f"   - {note}")
-            
+            # CALL OPENAI TO ENHANCE THE MARKDOWN, STREAMING THE REPLY
+            logger.info("SENDING TO OPENAI FOR ENHANCEMENT...")
+            async with self._api_slot():
+                stream = await self.aclient.chat.completions.create(
+                    **self._create_completion_request(markdown_content),
+                    stream=True
+                )
+                
+                # COLLECT STREAMED PIECES AND JOIN ONCE AT THE END
+                parts = []
+                finish_reason = None
+                comment_open = comment_close = False
+                tail = ""  # LAST FEW CHARACTERS, SO MARKERS SPLIT ACROSS DELTAS ARE STILL SEEN
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not parts:
+                            logger.debug("   FIRST TOKENS RECEIVED FOR %s", filename)
+                        parts.append(delta)
+                        
+                        # THE SAFETY CHECK DISCARDS OUTPUT WITH HTML COMMENTS, SO STOP PAYING FOR IT EARLY
+                        window = tail + delta
+                        comment_open = comment_open or '<!--' in window
+                        comment_close = comment_close or '-->' in window
+                        if comment_open and comment_close:
+                            logger.debug("   HTML COMMENT STREAMED FOR %s, STOPPING EARLY", filename)
+                            await stream.close()
+                            break
+                        tail = window[-3:]
+            if finish_reason == "length":
+                # A CUT-OFF REPLY WOULD SILENTLY DROP THE END OF THE PAGE
+                raise RuntimeError(f"Enhancement reply hit max_tokens for {filename}")
+            enhanced_content = "".join(parts)
+            enhanced_doc = self._build_enhanced_document(markdown_content, enhanced_content, filename)
+            self._store_enhancement(cache_keys, enhanced_content, enhanced_doc)
             return enhanced_doc
             
         except Exception as e:
-            print(f"❌ ENHANCEMENT ERROR: {e}")
-            print(f"   Skipping chunk {filename} due to error")
+            logger.error("❌ ENHANCEMENT ERROR: %s", e)
+            logger.error("   Skipping chunk %s due to error", filename)
             return None  # Return None instead of raising to allow pipeline to continue
     
+    async def _embed(self, markdown_content: str) -> Optional[List[float]]:
+        """Embed content for the semantic cache (None if the call fails)"""
+        try:
+            async with self._api_slot():
+                response = await self.aclient.embeddings.create(model=CACHE_EMBEDDING_MODEL, input=markdown_content)
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning("⚠️  WARNING: Could not embed content for cache lookup: %s", e)
+            return None
+    
+    def _create_completion_request(self, markdown_content: str) -> Dict[str, Any]:
+        """Build the chat completion request body for one chunk (shared by real-time and batch calls)"""
+        return {
+            "model": self.model,
+            "messages": [
+                self._system_message,
+                {"role": "user", "content": self._create_enhancement_prompt(markdown_content)}
+            ],
+            "temperature": 0.0,  # ZERO TEMPERATURE FOR DETERMINISTIC OUTPUT
+            "max_tokens": self._completion_budget(markdown_content)
+        }
+    
+    def _completion_budget(self, markdown_content: str) -> int:
+        """
+        Size max_tokens for one request from its measured input
+        
+        Enough for the expected enhanced output, never more than the context
+        window has left, and never more than the configured max_tokens.
+        """
+        content_tokens = count_tokens(markdown_content, self.model)
+        context_room = self._context_limit - self._prompt_overhead - content_tokens - COMPLETION_SAFETY_TOKENS
+        expected_output = int(content_tokens * OUTPUT_EXPANSION_RATIO) + COMPLETION_SAFETY_TOKENS
+        return max(1, min(self.max_tokens, context_room, expected_output))
+    
+    def _build_enhanced_document(self, markdown_content: str, enhanced_content: Optional[str], filename: str) -> EnhancedDocument:
+        """Validate a model response and wrap it as an EnhancedDocument"""
+        if not enhanced_content:
+            raise ValueError("Empty response from OpenAI")
+        
+        # SAFETY CHECK: DETECT HTML COMMENTS AND FALLBACK TO ORIGINAL
+        if _has_html_comment(enhanced_content):
+            logger.warning("⚠️  WARNING: HTML comments detected in enhanced content for %s", filename)
+            logger.warning("   Falling back to original markdown to preserve data integrity")
+            if logger.isEnabledFor(logging.WARNING):
+                comment_start = enhanced_content.find('<!--')
+                logger.warning("   HTML comment found: %s...", enhanced_content[comment_start:comment_start+100])
+            enhanced_content = markdown_content  # FALLBACK TO ORIGINAL
+        
+        # ANALYZE ENHANCEMENTS MADE
+        enhancement_notes = self._analyze_enhancements(markdown_content, enhanced_content)
+        
+        # CREATE ENHANCED DOCUMENT
+        enhanced_doc = EnhancedDocument(
+            enhanced_content=enhanced_content,
+            original_content=markdown_content,
+            filename=filename,
+            enhancement_timestamp=datetime.now(),
+            enhancement_notes=enhancement_notes
+        )
+        
+        logger.info("✅ ENHANCED: %s improvements made", len(enhancement_notes))
+        if logger.isEnabledFor(logging.INFO):
+            for note in enhancement_notes[:3]:  # SHOW FIRST 3 IMPROVEMENTS
+                logger.info("   - %s", note)
+        
+        return enhanced_doc
+    
     def _analyze_enhancements(self, original: str, enhanced: str) -> List[str]:
         """Analyze what enhancements were made"""
-        notes = []
+        # UNCHANGED OUTPUT (E.G. THE HTML-COMMENT FALLBACK) CANNOT HAVE CHANGED HEADERS OR LINES
+        if enhanced is original or enhanced == original:
+            return ["General formatting and structure improvements"]
         
-        # CHECK FOR HEADER IMPROVEMENTS
-        original_headers = re.findall(r'<th[^>]*>([^<]+)</th>', original)
-        enhanced_headers = re.findall(r'<th[^>]*>([^<]+)</th>', enhanced)
+        notes = []
         
-        if len(enhanced_headers) > 0 and enhanced_headers != original_headers:
+        # CHECK FOR HEADER IMPROVEMENTS (ONLY SCAN THE ORIGINAL IF THE OUTPUT HAS HEADERS)
+        enhanced_headers = _find_table_headers(enhanced)
+        if enhanced_headers and enhanced_headers != _find_table_headers(original):
             notes.append("Improved table column names with descriptive labels")
-              # CHECK FOR STRUCTURE CLEANUP
-        enhanced_lines = len(enhanced.split('\n'))
-        original_lines = len(original.split('\n'))
-        if abs(enhanced_lines - original_lines) > 5:
+        
+        # CHECK FOR STRUCTURE CLEANUP (COUNT NEWLINES WITHOUT BUILDING LINE LISTS)
+        if abs(enhanced.count('\n') - original.count('\n')) > 5:
             notes.append("Restructured document for better organization")
         
         return notes or ["General formatting and structure improvements"]
     
+    async def _enhance_many(self, items: List[Tuple[str, str]], concurrency: Optional[int] = None, on_enhanced: Optional[Callable[[EnhancedDocument], None]] = None) -> List[Union[Optional[EnhancedDocument], BaseException]]:
+        """
+        Enhance several markdown documents concurrently
+        
+        Args:
+            items: List of (markdown_content, filename) pairs
+            concurrency: Maximum documents in flight (defaults to self.concurrency);
+                OpenAI calls themselves are always capped by the API limit
+            on_enhanced: Called with each document as soon as it is enhanced
+                (must be quick, e.g. hand the document to a writer thread)
+            
+        Returns:
+            List with one entry per item, in input order: the EnhancedDocument, None if
+            enhancement failed, or the exception raised while enhancing that item
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        results: List[Union[Optional[EnhancedDocument], BaseException]] = [None] * len(items)
+        
+        # EACH GROUP IS ONE OPENAI REQUEST: A SINGLE DOCUMENT OR SEVERAL PACKED SMALL ONES
+        singles = list(range(len(items)))
+        misses: List[int] = []
+        cache_keys: Dict[int, _CacheKeys] = {}
+        followers: Dict[int, List[int]] = {}
+        if self.group_size > 1:
+            # SKIPS, REUSED BLOCKS AND CACHE HITS ARE SETTLED FIRST, SO ONLY MISSES GET PACKED
+            prepared = await asyncio.gather(
+                *[self._prepare_for_packing(content, filename) for content, filename in items],
+                return_exceptions=True
+            )
+            singles = []
+            first_by_digest: Dict[str, int] = {}
+            for index, outcome in enumerate(prepared):
+                if isinstance(outcome, BaseException):
+                    results[index] = outcome
+                    continue
+                doc, keys = outcome
+                if doc is not None:
+                    results[index] = doc
+                    if on_enhanced:
+                        on_enhanced(doc)
+                elif keys is None:
+                    singles.append(index)
+                else:
+                    # WITH BLOCK DEDUPE, IDENTICAL DOCUMENTS SHARE ONE ENHANCEMENT
+                    digest = content_hash(items[index][0]) if self.block_dedupe else None
+                    if digest in first_by_digest:
+                        followers[first_by_digest[digest]].append(index)
+                        continue
+                    if digest:
+                        first_by_digest[digest] = index
+                    followers[index] = []
+                    misses.append(index)
+                    cache_keys[index] = keys
+        
+        groups = [([i], False) for i in singles] + [
+            ([misses[j] for j in group], True)
+            for group in self._pack_documents([items[i] for i in misses])
+        ]
+        
+        async def enhance_group(indexes: List[int], packed: bool) -> List[Optional[EnhancedDocument]]:
+            async with semaphore:
+                if not packed:
+                    enhanced = [await self.enhance_markdown_async(*items[indexes[0]])]
+                elif len(indexes) == 1:
+                    enhanced = [await self._request_enhancement(*items[indexes[0]], cache_keys[indexes[0]])]
+                else:
+                    enhanced = await self._enhance_group(
+                        [items[i] for i in indexes], [cache_keys[i] for i in indexes]
+                    )
+            if packed:
+                enhanced = [
+                    self._share_enhancement(index, doc, items, followers) for index, doc in zip(indexes, enhanced)
+                ]
+            if on_enhanced:
+                for docs in enhanced:
+                    for doc in (docs if packed else [docs]):
+                        if doc is not None:
+                            on_enhanced(doc)
+            return enhanced
+        
+        group_results = await asyncio.gather(
+            *[enhance_group(indexes, packed) for indexes, packed in groups],
+            return_exceptions=True
+        )
+        
+        # SCATTER GROUP RESULTS BACK INTO INPUT ORDER
+        for (indexes, packed), group_result in zip(groups, group_results):
+            for position, index in enumerate(indexes):
+                targets = [index] + followers.get(index, [])
+                if isinstance(group_result, BaseException):
+                    for target in targets:
+                        results[target] = group_result
+                elif packed:
+                    for target, doc in zip(targets, group_result[position]):
+                        results[target] = doc
+                else:
+                    results[index] = group_result[position]
+        return results
+    
+    async def _prepare_for_packing(self, content: str, filename: str) -> Tuple[Optional[EnhancedDocument], Optional[_CacheKeys]]:
+        """
+        Settle a document without an OpenAI request where possible
+        
+        Returns:
+            (document, None) if it was skipped, reused or found in a cache;
+            (None, cache keys) for a small miss that can be packed; or
+            (None, None) for a document that must go through enhance_markdown_async
+        """
+        skipped = self._already_enhanced_document(content, filename)
+        if skipped:
+            return skipped, None
+        
+        # DOCUMENTS THAT NEED CHUNKING (OR SPLIT INTO SEVERAL BLOCKS) ARE ENHANCED ON THEIR OWN
+        if count_tokens(content, self.model) > min(self._group_limits()):
+            return None, None
+        if self.block_dedupe:
+            if len(_content_defined_blocks(content)) > 1:
+                return None, None
+            reused = self._reused_block(content, filename)
+            if reused:
+                return reused, None
+        
+        return await self._cached_enhancement(content, filename)
+    
+    def _share_enhancement(self, index: int, enhanced_doc: Optional[EnhancedDocument], items: List[Tuple[str, str]], followers: Dict[int, List[int]]) -> List[Optional[EnhancedDocument]]:
+        """Record a packed document's enhancement as a reusable block and copy it to identical documents"""
+        docs = [enhanced_doc]
+        if enhanced_doc is None:
+            return docs + [None] * len(followers[index])
+        
+        if self.block_dedupe:
+            self._block_results[content_hash(enhanced_doc.original_content)] = (
+                enhanced_doc.enhanced_content, enhanced_doc.enhancement_notes
+            )
+        for follower in followers[index]:
+            docs.append(EnhancedDocument(
+                enhanced_content=enhanced_doc.enhanced_content,
+                original_content=items[follower][0],
+                filename=items[follower][1],
+                enhancement_timestamp=enhanced_doc.enhancement_timestamp,
+                enhancement_notes=list(enhanced_doc.enhancement_notes)
+            ))
+        return docs
+    
+    def _api_slot(self):
+        """Hold a concurrency slot, and wait for the rate limit, around one OpenAI call"""
+        return self._api_limit.slot()
+    
+    def _pack_documents(self, items: List[Tuple[str, str]]) -> List[List[int]]:
+        """
+        Greedily pack small documents into groups for _enhance_group
+        
+        Documents above GROUP_DOCUMENT_FRACTION of max_tokens stay on their own;
+        a group closes when it reaches group_size documents or its combined
+        input would exceed GROUP_TOKEN_FRACTION of max_tokens (the reply has to
+        fit in the same max_tokens), or the largest input a single chunk may use.
+        
+        Returns:
+            Lists of item indexes, one list per request
+        """
+        document_limit, group_limit = self._group_limits()
+        
+        groups = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, (content, _) in enumerate(items):
+            tokens = count_tokens(content, self.model)
+            if tokens > document_limit:
+                groups.append([i])
+                continue
+            if current and (len(current) >= self.group_size or current_tokens + tokens > group_limit):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+    
+    def _group_limits(self) -> Tuple[int, int]:
+        """Largest document that may be packed, and largest combined input of one group (tokens)"""
+        return (
+            int(self.max_tokens * GROUP_DOCUMENT_FRACTION),
+            min(int(self.max_tokens * GROUP_TOKEN_FRACTION), self._chunk_tokens - self._prompt_overhead)
+        )
+    
+    async def _enhance_group(self, group: List[Tuple[str, str]], cache_keys: List[_CacheKeys]) -> List[Optional[EnhancedDocument]]:
+        """
+        Enhance several small cache misses with a single JSON-mode request
+        
+        Requires a model that supports response_format json_object. Each reply
+        is stored under the document's cache_keys (from _cached_enhancement);
+        documents missing from the reply, or every document if the request
+        fails, are enhanced individually instead.
+        """
+        payload = jsonio.dumps({
+            "documents": [{"id": str(i), "markdown": content} for i, (content, _) in enumerate(group)]
+        })
+        
+        enhanced_by_id: Dict[str, Any] = {}
+        try:
+            logger.info("SENDING %s PACKED DOCUMENTS TO OPENAI FOR ENHANCEMENT...", len(group))
+            async with self._api_slot():
+                response = await self.aclient.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        self._system_message,
+                        {"role": "user", "content": _GROUP_PROMPT + payload}
+                    ],
+                    temperature=0.0,
+                    max_tokens=self._completion_budget(payload),
+                    response_format={"type": "json_object"}
+                )
+            if response.choices[0].finish_reason == "length":
+                raise RuntimeError("reply hit max_tokens")
+            reply = jsonio.loads(response.choices[0].message.content or "{}")
+            for document in reply.get("documents", []):
+                enhanced_by_id[str(document.get("id"))] = document.get("enhanced")
+        except Exception as e:
+            logger.warning("⚠️  PACKED ENHANCEMENT FAILED (%s), ENHANCING INDIVIDUALLY", e)
+        
+        results = []
+        for i, ((content, filename), keys) in enumerate(zip(group, cache_keys)):
+            enhanced_content = enhanced_by_id.get(str(i))
+            if isinstance(enhanced_content, str) and enhanced_content:
+                enhanced_doc = self._build_enhanced_document(content, enhanced_content, filename)
+                self._store_enhancement(keys, enhanced_content, enhanced_doc)
+                results.append(enhanced_doc)
+            else:
+                results.append(await self._request_enhancement(content, filename, keys))
+        return results
+    
+    def _enhance_batch(self, items: List[Tuple[str, str]], poll_interval: int = 30) -> List[Optional[EnhancedDocument]]:
+        """
+        Enhance several markdown documents through the OpenAI Batch API
+        
+        Every chunk becomes one line of a JSONL batch; the call blocks, polling
+        every poll_interval seconds, until the batch reaches a terminal state.
+        
+        Args:
+            items: List of (markdown_content, filename) pairs
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            List with one entry per item, in input order: the EnhancedDocument or
+            None if enhancement failed
+        """
+        # SPLIT EVERY DOCUMENT UP FRONT SO EACH BATCH LINE FITS THE TOKEN BUDGET
+        chunked = [self._chunk_content(content, self._chunk_tokens) for content, _ in items]
+        
+        lines = []
+        for (_, filename), chunks in zip(items, chunked):
+            for j, chunk in enumerate(chunks):
+                lines.append(jsonio.dumps({
+                    "custom_id": _batch_custom_id(filename, j),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._create_completion_request(chunk)
+                }))
+        
+        # UPLOAD THE REQUESTS AND SUBMIT THE BATCH
+        batch_input = self.client.files.create(
+            file=("butter_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("📦 SUBMITTED BATCH %s WITH %s REQUESTS", batch.id, len(lines))
+        
+        # POLL UNTIL THE BATCH FINISHES
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            logger.info("   BATCH %s: %s", batch.id, batch.status)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            self._delete_batch_files(batch_input.id)
+            raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+        
+        # MAP custom_id -> ENHANCED CONTENT (FAILED LINES ARE SIMPLY ABSENT)
+        outputs = {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = jsonio.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                choice = response["body"]["choices"][0]
+                if choice.get("finish_reason") == "length":
+                    continue  # CUT OFF AT max_tokens: TREAT LIKE A FAILED LINE
+                outputs[record["custom_id"]] = choice["message"]["content"]
+        
+        # THE DOCUMENTS ARE IN HAND: DON'T LEAVE COPIES IN OPENAI FILE STORAGE
+        self._delete_batch_files(batch_input.id, batch.output_file_id, batch.error_file_id)
+        
+        results = []
+        for i, ((content, filename), chunks) in enumerate(zip(items, chunked)):
+            enhanced_chunks = []
+            for j, chunk in enumerate(chunks):
+                chunk_name = filename if len(chunks) == 1 else f"{filename}_chunk_{j+1}"
+                try:
+                    enhanced_chunks.append(
+                        self._build_enhanced_document(chunk, outputs.get(_batch_custom_id(filename, j)), chunk_name)
+                    )
+                except Exception as e:
+                    logger.error("❌ ENHANCEMENT ERROR: %s", e)
+                    logger.error("   Skipping chunk %s due to error", chunk_name)
+            
+            if len(chunks) == 1:
+                results.append(enhanced_chunks[0] if enhanced_chunks else None)
+            else:
+                results.append(self._merge_enhanced_chunks(enhanced_chunks, content, filename, len(chunks)))
+        
+        return results
+    
+    def _delete_batch_files(self, *file_ids: Optional[str]):
+        """Delete uploaded batch input/output files, ignoring failures"""
+        for file_id in file_ids:
+            if not file_id:
+                continue
+            try:
+                self.client.files.delete(file_id)
+            except Exception as e:
+                logger.warning("⚠️  WARNING: Could not delete batch file %s: %s", file_id, e)
+    
+    def _enhance_documents(self, items: List[Tuple[str, str]], use_batch: bool = False, poll_interval: int = 30, on_enhanced: Optional[Callable[[EnhancedDocument], None]] = None) -> List[Union[Optional[EnhancedDocument], BaseException]]:
+        """Enhance documents via the Batch API when requested and worthwhile, otherwise in real time"""
+        # SMALL FOLDERS ARE NOT WORTH THE BATCH TURNAROUND
+        if use_batch and len(items) >= BATCH_MIN_DOCUMENTS:
+            try:
+                results = self._enhance_batch(items, poll_interval)
+            except Exception as e:
+                logger.error("❌ BATCH ENHANCEMENT FAILED: %s", e)
+                logger.warning("⚠️  Falling back to real-time enhancement")
+            else:
+                # BATCH RESULTS ARRIVE ALL AT ONCE
+                if on_enhanced:
+                    for doc in results:
+                        if doc is not None:
+                            on_enhanced(doc)
+                return results
+        
+        return self._runner.run(self._enhance_many(items, on_enhanced=on_enhanced))
+    
+    def clear_cache(self):
+        """Forget every cached enhancement response"""
+        if self.response_cache:
+            self.response_cache.clear()
+    
+    def _log_cache_stats(self):
+        """Log the response cache hit rate for the lookups made so far"""
+        if self.response_cache:
+            logger.info(
+                "🗄️  RESPONSE CACHE: %s hits, %s misses (%.0f%% hit rate)",
+                self.response_cache.hits, self.response_cache.misses, self.response_cache.hit_rate * 100
+            )
+    
+    def close(self):
+        """Close the async connection pool, the event loop it runs on, and the response cache"""
+        self._runner.run(self._async_http_client.aclose())
+        self._runner.close()
+        if self.response_cache:
+            self.response_cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self._async_http_client.aclose()
+    
     def process(self, markdown_content: str, filename: str = "document.md") -> Optional[EnhancedDocument]:
         """
         🧈 Process Markdown → Enhanced Markdown
         Main Butter processing method
         """
-        return asyncio.run(self.enhance_markdown_async(markdown_content, filename))
+        return self._runner.run(self.enhance_markdown_async(markdown_content, filename))
     
-    def process_async(self, markdown_content: str, filename: str = "document.md") -> Optional[EnhancedDocument]:
+    async def process_async(self, markdown_content: str, filename: str = "document.md") -> Optional[EnhancedDocument]:
         """
         🧈 Async Process Markdown → Enhanced Markdown
-        Async Butter processing method
+        Awaitable Butter processing method for callers already inside an event loop
+        (use either this or the sync methods on one instance: the async connection
+        pool belongs to whichever event loop uses it first)
         """
-        return asyncio.run(self.enhance_markdown_async(markdown_content, filename))
+        return await self.enhance_markdown_async(markdown_content, filename)
     
     def process_file(self, markdown_file_path: str) -> Optional[EnhancedDocument]:
         """
@@ -249,13 +1101,70 @@ ENHANCED OUTPUT:"""
         """
         file_path = Path(markdown_file_path)
         
+        # LARGE FILES: READ SECTION BY SECTION AND ENHANCE THE SECTIONS CONCURRENTLY
+        if file_path.stat().st_size > LARGE_FILE_BYTES:
+            return self._runner.run(self._enhance_large_file(file_path))
+        
         # READ THE MARKDOWN FILE
         with open(file_path, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
         
         return self.process(markdown_content, file_path.name)
     
-    def process_folder(self, folder_path: str, output_dir: Optional[str] = None) -> List[EnhancedDocument]:
+    async def process_file_async(self, markdown_file_path: str) -> Optional[EnhancedDocument]:
+        """
+        🧈 Async process markdown file → Enhanced markdown
+        Reads on a worker thread so the event loop keeps other requests moving
+        """
+        file_path = Path(markdown_file_path)
+        loop = asyncio.get_running_loop()
+        
+        if file_path.stat().st_size > LARGE_FILE_BYTES:
+            return await self._enhance_large_file(file_path)
+        
+        markdown_content = await loop.run_in_executor(None, file_path.read_text, 'utf-8')
+        return await self.enhance_markdown_async(markdown_content, file_path.name)
+    
+    async def _enhance_large_file(self, file_path: Path) -> Optional[EnhancedDocument]:
+        """Enhance a large markdown file as concurrently processed sections"""
+        loop = asyncio.get_running_loop()
+        sections = await loop.run_in_executor(None, lambda: list(self._split_markdown_file(file_path)))
+        logger.info("📏 LARGE FILE %s: ENHANCING %s SECTIONS CONCURRENTLY", file_path.name, len(sections))
+        
+        items = [(section, f"{file_path.name}_section_{i+1}") for i, section in enumerate(sections)]
+        results = await self._enhance_many(items)
+        
+        enhanced_sections = []
+        for (_, section_name), result in zip(items, results):
+            if isinstance(result, BaseException):
+                logger.error("❌ FAILED TO ENHANCE %s: %s", section_name, result)
+            elif result is not None:
+                enhanced_sections.append(result)
+        
+        return self._merge_enhanced_chunks(enhanced_sections, "".join(sections), file_path.name, len(sections))
+    
+    def _split_markdown_file(self, file_path: Path):
+        """
+        Yield sections of a markdown file, reading it line by line
+        
+        A section ends before each top-level '# ' heading, or once it reaches the
+        character budget of one request; oversized sections are still chunked
+        by enhance_markdown_async.
+        """
+        budget = max(self._chunk_tokens - self._prompt_overhead, 1) * 4  # ROUGHLY THE INVERSE OF _estimate_tokens
+        lines: List[str] = []
+        size = 0
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if lines and (line.startswith('# ') or size + len(line) > budget):
+                    yield "".join(lines)
+                    lines, size = [], 0
+                lines.append(line)
+                size += len(line)
+        if lines:
+            yield "".join(lines)
+    
+    def process_folder(self, folder_path: str, output_dir: Optional[str] = None, use_batch: bool = False, poll_interval: int = 30) -> List[EnhancedDocument]:
         """
         🧈 Process folder → Enhanced documents
         Folder-based Butter processing method
@@ -266,24 +1175,13 @@ ENHANCED OUTPUT:"""
             raise FileNotFoundError(f"Folder not found: {folder_path}")
         
         # FIND ALL MARKDOWN FILES
-        markdown_files = list(folder.glob("*.md"))
+        markdown_files = _list_markdown_files(folder)
         if not markdown_files:
             raise ValueError(f"No markdown files found in: {folder_path}")
         
-        print(f"FOUND {len(markdown_files)} MARKDOWN FILES TO ENHANCE")
+        logger.info("FOUND %s MARKDOWN FILES TO ENHANCE", len(markdown_files))
         
-        enhanced_docs = []
-        for md_file in markdown_files:
-            try:
-                enhanced_doc = self.process_file(str(md_file))
-                if enhanced_doc is not None:
-                    enhanced_docs.append(enhanced_doc)
-                    print(f"✅ ENHANCED: {md_file.name}")
-                else:
-                    print(f"⚠️  SKIPPED: {md_file.name} (enhancement failed)")
-            except Exception as e:
-                print(f"❌ FAILED TO ENHANCE {md_file.name}: {e}")
-                continue
+        enhanced_docs, _ = self._enhance_files(markdown_files, use_batch, poll_interval)
         
         # SAVE ENHANCED DOCUMENTS IF OUTPUT DIR SPECIFIED
         if output_dir:
@@ -291,10 +1189,21 @@ ENHANCED OUTPUT:"""
         
         return enhanced_docs
     
-    def _process_document_folder(self, document_folder_path: str) -> List[EnhancedDocument]:
+    def process_folder_batch(self, folder_path: str, output_dir: Optional[str] = None, poll_interval: int = 30) -> List[EnhancedDocument]:
+        """
+        🧈 Process folder → Enhanced documents via the OpenAI Batch API
+        Half the token cost of process_folder, but results can take up to 24h;
+        folders with fewer than 4 files are enhanced in real time instead
+        """
+        return self.process_folder(folder_path, output_dir, use_batch=True, poll_interval=poll_interval)
+    
+    def _process_document_folder(self, document_folder_path: str, on_saved: Optional[Callable[[Path, Optional[str]], None]] = None, parsed_pages: Optional[Dict[str, str]] = None) -> List[EnhancedDocument]:
         """
         🧈 INTERNAL: Process document folder → Enhanced documents
         Internal pipeline method - not intended for direct user calls
+        on_saved is called with each enhanced file's path and the text written to it once it
+        is on disk (text is None for pages reused from an earlier run)
+        parsed_pages is Peanut's markdown already in memory, by filename, so it is not re-read
         """
         doc_folder = Path(document_folder_path)
         
@@ -308,58 +1217,156 @@ ENHANCED OUTPUT:"""
             raise FileNotFoundError(f"Parsed markdown folder not found: {parsed_folder}")
         
         # FIND ALL MARKDOWN FILES IN PARSED FOLDER
-        markdown_files = list(parsed_folder.glob("*.md"))
+        markdown_files = _list_markdown_files(parsed_folder)
         if not markdown_files:
             raise ValueError(f"No markdown files found in: {parsed_folder}")
         
-        print(f"ENHANCING {len(markdown_files)} PARSED DOCUMENTS")
+        logger.info("ENHANCING %s PARSED DOCUMENTS", len(markdown_files))
         
         # CREATE ENHANCED FOLDER
         enhanced_folder = doc_folder / "02_enhanced_markdown"
         enhanced_folder.mkdir(exist_ok=True)
         
+        # PAGES ENHANCED FROM THIS EXACT INPUT ON AN EARLIER RUN ARE KEPT AS THEY ARE
+        if not self.force_reprocess:
+            up_to_date = self._run_io(lambda md_file: is_up_to_date(enhanced_folder / md_file.name, md_file), markdown_files)
+            unchanged = [md_file for md_file, current in zip(markdown_files, up_to_date) if current]
+            if unchanged:
+                self.unchanged_page_skips += len(unchanged)
+                logger.info("⏭️  UNCHANGED: %s of %s pages already enhanced from this input", len(unchanged), len(markdown_files))
+                markdown_files = [md_file for md_file, current in zip(markdown_files, up_to_date) if not current]
+                if on_saved:
+                    for md_file in unchanged:
+                        on_saved(enhanced_folder / md_file.name, None)
+        
+        # ONE WRITER THREAD SAVES EACH PAGE AS SOON AS IT IS ENHANCED, SO WRITES
+        # OVERLAP THE REMAINING OPENAI CALLS INSTEAD OF FOLLOWING THEM
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending_writes = []
+            
+            def write(doc: EnhancedDocument):
+                output_file, content = self._save_single_enhanced_document(doc, enhanced_folder, doc_folder.name)
+                record_source(output_file, parsed_folder / doc.filename)
+                if on_saved:
+                    on_saved(output_file, content)
+            
+            def save(doc: EnhancedDocument):
+                pending_writes.append(writer.submit(write, doc))
+            
+            enhanced_docs, skipped_pages = self._enhance_files(markdown_files, self.use_batch_api, on_enhanced=save, contents=parsed_pages)
+            
+            for write in pending_writes:
+                write.result()
+        logger.info("SAVED %s ENHANCED PAGES TO: %s", len(enhanced_docs), enhanced_folder)
+        
+        # UPDATE DOCUMENT METADATA
+        self._update_document_metadata(doc_folder, "enhancement", enhanced_docs, skipped_pages)
+        
+        logger.info("✅ ENHANCED AND SAVED %s DOCUMENTS TO: %s", len(enhanced_docs), enhanced_folder)
+        
+        return enhanced_docs
+
+    def _enhance_files(self, markdown_files: List[Path], use_batch: bool = False, poll_interval: int = 30, on_enhanced: Optional[Callable[[EnhancedDocument], None]] = None, contents: Optional[Dict[str, str]] = None) -> Tuple[List[EnhancedDocument], List[Dict[str, Any]]]:
+        """
+        Read and enhance a set of markdown files together (shared by the folder methods)
+        on_enhanced is called with each document as soon as it is enhanced
+        contents holds markdown already in memory, by filename, so those files are not re-read
+        
+        Returns:
+            The enhanced documents in file order, and a record for every file that
+            could not be read or enhanced
+        """
+        skips_before = self.already_enhanced_skips
+        
+        # READ EVERYTHING UP FRONT, THEN ENHANCE ALL FILES TOGETHER
+        readable_files, items = self._read_markdown_files(markdown_files, contents)
+        results = self._enhance_documents(items, use_batch, poll_interval, on_enhanced)
+        
         enhanced_docs = []
         skipped_pages = []
+        readable = set(readable_files)
         for md_file in markdown_files:
-            try:
-                enhanced_doc = self.process_file(str(md_file))
-                if enhanced_doc is None:
-                    # Page was skipped due to error
-                    skipped_pages.append({
-                        "filename": md_file.name,
-                        "error": "Enhancement failed - page skipped",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    print(f"⚠️  SKIPPED: {md_file.name} (enhancement failed)")
-                    continue
-                    
-                enhanced_docs.append(enhanced_doc)
-                
-                # SAVE EACH ENHANCED DOCUMENT IMMEDIATELY (PAGE-WISE SAVING)
-                self._save_single_enhanced_document(enhanced_doc, enhanced_folder, doc_folder.name)
-                
-                print(f"✅ ENHANCED AND SAVED: {md_file.name}")
-            except Exception as e:
-                print(f"❌ FAILED TO ENHANCE {md_file.name}: {e}")
+            if md_file not in readable:
                 skipped_pages.append({
                     "filename": md_file.name,
-                    "error": str(e),
+                    "error": "Could not read markdown file",
+                    "timestamp": datetime.now().isoformat()
+                })
+        
+        for md_file, result in zip(readable_files, results):
+            if isinstance(result, BaseException):
+                logger.error("❌ FAILED TO ENHANCE %s: %s", md_file.name, result)
+                skipped_pages.append({
+                    "filename": md_file.name,
+                    "error": str(result),
                     "timestamp": datetime.now().isoformat()
                 })
                 continue
+            
+            if result is None:
+                # Page was skipped due to error
+                skipped_pages.append({
+                    "filename": md_file.name,
+                    "error": "Enhancement failed - page skipped",
+                    "timestamp": datetime.now().isoformat()
+                })
+                logger.warning("⚠️  SKIPPED: %s (enhancement failed)", md_file.name)
+                continue
+            
+            enhanced_docs.append(result)
+            logger.info("✅ ENHANCED: %s", md_file.name)
         
-        # UPDATE DOCUMENT METADATA
-        self._update_document_metadata(doc_folder, "enhancement", enhanced_docs, skipped_pages)
+        self._log_cache_stats()
+        if self.skip_already_enhanced:
+            logger.info("⏭️  ALREADY ENHANCED: %s of %s files skipped", self.already_enhanced_skips - skips_before, len(markdown_files))
         
-        print(f"✅ ENHANCED AND SAVED {len(enhanced_docs)} DOCUMENTS TO: {enhanced_folder}")
+        return enhanced_docs, skipped_pages
+
+    def _read_markdown_files(self, markdown_files: List[Path], contents: Optional[Dict[str, str]] = None) -> Tuple[List[Path], List[Tuple[str, str]]]:
+        """
+        Read markdown files ahead of a concurrent enhancement run
+        contents holds markdown already in memory, by filename; those files are not read
         
-        return enhanced_docs
+        Returns:
+            The files that could be read, and matching (content, filename) pairs
+        """
+        contents = contents or {}
+        
+        def read(md_file: Path) -> Union[str, Exception]:
+            if md_file.name in contents:
+                return contents[md_file.name]
+            try:
+                with open(md_file, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except Exception as e:
+                return e
+        
+        # ASK THE KERNEL TO START READING EVERYTHING BEFORE THE THREADS ASK FOR IT
+        _prefetch_files([md_file for md_file in markdown_files if md_file.name not in contents])
+        
+        readable_files = []
+        items = []
+        for md_file, content in zip(markdown_files, self._run_io(read, markdown_files)):
+            if isinstance(content, Exception):
+                logger.error("❌ FAILED TO READ %s: %s", md_file.name, content)
+                continue
+            items.append((content, md_file.name))
+            readable_files.append(md_file)
+        return readable_files, items
+    
+    def _run_io(self, func, args: List[Any]) -> List[Any]:
+        """Run a blocking file operation over several arguments on a thread pool, preserving order"""
+        if not args:
+            return []
+        with ThreadPoolExecutor(max_workers=min(MAX_IO_WORKERS, len(args))) as executor:
+            return list(executor.map(func, args))
 
-    def _save_single_enhanced_document(self, enhanced_doc: EnhancedDocument, output_folder: Path, document_id: str):
-        """Save a single enhanced document immediately after processing"""
+    def _save_single_enhanced_document(self, enhanced_doc: EnhancedDocument, output_folder: Path, document_id: str) -> Tuple[Path, str]:
+        """Save a single enhanced document immediately after processing; returns the file and text written"""
         output_file = output_folder / enhanced_doc.filename
         
         # ADD ENHANCEMENT METADATA HEADER
+        notes_list = "\n".join(f"- {note}" for note in enhanced_doc.enhancement_notes)
         content_with_metadata = f"""# {Path(enhanced_doc.filename).stem.replace('_', ' ').title()} (Enhanced)
 
 *Enhanced on {enhanced_doc.enhancement_timestamp.strftime('%Y-%m-%d %H:%M:%S')}*
@@ -367,26 +1374,24 @@ ENHANCED OUTPUT:"""
 *Enhancements applied: {len(enhanced_doc.enhancement_notes)}*
 
 **Enhancement Notes:**
-{chr(10).join(f'- {note}' for note in enhanced_doc.enhancement_notes)}
+{notes_list}
 
 ---
 
 {enhanced_doc.enhanced_content}
 """
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(content_with_metadata)
+        _write_text_atomic(output_file, content_with_metadata)
         
-        print(f"SAVED ENHANCED PAGE: {output_file}")
+        logger.debug("SAVED ENHANCED PAGE: %s", output_file)
+        return output_file, content_with_metadata
 
     def _update_document_metadata(self, doc_folder: Path, stage: str, enhanced_docs: List[EnhancedDocument], skipped_pages: List[Dict[str, Any]]):
         """Update the document metadata with completed stage info"""
         metadata_file = doc_folder / "document_metadata.json"
         
         if metadata_file.exists():
-            import json
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = read_json(metadata_file)
             
             # ENSURE stages_completed FIELD EXISTS
             if "stages_completed" not in metadata:
@@ -408,43 +1413,44 @@ ENHANCED OUTPUT:"""
             }
             
             # SAVE UPDATED METADATA
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            write_json(metadata_file, metadata)
             
-            print(f"UPDATED DOCUMENT METADATA: {metadata_file}")
+            logger.info("UPDATED DOCUMENT METADATA: %s", metadata_file)
         else:
-            print(f"WARNING: No metadata file found at {metadata_file}")
+            logger.warning("WARNING: No metadata file found at %s", metadata_file)
     
     def _save_enhanced_documents(self, enhanced_docs: List[EnhancedDocument], output_dir: str, source_folder: str):
         """Save enhanced documents to directory"""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        saved_files = []
-        
-        for doc in enhanced_docs:
+        def save(doc: EnhancedDocument) -> str:
             # SAVE ENHANCED MARKDOWN
             output_file = output_path / doc.filename
             
             # ADD ENHANCEMENT METADATA HEADER
+            notes_list = "\n".join(f"- {note}" for note in doc.enhancement_notes)
             content_with_metadata = f"""# {Path(doc.filename).stem.replace('_', ' ').title()} (Enhanced)
 
 *Enhanced from {source_folder} on {doc.enhancement_timestamp.strftime('%Y-%m-%d %H:%M:%S')}*
 *Enhancements applied: {len(doc.enhancement_notes)}*
 
 **Enhancement Notes:**
-{chr(10).join(f'- {note}' for note in doc.enhancement_notes)}
+{notes_list}
 
 ---
 
 {doc.enhanced_content}
 """
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(content_with_metadata)
+            _write_text_atomic(output_file, content_with_metadata)
             
-            print(f"SAVED ENHANCED: {output_file}")
-            saved_files.append(str(output_file))
+            logger.debug("SAVED ENHANCED: %s", output_file)
+            return str(output_file)
+        
+        # WRITE ALL DOCUMENTS IN PARALLEL
+        saved_files = self._run_io(save, enhanced_docs)
+        logger.info("SAVED %s ENHANCED DOCUMENTS", len(saved_files))
         
         # CREATE ENHANCEMENT METADATA
         metadata_file = output_path / "enhancement_metadata.json"
@@ -458,55 +1464,54 @@ ENHANCED OUTPUT:"""
             }
         }
         
-        import json
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(enhancement_metadata, f, indent=2)
+        write_json(metadata_file, enhancement_metadata)
         
-        print(f"SAVED ENHANCEMENT METADATA: {metadata_file}")
-        print(f"ENHANCED DOCUMENTS STORED IN: {output_path}")
+        logger.info("SAVED ENHANCEMENT METADATA: %s", metadata_file)
+        logger.info("ENHANCED DOCUMENTS STORED IN: %s", output_path)
 
     def _estimate_tokens(self, text: str) -> int:
         """
-        Rough token estimation (4 chars ≈ 1 token)
-        Includes safety margin for prompt overhead
+        Token count of a request carrying this text (tiktoken if installed, else 4 chars ≈ 1 token)
+        Includes the measured prompt overhead
         """
-        # Rough estimation: 4 characters ≈ 1 token
-        base_tokens = len(text) // 4
-        
-        # Add safety margin for prompt overhead (system + user prompts)
-        prompt_overhead = 500  # Conservative estimate for prompt tokens
-        
-        return base_tokens + prompt_overhead
+        return count_tokens(text, self.model) + self._prompt_overhead
     
     def _detect_table_boundaries(self, content: str) -> List[tuple]:
         """
         Detect table boundaries to avoid splitting tables
-        Returns list of (start_pos, end_pos) for each table
+        Returns list of (start_pos, end_pos) character offsets for each table
         """
         table_boundaries = []
         
         # Look for HTML tables
-        import re
-        table_pattern = r'<table[^>]*>.*?</table>'
-        for match in re.finditer(table_pattern, content, re.DOTALL):
+        for match in _TABLE_TAG_RE.finditer(content):
             table_boundaries.append((match.start(), match.end()))
         
         # Look for markdown tables (lines with | characters)
-        lines = content.split('\n')
+        # ONE SCAN OVER THE STRING RECORDING CHARACTER OFFSETS, SAME UNITS AS THE HTML SPANS
         table_start = None
+        pos = 0
+        content_length = len(content)
         
-        for i, line in enumerate(lines):
-            if '|' in line and line.strip().startswith('|') or line.strip().endswith('|'):
+        while pos < content_length:
+            line_end = content.find('\n', pos)
+            if line_end == -1:
+                line_end = content_length
+            line = content[pos:line_end].strip()
+            
+            if line.startswith('|') or line.endswith('|'):
                 if table_start is None:
-                    table_start = i
+                    table_start = pos
             elif table_start is not None:
                 # End of table found
-                table_boundaries.append((table_start, i))
+                table_boundaries.append((table_start, pos))
                 table_start = None
+            
+            pos = line_end + 1
         
         # Handle table that ends at end of content
         if table_start is not None:
-            table_boundaries.append((table_start, len(lines)))
+            table_boundaries.append((table_start, content_length))
         
         return table_boundaries
     
@@ -515,84 +1520,101 @@ ENHANCED OUTPUT:"""
         Split content into chunks that fit within token limit
         NEVER splits tables - keeps them together
         """
-        if self._estimate_tokens(content) <= max_tokens:
+        # EVERY TOKEN COVERS AT LEAST ONE UTF-8 BYTE (AT MOST 4 PER CHARACTER), SO SHORT
+        # CONTENT PROVABLY FITS WITHOUT TOKENIZING IT AT ALL
+        if len(content) * 4 + self._prompt_overhead <= max_tokens:
+            return [content]
+        
+        content_tokens = self._estimate_tokens(content)
+        if content_tokens <= max_tokens:
             return [content]  # No chunking needed
         
-        print(f"📏 CONTENT TOO LARGE ({self._estimate_tokens(content)} tokens), CHUNKING REQUIRED")
+        logger.info("📏 CONTENT TOO LARGE (%s tokens), CHUNKING REQUIRED", content_tokens)
         
-        # Detect table boundaries
-        table_boundaries = self._detect_table_boundaries(content)
-        print(f"   📊 FOUND {len(table_boundaries)} TABLES TO PRESERVE")
+        # Detect table boundaries (NO TABLE MARKUP MEANS NOTHING TO SCAN FOR)
+        if '|' in content or '<table' in content:
+            table_boundaries = self._detect_table_boundaries(content)
+        else:
+            table_boundaries = []
+        logger.info("   📊 FOUND %s TABLES TO PRESERVE", len(table_boundaries))
         
         chunks = []
-        current_chunk = ""
+        # PIECES OF THE CURRENT CHUNK, JOINED ONCE WHEN THE CHUNK IS EMITTED (NO QUADRATIC +=)
+        current_pieces: List[str] = []
         current_tokens = 0
         
+        def emit(separator: str):
+            chunk = separator.join(current_pieces).strip()
+            if chunk:
+                chunks.append(chunk)
+                logger.info("   📄 CHUNK %s: %s tokens", len(chunks), current_tokens + self._prompt_overhead)
+        
+        # PIECES ARE COUNTED WITHOUT OVERHEAD; THE PROMPT OVERHEAD IS PAID ONCE PER CHUNK
+        max_tokens = max_tokens - self._prompt_overhead
+        
         # Split by paragraphs, respecting table boundaries
         paragraphs = content.split('\n\n')
         
         # Track character position for accurate table detection
         char_pos = 0
         
+        # MERGE TABLE SPANS INTO SORTED, DISJOINT INTERVALS SO ONE POINTER CAN SWEEP
+        # THEM ALONGSIDE THE (ALSO SORTED) PARAGRAPHS: O(PARAGRAPHS + TABLES)
+        table_spans = _merge_spans(table_boundaries)
+        span_index = 0
+        
         for paragraph in paragraphs:
-            paragraph_tokens = self._estimate_tokens(paragraph)
+            paragraph_tokens = count_tokens(paragraph, self.model)
             
-            # Check if this paragraph contains a table by checking if any table boundary overlaps
+            # Check if this paragraph overlaps any table
             paragraph_start = char_pos
             paragraph_end = char_pos + len(paragraph)
             
-            paragraph_has_table = any(
-                (start <= paragraph_start and end >= paragraph_start) or  # Table starts before paragraph
-                (start <= paragraph_end and end >= paragraph_end) or      # Table ends after paragraph  
-                (start >= paragraph_start and end <= paragraph_end)       # Table is completely within paragraph
-                for start, end in table_boundaries
-            )
+            while span_index < len(table_spans) and table_spans[span_index][1] < paragraph_start:
+                span_index += 1
+            paragraph_has_table = span_index < len(table_spans) and table_spans[span_index][0] <= paragraph_end
             
             # If adding this paragraph would exceed limit
             if current_tokens + paragraph_tokens > max_tokens:
                 # If current chunk is not empty, save it
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                    print(f"   📄 CHUNK {len(chunks)}: {self._estimate_tokens(current_chunk)} tokens")
+                emit("\n\n")
                 
                 # Start new chunk
-                current_chunk = paragraph
+                current_pieces = [paragraph]
                 current_tokens = paragraph_tokens
                 
                 # If single paragraph is too large, we have a problem
                 if paragraph_tokens > max_tokens:
-                    print(f"⚠️  WARNING: Single paragraph too large ({paragraph_tokens} tokens)")
+                    logger.warning("⚠️  WARNING: Single paragraph too large (%s tokens)", paragraph_tokens)
                     if paragraph_has_table:
-                        print(f"   🚨 CRITICAL: Large paragraph contains table - cannot split safely!")
-                        print(f"   This may cause token limit issues")
+                        logger.error("   🚨 CRITICAL: Large paragraph contains table - cannot split safely!")
+                        logger.error("   This may cause token limit issues")
                     # Split at sentence level as fallback
-                    sentences = paragraph.split('. ')
-                    current_chunk = ""
+                    current_pieces = []
                     current_tokens = 0
-                    for sentence in sentences:
-                        sentence_tokens = self._estimate_tokens(sentence)
+                    for sentence in paragraph.split('. '):
+                        sentence_tokens = count_tokens(sentence, self.model)
                         if current_tokens + sentence_tokens > max_tokens:
-                            if current_chunk.strip():
-                                chunks.append(current_chunk.strip())
-                            current_chunk = sentence
+                            emit(". ")
+                            current_pieces = [sentence]
                             current_tokens = sentence_tokens
                         else:
-                            current_chunk += ". " + sentence if current_chunk else sentence
+                            current_pieces.append(sentence)
                             current_tokens += sentence_tokens
+                    # THE SENTENCE TAIL BECOMES ITS OWN CHUNK PIECE FOR FOLLOWING PARAGRAPHS
+                    current_pieces = [". ".join(current_pieces)] if current_pieces else []
             else:
                 # Add to current chunk
-                current_chunk += "\n\n" + paragraph if current_chunk else paragraph
+                current_pieces.append(paragraph)
                 current_tokens += paragraph_tokens
             
             # Update character position for next iteration
             char_pos += len(paragraph) + 2  # +2 for the \n\n separator
         
         # Add final chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-            print(f"   📄 CHUNK {len(chunks)}: {self._estimate_tokens(current_chunk)} tokens")
+        emit("\n\n")
         
-        print(f"✅ SPLIT INTO {len(chunks)} CHUNKS")
+        logger.info("✅ SPLIT INTO %s CHUNKS", len(chunks))
         return chunks
 
 
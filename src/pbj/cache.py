@@ -0,0 +1,205 @@
+"""
+🗄️ Enhancement Cache - Skip OpenAI For Repeated Content
+=======================================================
+
+Two caches in front of the enhancement call:
+1. ResponseCache: exact (model, prompt, content) matches in SQLite, with expiry
+2. SemanticCache: normalized-text sha256 and embedding-similarity matches (near-duplicate pages)
+
+Both are scoped by model and prompt so changing either one never serves
+stale output. Stage outputs also get a .sha256 sidecar recording the input
+they were built from, so reruns can skip pages whose input has not changed.
+"""
+
+import math
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from . import jsonio
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """Stable sha256 hex digest of a string"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalized_hash(text: str) -> str:
+    """sha256 of text with whitespace collapsed and case folded, so trivially different copies match"""
+    return content_hash(" ".join(text.split()).lower())
+
+
+def file_hash(path: Union[str, Path]) -> str:
+    """sha256 hex digest of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _sidecar_path(output_path: Path) -> Path:
+    """Where the source hash for a stage output is kept"""
+    return output_path.with_name(output_path.name + ".sha256")
+
+
+def is_up_to_date(output_path: Union[str, Path], source_path: Union[str, Path]) -> bool:
+    """True if the output exists and was built from the source file's current content"""
+    output_path = Path(output_path)
+    try:
+        recorded = _sidecar_path(output_path).read_text(encoding="utf-8").strip()
+    except OSError:
+        return False  # NO SIDECAR: NEVER RECORDED, SO REBUILD
+    return output_path.exists() and recorded == file_hash(source_path)
+
+
+def record_source(output_path: Union[str, Path], source_path: Union[str, Path]):
+    """Record which source content an output was just built from"""
+    _sidecar_path(Path(output_path)).write_text(file_hash(source_path), encoding="utf-8")
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length so dot product equals cosine similarity"""
+    norm = math.sqrt(sum(v * v for v in vector))
+    if not norm:
+        return list(vector)
+    return [v / norm for v in vector]
+
+
+class SemanticCache:
+    """Exact + near-duplicate cache of enhanced markdown, persisted as JSONL"""
+
+    def __init__(self, path: Union[str, Path], namespace: str, threshold: float = 0.97):
+        """
+        Args:
+            path: JSONL file holding cached entries (created on first write)
+            namespace: Scope for entries, e.g. a hash of model + prompt
+            threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.path = Path(path)
+        self.namespace = namespace
+        self.threshold = threshold
+        self._by_hash: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[Dict[str, Any]] = []
+        self._load()
+
+    def _load(self):
+        """Load entries for this namespace from disk"""
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = jsonio.loads(line)
+                except ValueError:
+                    continue  # TOLERATE A TRUNCATED LAST LINE FROM AN INTERRUPTED RUN
+                if entry.get("namespace") == self.namespace:
+                    self._by_hash[entry["hash"]] = entry
+                    self._entries.append(entry)
+
+        logger.info("🗄️  LOADED %s CACHED ENHANCEMENTS FROM %s", len(self._entries), self.path)
+
+    def get_exact(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the entry stored for exactly this content hash"""
+        return self._by_hash.get(digest)
+
+    def get_similar(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """Return the most similar entry if it clears the threshold"""
+        query = _normalize(embedding)
+        best_entry = None
+        best_score = self.threshold
+        for entry in self._entries:
+            score = sum(a * b for a, b in zip(query, entry["embedding"]))
+            if score >= best_score:
+                best_entry, best_score = entry, score
+        return best_entry
+
+    def add(self, digest: str, embedding: List[float], enhanced_content: str, enhancement_notes: List[str]):
+        """Store an enhancement in memory and append it to the cache file"""
+        entry = {
+            "namespace": self.namespace,
+            "hash": digest,
+            "embedding": _normalize(embedding),
+            "enhanced_content": enhanced_content,
+            "enhancement_notes": enhancement_notes
+        }
+        self._by_hash[digest] = entry
+        self._entries.append(entry)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(jsonio.dumps(entry) + "\n")
+
+
+class ResponseCache:
+    """Exact-match cache of enhancement results in SQLite, with expiry"""
+
+    def __init__(self, path: Union[str, Path], ttl_seconds: int = 30 * 24 * 3600):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            ttl_seconds: How long an entry stays valid
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # ONE CONNECTION IS SHARED BY EVERY THREAD (CONVERSION, BATCH WORKERS), SO SERIALIZE ITS USE
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Combine key parts (e.g. model, prompt hash, content) into a compact digest"""
+        return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored value, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return jsonio.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a value for ttl_seconds"""
+        row = (key, jsonio.dumps(value), time.time() + self.ttl_seconds)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)", row
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+        logger.info("🗄️  CLEARED RESPONSE CACHE: %s", self.path)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache so far"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
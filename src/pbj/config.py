@@ -13,13 +13,178 @@ SUPPORTS MULTIPLE PROJECTS WITH DIFFERENT SETTINGS
 """
 
 import os
-import json
-import yaml
+import sys
+import logging
 from pathlib import Path
-from typing import Optional, Dict, Any, Union
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple, Union
 from dataclasses import dataclass, field
 
-@dataclass
+from .jsonio import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+# ENVIRONMENT VALUES THAT TURN A FLAG ON
+_TRUTHY = frozenset(("true", "1", "yes"))
+
+# ENVIRONMENT VARIABLE -> (FIELD, KIND), IN PRIORITY ORDER
+# KIND: "key" FILLS AN UNSET FIELD, "value" OVERRIDES IT, "flag" TURNS A BOOL ON
+_ENV_FIELDS = (
+    ("LLAMAPARSE_API_KEY", "llamaparse_api_key", "key"),
+    ("LLAMA_CLOUD_API_KEY", "llamaparse_api_key", "key"),
+    ("OPENAI_API_KEY", "openai_api_key", "key"),
+    ("PBJ_OUTPUT_DIR", "output_base_dir", "value"),
+    ("PBJ_PREMIUM_MODE", "use_premium_mode", "flag"),
+    ("PBJ_VERBOSE", "enable_verbose_logging", "flag"),
+)
+
+# ENVIRONMENT VARIABLES READ BY _load_from_environment
+ENV_VARIABLES = frozenset(name for name, _, _ in _ENV_FIELDS)
+
+# CONFIG FILE KEYS (SAME NAME AS THE FIELD) AND WHEN EACH ONE IS APPLIED:
+# "unset" ONLY FILLS AN EMPTY FIELD, "truthy" IGNORES EMPTY VALUES, "present" ALWAYS APPLIES
+_CONFIG_FIELDS = (
+    # API KEYS
+    ("llamaparse_api_key", "unset"),
+    ("openai_api_key", "unset"),
+    # OUTPUT SETTINGS
+    ("output_base_dir", "truthy"),
+    ("create_timestamped_folders", "present"),
+    ("preserve_original_structure", "present"),
+    # LLAMAPARSE SETTINGS
+    ("use_premium_mode", "present"),
+    ("page_separator", "present"),
+    ("max_timeout", "present"),
+    ("max_concurrent_parses", "present"),
+    ("llamaparse_max_retries", "present"),
+    ("llamaparse_retry_base_delay", "present"),
+    ("llamaparse_retry_max_delay", "present"),
+    ("parse_cache", "present"),
+    ("max_pdf_bytes", "present"),
+    ("hardlink_source_pdf", "present"),
+    # OPENAI SETTINGS
+    ("openai_model", "present"),
+    ("max_tokens", "present"),
+    ("openai_concurrency", "present"),
+    ("openai_max_retries", "present"),
+    ("openai_timeout", "present"),
+    ("openai_requests_per_minute", "present"),
+    ("use_batch_api", "present"),
+    ("enhancement_group_size", "present"),
+    ("cleaning_group_size", "present"),
+    ("skip_already_enhanced", "present"),
+    ("force_reprocess", "present"),
+    ("block_dedupe", "present"),
+    ("response_cache", "present"),
+    ("enhancement_cache", "present"),
+    ("semantic_cache_threshold", "present"),
+    ("cache_dir", "truthy"),
+    # PROCESSING SETTINGS
+    ("enable_verbose_logging", "present"),
+    ("save_intermediate_files", "present"),
+)
+
+_MISSING = object()
+
+# CONFIG FILES LOOKED FOR IN THE WORKING DIRECTORY, IN PRIORITY ORDER
+CONFIG_FILES = (
+    "config.yaml",
+    "config.yml",
+    "config.json",
+    "pbj_config.yaml",
+    "pbj_config.json"
+)
+
+def load_env_file(env_file: Union[str, Path] = ".env") -> List[str]:
+    """
+    Load KEY=VALUE lines from a .env file into os.environ
+    
+    Variables that are already set are left alone. Blank lines, # comments and
+    an optional leading 'export ' are skipped; values may be single- or
+    double-quoted, and unquoted values end at ' #'.
+    
+    Returns:
+        Names of the variables this call added (empty if the file is missing)
+    """
+    try:
+        with open(env_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []
+    
+    added = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        if line.startswith('export '):
+            line = line[7:]
+        
+        key, value = line.split('=', 1)
+        key, value = key.strip(), value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+            value = value[1:-1]
+        elif ' #' in value:
+            value = value.split(' #', 1)[0].rstrip()
+        
+        if key and key not in os.environ:
+            os.environ[key] = value
+            added.append(key)
+    return added
+
+@lru_cache(maxsize=1)
+def _yaml():
+    """Import PyYAML on first use (env-only and JSON setups never pay for it)"""
+    import yaml
+    try:
+        # LIBYAML: SAME DOCUMENTS, PARSED AND EMITTED IN C
+        from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeLoader, SafeDumper
+    return yaml, SafeLoader, SafeDumper
+
+def _load_yaml(path: str) -> Any:
+    """Parse a YAML file (syntax errors are raised as ValueError, like JSON's)"""
+    yaml, loader, _ = _yaml()
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            return yaml.load(f, Loader=loader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}") from e
+
+def _save_yaml(path: Union[str, Path], config_data: Dict[str, Any]):
+    """Write a dict as block-style YAML"""
+    yaml, _, dumper = _yaml()
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(config_data, f, Dumper=dumper, default_flow_style=False, indent=2)
+
+# CONFIG FILE READERS AND WRITERS BY LOWERCASE SUFFIX
+_LOADERS = {'.yaml': _load_yaml, '.yml': _load_yaml, '.json': read_json}
+_SAVERS = {'.yaml': _save_yaml, '.yml': _save_yaml, '.json': write_json}
+
+# PARSED CONFIG FILES BY ABSOLUTE PATH: (MTIME_NS, SIZE, DATA)
+_CONFIG_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+
+def _read_config_file(config_path: Path) -> Any:
+    """Parse a YAML or JSON config file, reusing the last parse while the file is unchanged"""
+    key = os.path.abspath(config_path)
+    stat = os.stat(key)
+    cached = _CONFIG_CACHE.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    # UNKNOWN SUFFIXES (E.G. AN EXPLICIT PBJ_CONFIG_FILE) ARE READ AS JSON
+    loader = _LOADERS.get(config_path.suffix.lower(), read_json)
+    config_data = loader(key)
+    
+    _CONFIG_CACHE[key] = (stat.st_mtime_ns, stat.st_size, config_data)
+    return config_data
+
+# SLOTTED INSTANCES (NO PER-INSTANCE __dict__) WHERE THE PYTHON VERSION SUPPORTS IT
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class PipelineConfig:
     """Configuration for the PB&J Pipeline"""
     
@@ -36,20 +201,58 @@ class PipelineConfig:
     use_premium_mode: bool = False
     page_separator: str = "\n---\n"
     max_timeout: int = 180
+    max_concurrent_parses: int = 8
+    llamaparse_max_retries: int = 3
+    llamaparse_retry_base_delay: float = 2.0
+    llamaparse_retry_max_delay: float = 60.0
+    parse_cache: bool = False
+    max_pdf_bytes: int = 512 * 1024 * 1024
+    hardlink_source_pdf: bool = False
     
     # OPENAI SETTINGS
     openai_model: str = "gpt-4"
     max_tokens: int = 8000
+    openai_concurrency: int = 16
+    openai_max_retries: int = 5
+    openai_timeout: float = 60.0
+    openai_requests_per_minute: float = 0
+    use_batch_api: bool = False
+    enhancement_group_size: int = 1
+    cleaning_group_size: int = 1
+    skip_already_enhanced: bool = False
+    force_reprocess: bool = False
+    block_dedupe: bool = False
+    response_cache: bool = False
+    enhancement_cache: bool = False
+    semantic_cache_threshold: float = 0.97
+    cache_dir: str = ".pbj_cache"
     
     # PROCESSING SETTINGS
     enable_verbose_logging: bool = True
     save_intermediate_files: bool = True
     
-    def __post_init__(self):
-        """Load configuration from various sources after initialization"""
-        self._load_configuration()
+    # OUTPUT BASE DIRECTORY AS A PATH, KEYED BY THE STRING IT WAS BUILT FROM
+    _output_base_cache: Optional[Tuple[str, Path]] = field(default=None, init=False, repr=False, compare=False)
     
-    def _load_configuration(self):
+    @classmethod
+    def load(cls, **overrides) -> "PipelineConfig":
+        """
+        Build a configuration from the environment, config files and .env
+        
+        Constructing PipelineConfig() directly does no I/O and keeps the defaults;
+        this reads every source once, applies the overrides on top, then validates.
+        
+        Args:
+            **overrides: Field values that take precedence over every source
+            
+        Returns:
+            PipelineConfig: Loaded and validated configuration
+        """
+        config = cls()
+        config._load_configuration(overrides)
+        return config
+    
+    def _load_configuration(self, overrides: Optional[Dict[str, Any]] = None):
         """Load configuration from multiple sources in priority order"""
         
         # 1. ENVIRONMENT VARIABLES (HIGHEST PRIORITY)
@@ -61,121 +264,85 @@ class PipelineConfig:
         # 3. .ENV FILE (FALLBACK)
         self._load_from_env_file()
         
-        # 4. VALIDATE REQUIRED SETTINGS
+        # 4. EXPLICIT OVERRIDES FROM THE CALLER
+        for key, value in (overrides or {}).items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+        
+        # 5. VALIDATE REQUIRED SETTINGS
         self._validate_configuration()
     
     def _load_from_environment(self):
         """Load configuration from environment variables"""
-        # API KEYS
-        if not self.llamaparse_api_key:
-            self.llamaparse_api_key = os.getenv("LLAMAPARSE_API_KEY") or os.getenv("LLAMA_CLOUD_API_KEY")
-        
-        if not self.openai_api_key:
-            self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        
-        # OUTPUT SETTINGS
-        env_output_dir = os.getenv("PBJ_OUTPUT_DIR")
-        if env_output_dir:
-            self.output_base_dir = env_output_dir
-        
-        # PROCESSING SETTINGS
-        if os.getenv("PBJ_PREMIUM_MODE", "").lower() in ("true", "1", "yes"):
-            self.use_premium_mode = True
-        
-        if os.getenv("PBJ_VERBOSE", "").lower() in ("true", "1", "yes"):
-            self.enable_verbose_logging = True
+        environ = os.environ
+        for name, field_name, kind in _ENV_FIELDS:
+            value = environ.get(name)
+            if not value:
+                continue
+            if kind == "key":
+                if not getattr(self, field_name):
+                    setattr(self, field_name, value)
+            elif kind == "value":
+                setattr(self, field_name, value)
+            elif value.lower() in _TRUTHY:
+                setattr(self, field_name, True)
     
     def _load_from_config_files(self):
-        """Load configuration from config.yaml or config.json files"""
-        config_files = [
-            "config.yaml",
-            "config.yml", 
-            "config.json",
-            "pbj_config.yaml",
-            "pbj_config.json"
-        ]
+        """Load configuration from config.yaml or config.json files (or the file named by PBJ_CONFIG_FILE)"""
+        # AN EXPLICIT CONFIG FILE SKIPS DISCOVERY ENTIRELY
+        explicit_file = os.environ.get("PBJ_CONFIG_FILE")
+        if explicit_file:
+            self._load_config_file(Path(explicit_file))
+            return
         
-        for config_file in config_files:
-            config_path = Path(config_file)
-            if config_path.exists():
-                try:
-                    if config_path.suffix.lower() in ('.yaml', '.yml'):
-                        with open(config_path, 'r', encoding='utf-8') as f:
-                            config_data = yaml.safe_load(f)
-                    elif config_path.suffix.lower() == '.json':
-                        with open(config_path, 'r', encoding='utf-8') as f:
-                            config_data = json.load(f)
-                    else:
-                        continue
-                    
-                    # APPLY CONFIGURATION DATA
-                    self._apply_config_data(config_data)
-                    print(f"📋 LOADED CONFIGURATION FROM: {config_path}")
-                    break
-                    
-                except Exception as e:
-                    print(f"⚠️  WARNING: Could not load config from {config_path}: {e}")
+        # ONE DIRECTORY LISTING INSTEAD OF A STAT PER CANDIDATE FILE
+        with os.scandir('.') as entries:
+            present = {entry.name for entry in entries if entry.is_file()}
+        
+        for config_file in CONFIG_FILES:
+            if config_file in present and self._load_config_file(Path(config_file)):
+                break
+    
+    def _load_config_file(self, config_path: Path) -> bool:
+        """Apply one config file; returns False (after warning) if it could not be loaded"""
+        try:
+            config_data = _read_config_file(config_path)
+            
+            # APPLY CONFIGURATION DATA
+            self._apply_config_data(config_data)
+            logger.info("📋 LOADED CONFIGURATION FROM: %s", config_path)
+            return True
+            
+        except (OSError, ValueError) as e:  # UNREADABLE FILE OR INVALID YAML/JSON
+            logger.warning("⚠️  WARNING: Could not load config from %s: %s", config_path, e)
+            return False
     
     def _load_from_env_file(self):
         """Load configuration from .env file as fallback"""
         env_file = Path(".env")
         if env_file.exists():
             try:
-                from dotenv import load_dotenv
-                load_dotenv(env_file)
+                load_env_file(env_file)
                 
-                # RELOAD ENVIRONMENT VARIABLES AFTER .ENV
+                # RELOAD ENVIRONMENT VARIABLES AFTER .ENV, ALWAYS: THIS ALSO PUTS SHELL
+                # VARIABLES BACK ABOVE CONFIG FILE VALUES (A DOZEN LOOKUPS, SO NEVER WORTH SKIPPING)
                 self._load_from_environment()
-                print("📋 LOADED CONFIGURATION FROM: .env")
+                logger.info("📋 LOADED CONFIGURATION FROM: .env")
                 
-            except Exception as e:
-                print(f"⚠️  WARNING: Could not load .env file: {e}")
+            except (OSError, ValueError) as e:  # UNREADABLE OR NOT UTF-8
+                logger.warning("⚠️  WARNING: Could not load .env file: %s", e)
     
     def _apply_config_data(self, config_data: Dict[str, Any]):
         """Apply configuration data to this object"""
         if not isinstance(config_data, dict):
             return
         
-        # API KEYS
-        if not self.llamaparse_api_key and config_data.get("llamaparse_api_key"):
-            self.llamaparse_api_key = config_data["llamaparse_api_key"]
-        
-        if not self.openai_api_key and config_data.get("openai_api_key"):
-            self.openai_api_key = config_data["openai_api_key"]
-        
-        # OUTPUT SETTINGS
-        if config_data.get("output_base_dir"):
-            self.output_base_dir = config_data["output_base_dir"]
-        
-        if "create_timestamped_folders" in config_data:
-            self.create_timestamped_folders = config_data["create_timestamped_folders"]
-        
-        if "preserve_original_structure" in config_data:
-            self.preserve_original_structure = config_data["preserve_original_structure"]
-        
-        # LLAMAPARSE SETTINGS
-        if "use_premium_mode" in config_data:
-            self.use_premium_mode = config_data["use_premium_mode"]
-        
-        if "page_separator" in config_data:
-            self.page_separator = config_data["page_separator"]
-        
-        if "max_timeout" in config_data:
-            self.max_timeout = config_data["max_timeout"]
-        
-        # OPENAI SETTINGS
-        if "openai_model" in config_data:
-            self.openai_model = config_data["openai_model"]
-        
-        if "max_tokens" in config_data:
-            self.max_tokens = config_data["max_tokens"]
-        
-        # PROCESSING SETTINGS
-        if "enable_verbose_logging" in config_data:
-            self.enable_verbose_logging = config_data["enable_verbose_logging"]
-        
-        if "save_intermediate_files" in config_data:
-            self.save_intermediate_files = config_data["save_intermediate_files"]
+        for key, mode in _CONFIG_FIELDS:
+            value = config_data.get(key, _MISSING)
+            if value is _MISSING:
+                continue
+            if mode == "present" or (value and (mode == "truthy" or not getattr(self, key))):
+                setattr(self, key, value)
     
     def _validate_configuration(self):
         """Validate that required configuration is present"""
@@ -188,31 +355,34 @@ class PipelineConfig:
                 "  - Pass api_key parameter to constructor"
             )
     
-    def get_output_path(self, pdf_filename: str, custom_output_dir: Optional[str] = None) -> Path:
+    def get_output_path(self, pdf_filename: str, custom_output_dir: Optional[str] = None, timestamp: Optional[str] = None) -> Path:
         """
         Get the output path for a PDF file
         
         Args:
             pdf_filename: Name of the PDF file being processed
             custom_output_dir: Optional custom output directory override
+            timestamp: Optional folder timestamp (%Y%m%d_%H%M%S); pass one value
+                when laying out a batch of PDFs to share it and skip the clock call
             
         Returns:
             Path: Full path where the document should be processed
         """
-        # DETERMINE BASE OUTPUT DIRECTORY
+        # DETERMINE BASE OUTPUT DIRECTORY (REUSE THE CONFIGURED ONE WHILE IT IS UNCHANGED)
         if custom_output_dir:
             base_dir = Path(custom_output_dir)
         else:
-            base_dir = Path(self.output_base_dir)
+            cached = self._output_base_cache
+            if cached is None or cached[0] != self.output_base_dir:
+                cached = self._output_base_cache = (self.output_base_dir, Path(self.output_base_dir))
+            base_dir = cached[1]
+        document_name = os.path.splitext(os.path.basename(pdf_filename))[0]
         
         # CREATE TIMESTAMPED FOLDER IF ENABLED
         if self.create_timestamped_folders:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            document_name = Path(pdf_filename).stem
+            timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = base_dir / f"{document_name}_{timestamp}"
         else:
-            document_name = Path(pdf_filename).stem
             output_path = base_dir / document_name
         
         return output_path
@@ -232,26 +402,43 @@ class PipelineConfig:
             "save_intermediate_files": self.save_intermediate_files,
             "page_separator": self.page_separator,
             "max_timeout": self.max_timeout,
-            "max_tokens": self.max_tokens
+            "max_concurrent_parses": self.max_concurrent_parses,
+            "llamaparse_max_retries": self.llamaparse_max_retries,
+            "llamaparse_retry_base_delay": self.llamaparse_retry_base_delay,
+            "llamaparse_retry_max_delay": self.llamaparse_retry_max_delay,
+            "parse_cache": self.parse_cache,
+            "max_pdf_bytes": self.max_pdf_bytes,
+            "hardlink_source_pdf": self.hardlink_source_pdf,
+            "max_tokens": self.max_tokens,
+            "openai_concurrency": self.openai_concurrency,
+            "openai_max_retries": self.openai_max_retries,
+            "openai_timeout": self.openai_timeout,
+            "openai_requests_per_minute": self.openai_requests_per_minute,
+            "use_batch_api": self.use_batch_api,
+            "enhancement_group_size": self.enhancement_group_size,
+            "cleaning_group_size": self.cleaning_group_size,
+            "skip_already_enhanced": self.skip_already_enhanced,
+            "force_reprocess": self.force_reprocess,
+            "block_dedupe": self.block_dedupe,
+            "response_cache": self.response_cache,
+            "enhancement_cache": self.enhancement_cache,
+            "semantic_cache_threshold": self.semantic_cache_threshold,
+            "cache_dir": self.cache_dir
         }
         
         # REMOVE NONE VALUES
         config_data = {k: v for k, v in config_data.items() if v is not None}
         
         try:
-            if config_path.suffix.lower() in ('.yaml', '.yml'):
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(config_data, f, default_flow_style=False, indent=2)
-            elif config_path.suffix.lower() == '.json':
-                with open(config_path, 'w', encoding='utf-8') as f:
-                    json.dump(config_data, f, indent=2, ensure_ascii=False)
-            else:
+            saver = _SAVERS.get(config_path.suffix.lower())
+            if saver is None:
                 raise ValueError(f"Unsupported config file format: {config_path.suffix}")
+            saver(config_path, config_data)
             
-            print(f"📋 CONFIGURATION SAVED TO: {config_path}")
+            logger.info("📋 CONFIGURATION SAVED TO: %s", config_path)
             
-        except Exception as e:
-            print(f"❌ ERROR SAVING CONFIGURATION: {e}")
+        except (OSError, ValueError, TypeError) as e:  # UNWRITABLE PATH, BAD SUFFIX OR UNSERIALIZABLE VALUE
+            logger.error("❌ ERROR SAVING CONFIGURATION: %s", e)
             raise
 
 def create_config(
@@ -274,21 +461,16 @@ def create_config(
     Returns:
         PipelineConfig: Configured pipeline settings
     """
-    config = PipelineConfig()
-    
-    # OVERRIDE WITH PROVIDED PARAMETERS
+    # OVERRIDE WITH PROVIDED PARAMETERS (APPLIED BEFORE VALIDATION, SO A KEY
+    # PASSED HERE SATISFIES IT EVEN WHEN NO OTHER SOURCE HAS ONE)
+    overrides = dict(kwargs)
     if llamaparse_api_key:
-        config.llamaparse_api_key = llamaparse_api_key
+        overrides["llamaparse_api_key"] = llamaparse_api_key
     if openai_api_key:
-        config.openai_api_key = openai_api_key
+        overrides["openai_api_key"] = openai_api_key
     if output_base_dir:
-        config.output_base_dir = output_base_dir
+        overrides["output_base_dir"] = output_base_dir
     if use_premium_mode:
-        config.use_premium_mode = use_premium_mode
-    
-    # APPLY ADDITIONAL KWARGS
-    for key, value in kwargs.items():
-        if hasattr(config, key):
-            setattr(config, key, value)
+        overrides["use_premium_mode"] = use_premium_mode
     
-    return config 
\ No newline at end of file
+    return PipelineConfig.load(**overrides) 
\ No newline at end of file
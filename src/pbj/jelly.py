@@ -8,21 +8,221 @@ optimized for RAG systems with consistent table structures and metadata extracti
 """
 
 import os
-import json
+import time
+import queue
 import asyncio
+import logging
 from pathlib import Path
+from functools import lru_cache
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple, Union
+from dataclasses import dataclass, fields
+from concurrent.futures import ThreadPoolExecutor
 import openai
-from openai import OpenAI
-from dotenv import load_dotenv
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+# IMPORT CONFIGURATION
+from .config import PipelineConfig, load_env_file
+from .aio import ApiLimit, LoopRunner
+from . import jsonio
+from .jsonio import read_json, write_json
+from .tokens import context_limit, count_tokens
+from .cache import ResponseCache, content_hash, is_up_to_date, record_source
+from .toast import Toast
 
 # LOAD ENVIRONMENT VARIABLES FROM .ENV FILE
-load_dotenv()
+load_env_file()
+
+logger = logging.getLogger(__name__)
+
+# FIXED FRAMING AFTER THE MARKDOWN IN EVERY CLEANING PROMPT
+_PROMPT_SUFFIX = "\n\nJSON OUTPUT:"
+
+_SYSTEM_MESSAGE = {
+    "role": "system", 
+    "content": "You are an expert data cleaning agent specializing in technical document processing."
+}
+
+# PER-MESSAGE FORMATTING TOKENS THE CHAT API ADDS AROUND SYSTEM + USER MESSAGES
+MESSAGE_FORMAT_TOKENS = 8
+
+# SMALLEST COMPLETION WORTH REQUESTING; PAGES LEAVING LESS CONTEXT ROOM ARE
+# REJECTED LOCALLY INSTEAD OF FAILING (AND BILLING) AT THE API
+MIN_COMPLETION_TOKENS = 512
+
+# FEWEST PAGES WORTH SENDING THROUGH THE BATCH API
+BATCH_MIN_DOCUMENTS = 4
+
+# PACKING SMALL PAGES: LARGEST SINGLE PAGE AND LARGEST COMBINED INPUT,
+# AS FRACTIONS OF max_tokens
+GROUP_DOCUMENT_FRACTION = 0.4
+GROUP_TOKEN_FRACTION = 0.6
+
+# USER MESSAGE AFTER THE CLEANING INSTRUCTIONS FOR PACKED PAGES (FOLLOWED BY THE JSON PAYLOAD)
+_GROUP_PROMPT = (
+    "\n\nClean each page below independently, following the instructions above. "
+    "Respond with a JSON object of the form "
+    '{"pages": [{"id": "<id>", "page": <cleaned page JSON>}]} '
+    "containing every id exactly once.\n\nPAGES:\n"
+)
+
+# JSON SCHEMA OF THE CLEANING OUTPUT (MIRRORS ProcessedPage / ProcessedTable AND THE
+# SPECIFICATION IN pantry/jelly.txt); STRICT MODE NEEDS EVERY KEY REQUIRED AND NO EXTRAS
+PAGE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "keywords": {"type": "array", "items": {"type": "string"}},
+        "tables": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "table_id": {"type": "string"},
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "columns": {"type": "array", "items": {"type": "string"}},
+                    "rows": {"type": "array", "items": {"type": "array", "items": {"type": "string"}}},
+                    "metadata": {
+                        "type": "object",
+                        "properties": {
+                            "row_count": {"type": "integer"},
+                            "column_count": {"type": "integer"},
+                            "data_types": {"type": "array", "items": {"type": "string"}},
+                            "units": {"type": "array", "items": {"type": "string"}},
+                            "technical_category": {"type": "string"}
+                        },
+                        "required": ["row_count", "column_count", "data_types", "units", "technical_category"],
+                        "additionalProperties": False
+                    }
+                },
+                "required": ["table_id", "title", "description", "columns", "rows", "metadata"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["title", "summary", "keywords", "tables"],
+    "additionalProperties": False
+}
+
+# MODELS WITH SERVER-ENFORCED (STRICT) JSON SCHEMAS: EXACT ALIASES AND SNAPSHOT PREFIXES.
+# ONLY SNAPSHOTS KNOWN TO ACCEPT strict json_schema ARE LISTED (gpt-4o-2024-05-13 DOES NOT);
+# REASONING MODELS (o1/o3/o4) ARE LEFT OUT: THEY REJECT temperature AND max_tokens
+_STRUCTURED_OUTPUT_ALIASES = ("gpt-4o",)
+_STRUCTURED_OUTPUT_MODELS = ("gpt-4o-2024-08-06", "gpt-4o-2024-11-20", "gpt-4o-mini", "gpt-4.1")
+
+_REASONING_MODELS = ("o1", "o3", "o4")
+
+# OLDER MODELS WITH PLAIN JSON MODE (INCLUDING EVERY OTHER gpt-4o SNAPSHOT)
+_JSON_MODE_MODELS = ("gpt-4o", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+
+def _has_structured_outputs(model: str) -> bool:
+    """True if the model accepts a strict json_schema response_format"""
+    return model in _STRUCTURED_OUTPUT_ALIASES or model.startswith(_STRUCTURED_OUTPUT_MODELS)
 
-# IMPORT CONFIGURATION
-from .config import PipelineConfig
+
+def _response_format(model: str) -> Optional[Dict[str, Any]]:
+    """response_format that guarantees parseable output for this model, if it has one"""
+    if _has_structured_outputs(model):
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "ProcessedPage", "schema": PAGE_SCHEMA, "strict": True}
+        }
+    if model.startswith(_JSON_MODE_MODELS):
+        return {"type": "json_object"}
+    return None  # E.G. THE ORIGINAL gpt-4 REJECTS response_format
+
+
+def _group_response_format(model: str) -> Optional[Dict[str, Any]]:
+    """response_format for packed pages (a "pages" array of page objects), if the model has one"""
+    if _has_structured_outputs(model):
+        group_schema = {
+            "type": "object",
+            "properties": {
+                "pages": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "string"}, "page": PAGE_SCHEMA},
+                        "required": ["id", "page"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["pages"],
+            "additionalProperties": False
+        }
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "ProcessedPages", "schema": group_schema, "strict": True}
+        }
+    if model.startswith(_JSON_MODE_MODELS):
+        return {"type": "json_object"}
+    return None
+
+
+def _list_markdown_files(folder: Path) -> List[Path]:
+    """Sorted *.md files in a folder, from one scandir pass (dentry type, no per-file stat)"""
+    with os.scandir(folder) as entries:
+        # SORT PLAIN STRINGS; COMPARING Path OBJECTS IS SLOWER
+        paths = sorted(entry.path for entry in entries if entry.name.endswith('.md') and entry.is_file())
+    return [Path(path) for path in paths]
+
+
+def _page_dict(page: "ProcessedPage") -> Dict[str, Any]:
+    """Page (and its tables) as dicts for Toast, one level at a time like jsonio (no asdict deep copy)"""
+    data = {f.name: getattr(page, f.name) for f in fields(page)}
+    data["tables"] = [{f.name: getattr(table, f.name) for f in fields(table)} for table in page.tables]
+    return data
+
+
+def _unique_keywords(processed_pages: List["ProcessedPage"]) -> set:
+    """Every distinct keyword across the pages, built in one pass"""
+    keywords = set()
+    for page in processed_pages:
+        keywords.update(page.keywords)
+    return keywords
+
+
+def _write_json_with_pages(output_file: Path, header: Dict[str, Any], encoded_pages: Iterable[str]):
+    """
+    Write indented JSON for header plus a trailing "pages" array, one page at a time
+    
+    Pages arrive already encoded with jsonio.dumps(page, indent=True), either
+    reused from an earlier write or produced lazily by a generator, so only one
+    page's JSON is held in memory at once. The output matches write_json.
+    """
+    header_json = jsonio.dumps(header, indent=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(header_json[:-2] + ',\n  "pages": [')
+        separator = "\n    "
+        for page_json in encoded_pages:
+            # JSON STRINGS ESCAPE NEWLINES, SO EVERY RAW NEWLINE IS LAYOUT AND CAN BE RE-INDENTED
+            f.write(separator + page_json.replace("\n", "\n    "))
+            separator = ",\n    "
+        f.write("]\n}" if separator == "\n    " else "\n  ]\n}")
+
+
+def _html_comment_preview(text: str) -> Optional[str]:
+    """First 100 characters of the first complete HTML comment, or None if there is none"""
+    start = text.find('<!--')
+    if start == -1 or text.find('-->', start) == -1:
+        return None
+    return text[start:start + 100]
+
+
+@lru_cache(maxsize=None)
+def _read_prompt_file(prompt_path: str) -> str:
+    """Read a pantry prompt once per process (prompts do not change while running)"""
+    if not os.path.exists(prompt_path):
+        raise FileNotFoundError(f"Cleaning prompt file not found: {prompt_path}")
+    
+    # LOAD PROMPT FROM SIMPLE TEXT FILE
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
 
 @dataclass
 class ProcessedTable:
@@ -42,8 +242,9 @@ class ProcessedPage:
     summary: str
     keywords: List[str]
     tables: List[ProcessedTable]
-    raw_content: str
+    raw_content: Optional[str]  # None WHEN THE MARKDOWN CAN BE RE-READ FROM raw_content_path
     processing_metadata: Dict[str, Any]
+    raw_content_path: Optional[str] = None
 
 class Jelly:
     """
@@ -53,7 +254,7 @@ class Jelly:
     optimized for RAG systems with consistent table structures and metadata extraction.
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4", config: Optional[PipelineConfig] = None):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4", config: Optional[PipelineConfig] = None, http_client: Optional[httpx.Client] = None, api_limit: Optional[ApiLimit] = None):
         """
         Initialize the data cleaner
         
@@ -61,6 +262,9 @@ class Jelly:
             api_key: OpenAI API key (if not provided, will try to get from env)
             model: OpenAI model to use for processing
             config: PipelineConfig object with settings including max_tokens
+            http_client: Optional shared httpx client for the synchronous client (Batch API calls);
+                real-time requests always use this instance's own async pool
+            api_limit: Optional OpenAI concurrency/rate budget shared with other stages
         """
         # GET API KEY FROM ENVIRONMENT OR PARAMETER
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -70,10 +274,47 @@ class Jelly:
                 "or pass it directly to the constructor."
             )
         
-        # INITIALIZE OPENAI CLIENT
-        self.client = OpenAI(api_key=self.api_key)
+        # RETRY TRANSIENT FAILURES (429, 5XX, CONNECTION ERRORS) WITH THE SDK'S
+        # JITTERED EXPONENTIAL BACKOFF, AND BOUND EVERY ATTEMPT BY A TIMEOUT
+        max_retries = config.openai_max_retries if config else 5
+        timeout = config.openai_timeout if config else 60.0
+        
+        # SYNCHRONOUS CLIENT FOR BATCH API CALLS (OPTIONALLY ON A SHARED CONNECTION POOL)
+        self.client = OpenAI(api_key=self.api_key, http_client=http_client, max_retries=max_retries, timeout=timeout)
+        
+        # ASYNC CLIENT FOR CONCURRENT CLEANING REQUESTS, ON ITS OWN POOL SIZED
+        # WELL ABOVE THE CONCURRENCY LIMIT SO REQUESTS NEVER QUEUE FOR A CONNECTION
+        self._async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=128),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        self.aclient = AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=self._async_http_client,
+            max_retries=max_retries,
+            timeout=timeout
+        )
         self.model = model
         
+        # MAXIMUM NUMBER OF IN-FLIGHT OPENAI REQUESTS FOR FOLDER PROCESSING
+        self.concurrency = config.openai_concurrency if config else 16
+        
+        # CAP ON IN-FLIGHT OPENAI CALLS PLUS THE OPTIONAL REQUESTS-PER-MINUTE CAP;
+        # PASS api_limit TO SHARE ONE BUDGET WITH OTHER STAGES
+        requests_per_minute = config.openai_requests_per_minute if config else 0
+        self._api_limit = api_limit or ApiLimit(self.concurrency, requests_per_minute)
+        
+        # ONE EVENT LOOP FOR THE LIFETIME OF THIS INSTANCE SO THE ASYNC CLIENT'S
+        # CONNECTION POOL IS NEVER STRANDED ON A CLOSED LOOP
+        self._runner = LoopRunner()
+        
+        # REUSE SAVED PAGES WHOSE MARKDOWN INPUT HAS NOT CHANGED SINCE THEY WERE CLEANED
+        self.force_reprocess = config.force_reprocess if config else False
+        self.unchanged_page_skips = 0
+        
+        # CLEAN PIPELINE FOLDERS THROUGH THE BATCH API (HALF PRICE, UP TO 24H)
+        self.use_batch_api = config.use_batch_api if config else False
+        
         # SET MAX TOKENS FROM CONFIG WITH SAFETY CHECK
         if config and hasattr(config, 'max_tokens'):
             # SAFETY CHECK: PREVENT CONTEXT OVERFLOW
@@ -84,34 +325,618 @@ class Jelly:
         # LOAD PROMPTS FROM CONFIG FILE
         self.prompts = self._load_prompts()
         
-        print(f"INITIALIZED DATA CLEANER WITH MODEL: {model}, MAX_TOKENS: {self.max_tokens}")
+        # THE INSTRUCTIONS BEFORE THE MARKDOWN NEVER CHANGE, SO JOIN THEM ONCE
+        self._prompt_prefix = self.prompts['cleaning_prompt'] + "\n\nENHANCED MARKDOWN CONTENT TO PROCESS:\n"
+        
+        # TOKENS EVERY REQUEST SPENDS BEFORE THE PAGE ITSELF, AND THE MODEL'S CONTEXT WINDOW
+        self._prompt_overhead = (
+            count_tokens(_SYSTEM_MESSAGE["content"], model)
+            + count_tokens(self._prompt_prefix + _PROMPT_SUFFIX, model)
+            + MESSAGE_FORMAT_TOKENS
+        )
+        self._context_limit = context_limit(model)
+        
+        # OUTPUT FORMAT IS FIXED PER MODEL, SO BUILD IT ONCE
+        if model.startswith(_REASONING_MODELS):
+            logger.warning("⚠️  %s is a reasoning model: it rejects temperature and max_tokens, so cleaning requests will fail", model)
+        self._response_format = _response_format(model)
+        self._schema_enforced = bool(self._response_format) and self._response_format["type"] == "json_schema"
+        
+        # PACK UP TO group_size SMALL PAGES INTO ONE REQUEST (NEEDS A JSON-MODE MODEL)
+        self.group_size = config.cleaning_group_size if config else 1
+        self._group_response_format = _group_response_format(model) if self.group_size > 1 else None
+        if self.group_size > 1 and self._group_response_format is None:
+            logger.warning("⚠️  cleaning_group_size needs a JSON-mode model; %s cleans one page per request", model)
+            self.group_size = 1
+        
+        # OPTIONAL CACHE OF PAST CLEANING RESPONSES, SCOPED TO THIS MODEL, PROMPT AND OUTPUT FORMAT
+        self._prompt_hash = content_hash(jsonio.dumps([_SYSTEM_MESSAGE["content"], self._prompt_prefix, self._response_format]))
+        self.response_cache = None
+        if config and config.response_cache:
+            self.response_cache = ResponseCache(Path(config.cache_dir) / "jelly_responses.sqlite3")
+        
+        logger.info("INITIALIZED DATA CLEANER WITH MODEL: %s, MAX_TOKENS: %s", model, self.max_tokens)
     
     def _load_prompts(self):
         """Load prompts from pantry - much cleaner approach"""
         # GET PANTRY PATH RELATIVE TO THIS MODULE
         pantry_path = Path(__file__).parent / "pantry"
-        prompt_path = pantry_path / "jelly.txt"
-        
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Cleaning prompt file not found: {prompt_path}")
-        
-        # LOAD PROMPT FROM SIMPLE TEXT FILE
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            cleaning_prompt = f.read().strip()
         
         return {
-            'cleaning_prompt': cleaning_prompt
+            'cleaning_prompt': _read_prompt_file(str(pantry_path / "jelly.txt"))
         }
     
     def _create_cleaning_prompt(self, enhanced_content: str) -> str:
         """Create the prompt for OpenAI to clean and standardize the enhanced markdown"""
-        
-        return f"""{self.prompts['cleaning_prompt']}
+        return self._prompt_prefix + enhanced_content + _PROMPT_SUFFIX
 
-ENHANCED MARKDOWN CONTENT TO PROCESS:
-{enhanced_content}
+    def _create_completion_request(self, content: str) -> Dict[str, Any]:
+        """Build the chat completion request body for one page (shared by real-time and batch calls)"""
+        request = {
+            "model": self.model,
+            "messages": [
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": self._create_cleaning_prompt(content)}
+            ],
+            "temperature": 0.0,  # ZERO TEMPERATURE FOR DETERMINISTIC OUTPUT
+            "max_tokens": self._completion_budget(content)
+        }
+        if self._response_format:
+            # LET THE SERVER GUARANTEE VALID JSON INSTEAD OF PAYING FOR UNPARSEABLE REPLIES
+            request["response_format"] = self._response_format
+        return request
+    
+    def _completion_budget(self, content: str) -> int:
+        """
+        max_tokens for one page: the configured limit, capped by the context room left
+        
+        Raises ValueError, before any API call, when the page leaves no useful room.
+        """
+        prompt_tokens = self._prompt_overhead + count_tokens(content, self.model)
+        context_room = self._context_limit - prompt_tokens
+        if context_room < MIN_COMPLETION_TOKENS:
+            raise ValueError(
+                f"Page too large for {self.model}: {prompt_tokens} prompt tokens of a {self._context_limit}-token context"
+            )
+        return min(self.max_tokens, context_room)
+    
+    def _read_markdown_file(self, file_path: Path) -> str:
+        """Read a markdown page and strip Butter's metadata header"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            markdown_content = f.read()
+        
+        logger.info("PROCESSING FILE: %s", file_path.name)
+        return self._prepare_markdown(markdown_content, file_path.name)
+    
+    def _prepare_markdown(self, markdown_content: str, name: str) -> str:
+        """Strip Butter's metadata header and warn about HTML comments left by earlier stages"""
+        # STRIP BUTTER METADATA BEFORE PROCESSING
+        cleaned_markdown = self._strip_butter_metadata(markdown_content)
+        
+        # SAFETY CHECK: DETECT HTML COMMENTS IN INPUT
+        comment_preview = _html_comment_preview(cleaned_markdown)
+        if comment_preview is not None:
+            logger.warning("⚠️  WARNING: HTML comments detected in input markdown for %s", name)
+            logger.warning("   This may indicate data truncation from previous stage")
+            logger.warning("   HTML comment found: %s...", comment_preview)
+        
+        return cleaned_markdown
+    
+    def _select_enhanced_content(self, enhanced_doc) -> Tuple[str, bool]:
+        """Pick the content to clean for an enhanced document: (content, enhancement_applied)"""
+        # SAFETY CHECK: DETECT HTML COMMENTS IN ENHANCED CONTENT
+        comment_preview = _html_comment_preview(enhanced_doc.enhanced_content)
+        if comment_preview is not None:
+            logger.warning("⚠️  WARNING: HTML comments detected in enhanced content for %s", enhanced_doc.filename)
+            logger.warning("   Falling back to original content to preserve data integrity")
+            logger.warning("   HTML comment found: %s...", comment_preview)
+            # USE ORIGINAL CONTENT INSTEAD OF ENHANCED
+            return enhanced_doc.original_content, False
+        return enhanced_doc.enhanced_content, True
+    
+    def _build_tables(self, cleaned_data: Dict[str, Any]) -> List[ProcessedTable]:
+        """Convert the model's table dicts to ProcessedTable objects"""
+        # STRICT SCHEMA OUTPUT HAS EXACTLY THE ProcessedTable FIELDS, SO SKIP THE DEFAULTS
+        if self._schema_enforced:
+            return [ProcessedTable(**table_data) for table_data in cleaned_data["tables"]]
+        
+        tables = []
+        for i, table_data in enumerate(cleaned_data.get("tables", [])):
+            table = ProcessedTable(
+                table_id=table_data.get("table_id", f"table_{i+1}"),
+                title=table_data.get("title", ""),
+                description=table_data.get("description", ""),
+                columns=table_data.get("columns", []),
+                rows=table_data.get("rows", []),
+                metadata=table_data.get("metadata", {})
+            )
+            tables.append(table)
+        return tables
+    
+    def _build_file_page(self, file_path: Path, cleaned_markdown: str, cleaned_data: Dict[str, Any], keep_raw_content: bool = False) -> ProcessedPage:
+        """
+        Assemble the ProcessedPage for a cleaned markdown file
+        
+        The markdown is only kept in memory (and in the output JSON) when
+        keep_raw_content is set; otherwise the page points at its source file.
+        """
+        tables = self._build_tables(cleaned_data)
+        processed_page = ProcessedPage(
+            page_id=file_path.stem,
+            title=cleaned_data.get("title", file_path.stem),
+            summary=cleaned_data.get("summary", ""),
+            keywords=cleaned_data.get("keywords", []),
+            tables=tables,
+            raw_content=cleaned_markdown if keep_raw_content else None,
+            processing_metadata={
+                "source_file": str(file_path),
+                "processed_at": datetime.now().isoformat(),
+                "model_used": self.model,
+                "tables_found": len(tables)
+            },
+            raw_content_path=None if keep_raw_content else str(file_path)
+        )
+        
+        logger.info("✅ CLEANED: %s tables, %s keywords", len(tables), len(cleaned_data.get('keywords', [])))
+        return processed_page
+    
+    def _build_enhanced_page(self, enhanced_doc, content: str, enhancement_applied: bool, cleaned_data: Dict[str, Any]) -> ProcessedPage:
+        """Assemble the ProcessedPage for a cleaned enhanced document"""
+        tables = self._build_tables(cleaned_data)
+        processed_page = ProcessedPage(
+            page_id=Path(enhanced_doc.filename).stem,
+            title=cleaned_data.get("title", Path(enhanced_doc.filename).stem),
+            summary=cleaned_data.get("summary", ""),
+            keywords=cleaned_data.get("keywords", []),
+            tables=tables,
+            raw_content=content,  # STORE ENHANCED VERSION
+            processing_metadata={
+                "source_file": enhanced_doc.filename,
+                "processed_at": datetime.now().isoformat(),
+                "model_used": self.model,
+                "tables_found": len(tables),
+                "enhancement_applied": enhancement_applied,
+                "enhancement_notes": enhanced_doc.enhancement_notes,
+                "original_preserved": True,  # ORIGINAL CONTENT AVAILABLE AS BACKUP
+                "data_integrity": "Enhanced content with all data preserved"
+            }
+        )
+        
+        logger.info("✅ ENHANCED-PROCESSED: %s tables, %s keywords", len(tables), len(cleaned_data.get('keywords', [])))
+        logger.info("   📊 Using enhanced content with improved structure")
+        logger.info("   🔧 Structure enhancements: %s", len(enhanced_doc.enhancement_notes))
+        logger.info("   💾 Original content preserved as backup")
+        return processed_page
+    
+    def _clean_batch(self, contents: List[str], poll_interval: int = 30) -> List[Optional[Dict[str, Any]]]:
+        """
+        Clean several pages through the OpenAI Batch API
+        
+        Every page becomes one line of a JSONL batch; the call blocks, polling
+        every poll_interval seconds, until the batch reaches a terminal state.
+        
+        Args:
+            contents: Markdown content of each page
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            List with one entry per page, in input order: the parsed JSON output
+            or None if that request failed
+        """
+        lines = []
+        for i, content in enumerate(contents):
+            try:
+                body = self._create_completion_request(content)
+            except ValueError as e:
+                # OVERSIZED PAGES NEVER GO TO OPENAI; THEIR RESULT STAYS None
+                logger.error("❌ PROCESSING ERROR: %s", e)
+                continue
+            lines.append(jsonio.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }))
+        if not lines:
+            return [None] * len(contents)
+        
+        # UPLOAD THE REQUESTS AND SUBMIT THE BATCH
+        batch_input = self.client.files.create(
+            file=("jelly_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_input.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("📦 SUBMITTED BATCH %s WITH %s REQUESTS", batch.id, len(lines))
+        
+        # POLL UNTIL THE BATCH FINISHES
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            logger.info("   BATCH %s: %s", batch.id, batch.status)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            self._delete_batch_files(batch_input.id)
+            raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+        
+        # ROUTE EACH OUTPUT LINE BACK TO ITS PAGE BY custom_id (FAILED LINES STAY None)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(contents)
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = jsonio.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            try:
+                json_content = response["body"]["choices"][0]["message"]["content"]
+                results[int(record["custom_id"])] = jsonio.loads(json_content)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.error("❌ JSON PARSING ERROR IN BATCH LINE %s: %s", record.get('custom_id'), e)
+        
+        # THE PAGES ARE IN HAND: DON'T LEAVE COPIES IN OPENAI FILE STORAGE
+        self._delete_batch_files(batch_input.id, batch.output_file_id, batch.error_file_id)
+        return results
+    
+    def _delete_batch_files(self, *file_ids: Optional[str]):
+        """Delete uploaded batch input/output files, ignoring failures"""
+        for file_id in file_ids:
+            if not file_id:
+                continue
+            try:
+                self.client.files.delete(file_id)
+            except Exception as e:
+                logger.warning("⚠️  WARNING: Could not delete batch file %s: %s", file_id, e)
+    
+    def _process_files_batch(self, md_files: List[Path], poll_interval: int = 30) -> List[Optional[ProcessedPage]]:
+        """Clean markdown files through the Batch API; one page (or None) per file, in order"""
+        contents = [self._read_markdown_file(md_file) for md_file in md_files]
+        results = self._clean_batch(contents, poll_interval)
+        return [
+            self._build_file_page(md_file, content, cleaned_data) if cleaned_data is not None else None
+            for md_file, content, cleaned_data in zip(md_files, contents, results)
+        ]
+    
+    def _process_files(self, md_files: List[Path], use_batch: bool = False, poll_interval: int = 30, on_processed: Optional[Callable[[ProcessedPage], None]] = None) -> List[Union[Optional[ProcessedPage], BaseException]]:
+        """Clean files via the Batch API when requested and worthwhile, otherwise concurrently in real time"""
+        # SMALL FOLDERS ARE NOT WORTH THE BATCH TURNAROUND
+        if use_batch and len(md_files) >= BATCH_MIN_DOCUMENTS:
+            try:
+                results = self._process_files_batch(md_files, poll_interval)
+            except Exception as e:
+                logger.error("❌ BATCH CLEANING FAILED: %s", e)
+                logger.warning("⚠️  Falling back to real-time cleaning")
+            else:
+                # BATCH RESULTS ARRIVE ALL AT ONCE
+                if on_processed:
+                    for page in results:
+                        if page is not None:
+                            on_processed(page)
+                return results
+        
+        return self._runner.run(self._process_files_async(md_files, on_processed))
+    
+    def _clean_files(self, md_files: List[Path], use_batch: bool = False, poll_interval: int = 30, on_processed: Optional[Callable[[ProcessedPage], None]] = None) -> Tuple[List[ProcessedPage], List[Dict[str, Any]]]:
+        """
+        Clean a set of markdown files together (shared by the folder methods)
+        on_processed is called with each page as soon as it is cleaned
+        
+        Returns:
+            The processed pages in file order, and a record for every file that
+            could not be cleaned
+        """
+        results = self._process_files(md_files, use_batch, poll_interval, on_processed)
+        return self._collect_results(md_files, results)
+    
+    def _collect_results(self, md_files: List[Path], results: List[Union[Optional[ProcessedPage], BaseException]]) -> Tuple[List[ProcessedPage], List[Dict[str, Any]]]:
+        """Split per-file cleaning results into processed pages and skip records, in file order"""
+        processed_pages = []
+        skipped_pages = []
+        for md_file, processed_page in zip(md_files, results):
+            if isinstance(processed_page, BaseException):
+                logger.error("❌ FAILED TO PROCESS %s: %s", md_file.name, processed_page)
+                skipped_pages.append({
+                    "filename": md_file.name,
+                    "error": str(processed_page),
+                    "timestamp": datetime.now().isoformat()
+                })
+                continue
+            
+            if processed_page is None:
+                # Page was skipped due to error
+                skipped_pages.append({
+                    "filename": md_file.name,
+                    "error": "Processing failed - page skipped",
+                    "timestamp": datetime.now().isoformat()
+                })
+                logger.warning("⚠️  SKIPPED: %s (processing failed)", md_file.name)
+                continue
+            
+            processed_pages.append(processed_page)
+            logger.info("✅ PROCESSED: %s", md_file.name)
+        
+        return processed_pages, skipped_pages
+    
+    def _clean_and_save_files(self, md_files: List[Path], output_folder: Path, document_id: str, use_batch: bool = False, poll_interval: int = 30) -> Tuple[List[ProcessedPage], List[Dict[str, Any]]]:
+        """Clean files and save each page as soon as it is cleaned"""
+        results = self._process_and_save_files(md_files, output_folder, document_id, use_batch, poll_interval)
+        return self._collect_results(md_files, results)
+    
+    def _process_and_save_files(self, md_files: List[Path], output_folder: Path, document_id: str, use_batch: bool = False, poll_interval: int = 30) -> List[Union[Optional[ProcessedPage], BaseException]]:
+        """
+        Clean files, saving each page as soon as it is cleaned; one result (or exception) per file
+        Pages already cleaned from a file's current content are loaded instead of re-sent
+        """
+        reused: Dict[Path, ProcessedPage] = {}
+        if not self.force_reprocess:
+            for md_file in md_files:
+                page = self._load_unchanged_page(md_file, output_folder)
+                if page is not None:
+                    reused[md_file] = page
+        pending_files = [md_file for md_file in md_files if md_file not in reused]
+        
+        # ONE WRITER THREAD SAVES EACH PAGE AS SOON AS IT IS CLEANED, SO WRITES
+        # OVERLAP THE REMAINING OPENAI CALLS INSTEAD OF FOLLOWING THEM
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending_writes = []
+            
+            def save(page: ProcessedPage):
+                pending_writes.append(writer.submit(self._save_single_processed_page, page, output_folder, document_id))
+            
+            results = self._process_files(pending_files, use_batch, poll_interval, on_processed=save)
+            
+            for write in pending_writes:
+                write.result()
+        
+        if not reused:
+            return results
+        by_file: Dict[Path, Union[Optional[ProcessedPage], BaseException]] = dict(zip(pending_files, results))
+        by_file.update(reused)
+        return [by_file[md_file] for md_file in md_files]
+    
+    def _load_unchanged_page(self, md_file: Path, output_folder: Path) -> Optional[ProcessedPage]:
+        """The page saved by an earlier run, if it was cleaned from this file's current content"""
+        output_file = output_folder / f"{md_file.stem}.json"
+        if not is_up_to_date(output_file, md_file):
+            return None
+        
+        try:
+            data = read_json(output_file)
+            data["tables"] = [ProcessedTable(**table) for table in data.get("tables", [])]
+            page = ProcessedPage(**data)
+        except (OSError, ValueError, TypeError):
+            return None  # UNREADABLE OR FROM AN OLDER FORMAT: CLEAN IT AGAIN
+        
+        self.unchanged_page_skips += 1
+        logger.info("⏭️  UNCHANGED: %s (reusing %s)", md_file.name, output_file.name)
+        return page
 
-JSON OUTPUT:"""
+    def _api_slot(self):
+        """Hold a concurrency slot, and wait for the rate limit, around one OpenAI call"""
+        return self._api_limit.slot()
+    
+    async def _process_files_async(self, md_files: List[Path], on_processed: Optional[Callable[[ProcessedPage], None]] = None) -> List[Union[Optional[ProcessedPage], BaseException]]:
+        """
+        Clean several markdown files concurrently; one result (or exception) per file, in order
+        on_processed is called with each page as soon as it is cleaned (it must be quick)
+        """
+        if self.group_size > 1 and len(md_files) > 1:
+            return await self._process_files_packed_async(md_files, on_processed)
+        
+        return await asyncio.gather(
+            *[self._process_file_notify(md_file, on_processed) for md_file in md_files],
+            return_exceptions=True
+        )
+    
+    async def _process_files_packed_async(self, md_files: List[Path], on_processed: Optional[Callable[[ProcessedPage], None]] = None) -> List[Union[Optional[ProcessedPage], BaseException]]:
+        """Clean files with small pages packed several to a request; one result (or exception) per file, in order"""
+        def read(md_file: Path) -> Union[str, BaseException]:
+            try:
+                return self._read_markdown_file(md_file)
+            except Exception as e:
+                return e
+        
+        loop = asyncio.get_running_loop()
+        contents = await loop.run_in_executor(None, lambda: [read(md_file) for md_file in md_files])
+        
+        # UNREADABLE FILES KEEP THEIR EXCEPTION; THE REST ARE PACKED BY TOKEN SIZE
+        results: List[Union[Optional[ProcessedPage], BaseException]] = list(contents)
+        readable = [i for i, content in enumerate(contents) if isinstance(content, str)]
+        groups = [[readable[j] for j in group] for group in self._pack_pages([contents[i] for i in readable])]
+        
+        group_results = await asyncio.gather(
+            *[self._process_group_async([md_files[i] for i in group], [contents[i] for i in group], on_processed) for group in groups],
+            return_exceptions=True
+        )
+        
+        # SCATTER GROUP RESULTS BACK INTO FILE ORDER
+        for group, group_result in zip(groups, group_results):
+            for position, index in enumerate(group):
+                results[index] = group_result if isinstance(group_result, BaseException) else group_result[position]
+        return results
+    
+    def _pack_pages(self, contents: List[str]) -> List[List[int]]:
+        """
+        Greedily pack small pages into groups for _process_group_async
+        
+        Pages above GROUP_DOCUMENT_FRACTION of max_tokens stay on their own;
+        a group closes when it reaches group_size pages or its combined input
+        would exceed GROUP_TOKEN_FRACTION of max_tokens.
+        
+        Returns:
+            Lists of content indexes, one list per request
+        """
+        document_limit = int(self.max_tokens * GROUP_DOCUMENT_FRACTION)
+        group_limit = int(self.max_tokens * GROUP_TOKEN_FRACTION)
+        
+        groups = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, content in enumerate(contents):
+            tokens = count_tokens(content, self.model)
+            if tokens > document_limit:
+                groups.append([i])
+                continue
+            if current and (len(current) >= self.group_size or current_tokens + tokens > group_limit):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+    
+    async def _process_group_async(self, md_files: List[Path], contents: List[str], on_processed: Optional[Callable[[ProcessedPage], None]] = None) -> List[Optional[ProcessedPage]]:
+        """
+        Clean a group of prepared pages, sending the uncached ones in a single request
+        
+        Pages missing from the reply, or every page if the request fails, are cleaned
+        individually instead.
+        """
+        keys = [self._response_key(content) for content in contents]
+        cleaned: List[Optional[Dict[str, Any]]] = [self.response_cache.get(key) if key else None for key in keys]
+        
+        uncached = [i for i, data in enumerate(cleaned) if data is None]
+        if len(uncached) > 1:
+            replies = await self._extract_group_async([contents[i] for i in uncached])
+            for i, data in zip(uncached, replies):
+                if data is not None:
+                    cleaned[i] = data
+                    if keys[i]:
+                        self.response_cache.set(keys[i], data)
+        
+        results: List[Optional[ProcessedPage]] = []
+        for md_file, content, data in zip(md_files, contents, cleaned):
+            if data is None:
+                try:
+                    data = await self._extract_async(content, md_file.name)
+                except Exception:
+                    logger.error("   Skipping page %s due to error", md_file.name)
+                    results.append(None)  # None INSTEAD OF RAISING SO THE REST OF THE GROUP CONTINUES
+                    continue
+            
+            processed_page = self._build_file_page(md_file, content, data)
+            if on_processed:
+                on_processed(processed_page)
+            results.append(processed_page)
+        return results
+    
+    async def _extract_group_async(self, contents: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Clean several small pages with one request; None for each page the reply does not cover"""
+        payload = jsonio.dumps({
+            "pages": [{"id": str(i), "markdown": content} for i, content in enumerate(contents)]
+        })
+        
+        pages_by_id: Dict[str, Dict[str, Any]] = {}
+        try:
+            logger.info("SENDING %s PACKED PAGES TO OPENAI FOR CLEANING...", len(contents))
+            async with self._api_slot():
+                response = await self.aclient.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        _SYSTEM_MESSAGE,
+                        {"role": "user", "content": self.prompts['cleaning_prompt'] + _GROUP_PROMPT + payload}
+                    ],
+                    temperature=0.0,
+                    max_tokens=self._completion_budget(payload),
+                    response_format=self._group_response_format
+                )
+            reply = jsonio.loads(response.choices[0].message.content or "{}")
+            for entry in reply.get("pages", []):
+                if isinstance(entry, dict) and isinstance(entry.get("page"), dict):
+                    pages_by_id[str(entry.get("id"))] = entry["page"]
+        except Exception as e:
+            logger.warning("⚠️  PACKED CLEANING FAILED (%s), CLEANING INDIVIDUALLY", e)
+        
+        return [pages_by_id.get(str(i)) for i in range(len(contents))]
+    
+    async def _process_file_notify(self, md_file: Path, on_processed: Optional[Callable[[ProcessedPage], None]] = None, content: Optional[str] = None) -> Optional[ProcessedPage]:
+        """
+        Clean one file and hand the page to on_processed as soon as it is ready
+        content is the file's text when the caller already has it in memory (it is then not re-read)
+        """
+        if content is None:
+            processed_page = await self.process_file_async(str(md_file))
+        else:
+            logger.info("PROCESSING FILE: %s", md_file.name)
+            processed_page = await self._process_markdown_async(content, md_file)
+        if on_processed and processed_page is not None:
+            on_processed(processed_page)
+        return processed_page
+    
+    async def _process_stream_async(self, incoming: "queue.Queue[Optional[Tuple[Path, Optional[str]]]]", output_folder: Path, on_processed: Optional[Callable[[ProcessedPage], None]] = None) -> Dict[Path, Union[Optional[ProcessedPage], BaseException]]:
+        """
+        Clean files as another stage produces them; a None on the queue ends the stream
+        Each item is a file and, when the producer has it, the text it just wrote there
+        Pages already cleaned into output_folder from a file's current content are reused
+        
+        Returns:
+            One result (or exception) per file received, keyed by path
+        """
+        loop = asyncio.get_running_loop()
+        tasks: Dict[Path, "asyncio.Future[Optional[ProcessedPage]]"] = {}
+        while True:
+            # WAIT FOR THE NEXT FILE ON A WORKER THREAD SO PAGES ALREADY RECEIVED KEEP CLEANING
+            item = await loop.run_in_executor(None, incoming.get)
+            if item is None:
+                break
+            md_file, content = item
+            tasks[md_file] = asyncio.ensure_future(self._reuse_or_process(md_file, output_folder, on_processed, content))
+        
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return dict(zip(tasks, results))
+    
+    async def _reuse_or_process(self, md_file: Path, output_folder: Path, on_processed: Optional[Callable[[ProcessedPage], None]] = None, content: Optional[str] = None) -> Optional[ProcessedPage]:
+        """Load the saved page if its input is unchanged, otherwise clean the file"""
+        if not self.force_reprocess:
+            loop = asyncio.get_running_loop()
+            page = await loop.run_in_executor(None, self._load_unchanged_page, md_file, output_folder)
+            if page is not None:
+                return page
+        return await self._process_file_notify(md_file, on_processed, content)
+    
+    def _clean_and_save_stream(self, incoming: "queue.Queue[Optional[Tuple[Path, Optional[str]]]]", output_folder: Path, document_id: str) -> Dict[Path, Union[Optional[ProcessedPage], BaseException]]:
+        """Clean files from a queue as they arrive, saving each page as soon as it is cleaned"""
+        output_folder.mkdir(exist_ok=True)
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            pending_writes = []
+            
+            def save(page: ProcessedPage):
+                pending_writes.append(writer.submit(self._save_single_processed_page, page, output_folder, document_id))
+            
+            results = self._runner.run(self._process_stream_async(incoming, output_folder, on_processed=save))
+            
+            for write in pending_writes:
+                write.result()
+        
+        return results
+    
+    def clear_cache(self):
+        """Forget every cached cleaning response"""
+        if self.response_cache:
+            self.response_cache.clear()
+    
+    def close(self):
+        """Close the async connection pool, the event loop it runs on, and the response cache"""
+        self._runner.run(self._async_http_client.aclose())
+        self._runner.close()
+        if self.response_cache:
+            self.response_cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self._async_http_client.aclose()
 
     async def process_file_async(self, markdown_file_path: str) -> Optional[ProcessedPage]:
         """
@@ -129,130 +954,108 @@ JSON OUTPUT:"""
         with open(file_path, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
         
-        print(f"PROCESSING FILE: {file_path.name}")
+        logger.info("PROCESSING FILE: %s", file_path.name)
+        return await self._process_markdown_async(markdown_content, file_path)
+    
+    async def _process_markdown_async(self, markdown_content: str, file_path: Path, keep_raw_content: bool = False) -> Optional[ProcessedPage]:
+        """
+        Clean markdown already in memory; file_path names the page (it is not read)
+        keep_raw_content stores the markdown on the page, for content with no file behind it
+        """
+        cleaned_markdown = self._prepare_markdown(markdown_content, file_path.name)
         
-        # STRIP BUTTER METADATA BEFORE PROCESSING
-        cleaned_markdown = self._strip_butter_metadata(markdown_content)
+        try:
+            cleaned_data = await self._extract_async(cleaned_markdown, file_path.name)
+        except jsonio.JSONDecodeError:
+            logger.error("   Skipping page %s due to JSON parsing error", file_path.name)
+            return None  # Return None instead of raising to allow pipeline to continue
+        except Exception:
+            logger.error("   Skipping page %s due to error", file_path.name)
+            return None  # Return None instead of raising to allow pipeline to continue
         
-        # SAFETY CHECK: DETECT HTML COMMENTS IN INPUT
-        if '<!--' in cleaned_markdown and '-->' in cleaned_markdown:
-            print(f"⚠️  WARNING: HTML comments detected in input markdown for {file_path.name}")
-            print(f"   This may indicate data truncation from previous stage")
-            print(f"   HTML comment found: {cleaned_markdown[cleaned_markdown.find('<!--'):cleaned_markdown.find('<!--')+100]}...")
+        return self._build_file_page(file_path, cleaned_markdown, cleaned_data, keep_raw_content)
+    
+    def _response_key(self, content: str) -> Optional[str]:
+        """Response cache key for one page (None when the cache is off)"""
+        if not self.response_cache:
+            return None
+        return ResponseCache.make_key(self.model, self._prompt_hash, content)
+    
+    async def _extract_async(self, content: str, name: str) -> Dict[str, Any]:
+        """
+        Send one page to OpenAI and parse the JSON it returns (shared by every real-time path)
         
-        # CREATE CLEANING PROMPT
-        prompt = self._create_cleaning_prompt(cleaned_markdown)
+        Failures are logged here and re-raised for the caller to skip or propagate.
+        """
+        # EXACT (MODEL, PROMPT, CONTENT) MATCH FROM ANY EARLIER RUN
+        response_key = self._response_key(content)
+        if response_key:
+            cached = self.response_cache.get(response_key)
+            if cached is not None:
+                logger.info("🗄️  CACHE HIT: %s", name)
+                return cached
         
         try:
             # CALL OPENAI TO CLEAN THE DATA
-            print("SENDING TO OPENAI FOR CLEANING...")
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert data cleaning agent specializing in technical document processing."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.0,  # ZERO TEMPERATURE FOR DETERMINISTIC OUTPUT
-                max_tokens=self.max_tokens
-            )
+            logger.info("SENDING %s TO OPENAI FOR CLEANING...", name)
+            async with self._api_slot():
+                response = await self.aclient.chat.completions.create(**self._create_completion_request(content))
             
             # EXTRACT AND PARSE JSON RESPONSE
             json_content = response.choices[0].message.content
             if not json_content:
                 raise ValueError("Empty response from OpenAI")
-            cleaned_data = json.loads(json_content)
-            
-            # CONVERT TO STRUCTURED FORMAT
-            tables = []
-            for i, table_data in enumerate(cleaned_data.get("tables", [])):
-                table = ProcessedTable(
-                    table_id=table_data.get("table_id", f"table_{i+1}"),
-                    title=table_data.get("title", ""),
-                    description=table_data.get("description", ""),
-                    columns=table_data.get("columns", []),
-                    rows=table_data.get("rows", []),
-                    metadata=table_data.get("metadata", {})
-                )
-                tables.append(table)
-            
-            # CREATE PROCESSED PAGE
-            processed_page = ProcessedPage(
-                page_id=file_path.stem,
-                title=cleaned_data.get("title", file_path.stem),
-                summary=cleaned_data.get("summary", ""),
-                keywords=cleaned_data.get("keywords", []),
-                tables=tables,
-                raw_content=cleaned_markdown,
-                processing_metadata={
-                    "source_file": str(file_path),
-                    "processed_at": datetime.now().isoformat(),
-                    "model_used": self.model,
-                    "tables_found": len(tables)
-                }
-            )
+            cleaned_data = jsonio.loads(json_content)
             
-            print(f"✅ CLEANED: {len(tables)} tables, {len(cleaned_data.get('keywords', []))} keywords")
-            return processed_page
+            if response_key:
+                self.response_cache.set(response_key, cleaned_data)
+            return cleaned_data
             
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON PARSING ERROR: {e}")
-            print(f"RAW RESPONSE: {response.choices[0].message.content}")
-            print(f"   Skipping page {file_path.name} due to JSON parsing error")
-            return None  # Return None instead of raising to allow pipeline to continue
+        except jsonio.JSONDecodeError as e:
+            logger.error("❌ JSON PARSING ERROR: %s", e)
+            logger.error("RAW RESPONSE: %s", json_content)
+            raise
         except Exception as e:
             # Check if this is a "no content" response from OpenAI
             if "no markdown content provided" in str(e) or "no content" in str(e).lower():
-                print(f"⚠️  SKIPPED: {file_path.name} (empty content - no meaningful data to extract)")
+                logger.warning("⚠️  SKIPPED: %s (empty content - no meaningful data to extract)", name)
             else:
-                print(f"❌ PROCESSING ERROR: {e}")
-            print(f"   Skipping page {file_path.name} due to error")
-            return None  # Return None instead of raising to allow pipeline to continue
+                logger.error("❌ PROCESSING ERROR: %s", e)
+            raise
     
     def process(self, markdown_content: str, filename: str = "document.md") -> Optional[ProcessedPage]:
         """
         🍇 Process Markdown → JSON
         Main Jelly processing method
         """
-        # CREATE TEMP FILE FOR PROCESSING
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write(markdown_content)
-            temp_path = f.name
-        
-        try:
-            result = self.process_file(temp_path)
-            if result is None:
-                return None
-            # UPDATE FILENAME IN RESULT
-            result.page_id = Path(filename).stem
-            result.processing_metadata["original_filename"] = filename
-            return result
-        finally:
-            # CLEAN UP TEMP FILE
-            import os
-            os.unlink(temp_path)
+        # PROCESS THE STRING DIRECTLY, NAMED AFTER THE ORIGINAL FILE
+        # (NO FILE BACKS THIS CONTENT, SO THE PAGE KEEPS ITS raw_content)
+        result = self._runner.run(self._process_markdown_async(markdown_content, Path(filename), keep_raw_content=True))
+        if result is None:
+            return None
+        result.processing_metadata["original_filename"] = filename
+        return result
     
     def process_async(self, markdown_file_path: str) -> Optional[ProcessedPage]:
         """
         🍇 Async Process markdown file → JSON
         Async Jelly processing method
         """
-        return asyncio.run(self.process_file_async(markdown_file_path))
+        return self._runner.run(self.process_file_async(markdown_file_path))
     
     def process_file(self, markdown_file_path: str) -> Optional[ProcessedPage]:
         """Synchronous wrapper for file processing"""
-        return asyncio.run(self.process_file_async(markdown_file_path))
+        return self._runner.run(self.process_file_async(markdown_file_path))
     
-    def process_folder(self, folder_path: str, output_file: Optional[str] = None) -> List[ProcessedPage]:
+    def process_folder(self, folder_path: str, output_file: Optional[str] = None, use_batch: bool = False, poll_interval: int = 30) -> List[ProcessedPage]:
         """
         Process all markdown files in a folder
         
         Args:
             folder_path: Path to folder containing markdown files
             output_file: Optional path to save consolidated JSON output
+            use_batch: Clean through the OpenAI Batch API (folders of 4+ files)
+            poll_interval: Seconds between batch status checks
             
         Returns:
             List[ProcessedPage]: All processed pages
@@ -262,42 +1065,14 @@ JSON OUTPUT:"""
             raise FileNotFoundError(f"Folder not found: {folder_path}")
         
         # FIND ALL MARKDOWN FILES
-        md_files = list(folder.glob("*.md"))
+        md_files = _list_markdown_files(folder)
         if not md_files:
             raise ValueError(f"No markdown files found in: {folder_path}")
         
-        print(f"FOUND {len(md_files)} MARKDOWN FILES TO PROCESS")
+        logger.info("FOUND %s MARKDOWN FILES TO PROCESS", len(md_files))
         
-        # PROCESS EACH FILE
-        processed_pages = []
-        skipped_pages = []
-        for md_file in sorted(md_files):
-            try:
-                processed_page = self.process_file(str(md_file))
-                if processed_page is None:
-                    # Page was skipped due to error
-                    skipped_pages.append({
-                        "filename": md_file.name,
-                        "error": "Processing failed - page skipped",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    print(f"⚠️  SKIPPED: {md_file.name} (processing failed)")
-                    continue
-                    
-                processed_pages.append(processed_page)
-                
-                # SAVE EACH PROCESSED PAGE IMMEDIATELY (PAGE-WISE SAVING)
-                self._save_single_processed_page(processed_page, Path(folder_path), Path(folder_path).name)
-                
-                print(f"✅ PROCESSED AND SAVED: {md_file.name}")
-            except Exception as e:
-                print(f"❌ FAILED TO PROCESS {md_file.name}: {e}")
-                skipped_pages.append({
-                    "filename": md_file.name,
-                    "error": str(e),
-                    "timestamp": datetime.now().isoformat()
-                })
-                continue
+        # CLEAN ALL FILES (CONCURRENTLY OR AS ONE BATCH), SAVING EACH PAGE AS IT ARRIVES
+        processed_pages, skipped_pages = self._clean_and_save_files(md_files, folder, folder.name, use_batch, poll_interval)
         
         # SAVE CONSOLIDATED OUTPUT IF REQUESTED
         if output_file:
@@ -306,11 +1081,19 @@ JSON OUTPUT:"""
         # UPDATE DOCUMENT METADATA
         self._update_document_metadata_cleaning(folder, "cleaning", processed_pages, skipped_pages)
         
-        print(f"🎉 SUCCESSFULLY PROCESSED {len(processed_pages)}/{len(md_files)} FILES")
+        logger.info("🎉 SUCCESSFULLY PROCESSED %s/%s FILES", len(processed_pages), len(md_files))
         return processed_pages
     
-    def _save_processed_data(self, processed_pages: List[ProcessedPage], output_file: str):
-        """Save processed data to JSON file"""
+    def process_folder_batch(self, folder_path: str, output_file: Optional[str] = None, poll_interval: int = 30) -> List[ProcessedPage]:
+        """
+        🍇 Process folder → JSON pages via the OpenAI Batch API
+        Half the token cost of process_folder, but results can take up to 24h;
+        folders with fewer than 4 files are cleaned in real time instead
+        """
+        return self.process_folder(folder_path, output_file, use_batch=True, poll_interval=poll_interval)
+    
+    def _save_processed_data(self, processed_pages: List[ProcessedPage], output_file: str, encoded_pages: Optional[List[str]] = None):
+        """Save processed data to JSON file (reusing each page's JSON if already encoded)"""
         output_path = Path(output_file)
         
         # VALIDATE THAT OUTPUT_PATH IS A FILE PATH, NOT A DIRECTORY
@@ -324,17 +1107,18 @@ JSON OUTPUT:"""
         data = {
             "processed_at": datetime.now().isoformat(),
             "total_pages": len(processed_pages),
-            "total_tables": sum(len(page.tables) for page in processed_pages),
-            "pages": [asdict(page) for page in processed_pages]
+            "total_tables": sum(len(page.tables) for page in processed_pages)
         }
         
         # SAVE TO JSON
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if encoded_pages is not None:
+            _write_json_with_pages(output_path, data, encoded_pages)
+        else:
+            write_json(output_path, {**data, "pages": processed_pages})  # DATACLASSES SERIALIZE DIRECTLY, WITHOUT AN asdict COPY
         
-        print(f"💾 SAVED PROCESSED DATA: {output_path}")
-        print(f"   - {data['total_pages']} pages")
-        print(f"   - {data['total_tables']} tables total")
+        logger.info("💾 SAVED PROCESSED DATA: %s", output_path)
+        logger.info("   - %s pages", data['total_pages'])
+        logger.info("   - %s tables total", data['total_tables'])
 
     async def process_enhanced_document_async(self, enhanced_doc) -> ProcessedPage:
         """
@@ -346,118 +1130,65 @@ JSON OUTPUT:"""
         Returns:
             ProcessedPage: Cleaned and standardized data
         """
-        print(f"PROCESSING ENHANCED DOCUMENT: {enhanced_doc.filename}")
+        logger.info("PROCESSING ENHANCED DOCUMENT: %s", enhanced_doc.filename)
+        content_to_process, enhancement_applied = self._select_enhanced_content(enhanced_doc)
         
-        # SAFETY CHECK: DETECT HTML COMMENTS IN ENHANCED CONTENT
-        if '<!--' in enhanced_doc.enhanced_content and '-->' in enhanced_doc.enhanced_content:
-            print(f"⚠️  WARNING: HTML comments detected in enhanced content for {enhanced_doc.filename}")
-            print(f"   Falling back to original content to preserve data integrity")
-            print(f"   HTML comment found: {enhanced_doc.enhanced_content[enhanced_doc.enhanced_content.find('<!--'):enhanced_doc.enhanced_content.find('<!--')+100]}...")
-            # USE ORIGINAL CONTENT INSTEAD OF ENHANCED
-            content_to_process = enhanced_doc.original_content
-            enhancement_applied = False
-        else:
-            content_to_process = enhanced_doc.enhanced_content
-            enhancement_applied = True
-        
-        # USE ENHANCED CONTENT FOR EXTRACTION
-        prompt = self._create_cleaning_prompt(content_to_process)
-        
-        try:
-            # CALL OPENAI TO CLEAN THE ENHANCED DATA
-            print("SENDING ENHANCED CONTENT TO OPENAI FOR CLEANING...")
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert data cleaning agent specializing in technical document processing."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.0,  # ZERO TEMPERATURE FOR DETERMINISTIC OUTPUT
-                max_tokens=self.max_tokens   # STANDARD LIMIT FOR SINGLE DOCUMENT
-            )
-            
-            # EXTRACT AND PARSE JSON RESPONSE
-            json_content = response.choices[0].message.content
-            if not json_content:
-                raise ValueError("Empty response from OpenAI")
-            cleaned_data = json.loads(json_content)
-            
-            # CONVERT TO STRUCTURED FORMAT
-            tables = []
-            for i, table_data in enumerate(cleaned_data.get("tables", [])):
-                table = ProcessedTable(
-                    table_id=table_data.get("table_id", f"table_{i+1}"),
-                    title=table_data.get("title", ""),
-                    description=table_data.get("description", ""),
-                    columns=table_data.get("columns", []),
-                    rows=table_data.get("rows", []),
-                    metadata=table_data.get("metadata", {})
-                )
-                tables.append(table)
-            
-            # CREATE PROCESSED PAGE WITH ENHANCEMENT INFO
-            processed_page = ProcessedPage(
-                page_id=Path(enhanced_doc.filename).stem,
-                title=cleaned_data.get("title", Path(enhanced_doc.filename).stem),
-                summary=cleaned_data.get("summary", ""),
-                keywords=cleaned_data.get("keywords", []),
-                tables=tables,
-                raw_content=content_to_process,  # STORE ENHANCED VERSION
-                processing_metadata={
-                    "source_file": enhanced_doc.filename,
-                    "processed_at": datetime.now().isoformat(),
-                    "model_used": self.model,
-                    "tables_found": len(tables),
-                    "enhancement_applied": enhancement_applied,
-                    "enhancement_notes": enhanced_doc.enhancement_notes,
-                    "original_preserved": True,  # ORIGINAL CONTENT AVAILABLE AS BACKUP
-                    "data_integrity": "Enhanced content with all data preserved"
-                }
-            )
-            
-            print(f"✅ ENHANCED-PROCESSED: {len(tables)} tables, {len(cleaned_data.get('keywords', []))} keywords")
-            print(f"   📊 Using enhanced content with improved structure")
-            print(f"   🔧 Structure enhancements: {len(enhanced_doc.enhancement_notes)}")
-            print(f"   💾 Original content preserved as backup")
-            return processed_page
-            
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON PARSING ERROR: {e}")
-            print(f"RAW RESPONSE: {response.choices[0].message.content}")
-            raise
-        except Exception as e:
-            # Check if this is a "no content" response from OpenAI
-            if "no markdown content provided" in str(e) or "no content" in str(e).lower():
-                print(f"⚠️  SKIPPED: {enhanced_doc.filename} (empty content - no meaningful data to extract)")
-            else:
-                print(f"❌ PROCESSING ERROR: {e}")
-            raise
+        cleaned_data = await self._extract_async(content_to_process, enhanced_doc.filename)
+        return self._build_enhanced_page(enhanced_doc, content_to_process, enhancement_applied, cleaned_data)
 
     def process_enhanced_document(self, enhanced_doc) -> ProcessedPage:
         """Synchronous wrapper for enhanced document processing"""
-        return asyncio.run(self.process_enhanced_document_async(enhanced_doc))
+        return self._runner.run(self.process_enhanced_document_async(enhanced_doc))
+    
+    def _process_enhanced_documents(self, enhanced_docs: List, use_batch: bool = False, poll_interval: int = 30) -> List[Union[ProcessedPage, BaseException]]:
+        """Clean enhanced documents via the Batch API when requested and worthwhile, otherwise concurrently"""
+        # SMALL SETS ARE NOT WORTH THE BATCH TURNAROUND
+        if use_batch and len(enhanced_docs) >= BATCH_MIN_DOCUMENTS:
+            try:
+                selected = [self._select_enhanced_content(enhanced_doc) for enhanced_doc in enhanced_docs]
+                results = self._clean_batch([content for content, _ in selected], poll_interval)
+            except Exception as e:
+                logger.error("❌ BATCH CLEANING FAILED: %s", e)
+                logger.warning("⚠️  Falling back to real-time cleaning")
+            else:
+                return [
+                    self._build_enhanced_page(enhanced_doc, content, enhancement_applied, cleaned_data)
+                    if cleaned_data is not None else RuntimeError("Batch request failed")
+                    for enhanced_doc, (content, enhancement_applied), cleaned_data in zip(enhanced_docs, selected, results)
+                ]
+        
+        async def process_all():
+            return await asyncio.gather(
+                *[self.process_enhanced_document_async(enhanced_doc) for enhanced_doc in enhanced_docs],
+                return_exceptions=True
+            )
+        return self._runner.run(process_all())
 
-    def process_enhanced_documents(self, enhanced_docs: List, output_file: Optional[str] = None) -> List[ProcessedPage]:
+    def process_enhanced_documents(self, enhanced_docs: List, output_file: Optional[str] = None, use_batch: bool = False, poll_interval: int = 30) -> List[ProcessedPage]:
         """
         Process a list of enhanced documents with dual content approach
         
         Args:
             enhanced_docs: List of EnhancedDocument objects
             output_file: Optional path to save consolidated JSON output
+            use_batch: Clean through the OpenAI Batch API (4+ documents)
+            poll_interval: Seconds between batch status checks
             
         Returns:
             List[ProcessedPage]: All processed pages with data integrity
         """
-        print(f"PROCESSING {len(enhanced_docs)} ENHANCED DOCUMENTS WITH DUAL APPROACH")
+        logger.info("PROCESSING %s ENHANCED DOCUMENTS WITH DUAL APPROACH", len(enhanced_docs))
+        
+        # CLEAN ALL ENHANCED DOCUMENTS (CONCURRENTLY OR AS ONE BATCH)
+        results = self._process_enhanced_documents(enhanced_docs, use_batch, poll_interval)
         
-        # PROCESS EACH ENHANCED DOCUMENT AND SAVE IMMEDIATELY
+        # RECORD AND SAVE EACH PAGE IN INPUT ORDER, KEEPING ITS JSON FOR THE CONSOLIDATED FILE
         processed_pages = []
-        for enhanced_doc in enhanced_docs:
+        encoded_pages = []
+        for enhanced_doc, processed_page in zip(enhanced_docs, results):
             try:
-                processed_page = self.process_enhanced_document(enhanced_doc)
+                if isinstance(processed_page, BaseException):
+                    raise processed_page
                 processed_pages.append(processed_page)
                 
                 # SAVE EACH PROCESSED PAGE IMMEDIATELY (PAGE-WISE SAVING)
@@ -468,25 +1199,28 @@ JSON OUTPUT:"""
                     output_dir.mkdir(parents=True, exist_ok=True)
                     # Save individual page with proper file extension
                     page_file = output_dir / f"{processed_page.page_id}.json"
+                    page_json = jsonio.dumps(processed_page, indent=True)
                     with open(page_file, 'w', encoding='utf-8') as f:
-                        json.dump(asdict(processed_page), f, indent=2, ensure_ascii=False)
-                    print(f"✅ PROCESSED AND SAVED: {enhanced_doc.filename}")
+                        f.write(page_json)
+                    encoded_pages.append(page_json)
+                    logger.info("✅ PROCESSED AND SAVED: %s", enhanced_doc.filename)
                 
             except Exception as e:
-                print(f"⚠️  FAILED TO PROCESS {enhanced_doc.filename}: {e}")
+                logger.warning("⚠️  FAILED TO PROCESS %s: %s", enhanced_doc.filename, e)
                 continue
         
         # SAVE CONSOLIDATED OUTPUT IF REQUESTED
         if output_file:
-            self._save_processed_data(processed_pages, output_file)
+            self._save_processed_data(processed_pages, output_file, encoded_pages)
         
-        print(f"🎉 SUCCESSFULLY PROCESSED AND SAVED {len(processed_pages)}/{len(enhanced_docs)} ENHANCED DOCUMENTS")
+        logger.info("🎉 SUCCESSFULLY PROCESSED AND SAVED %s/%s ENHANCED DOCUMENTS", len(processed_pages), len(enhanced_docs))
         return processed_pages
 
-    def _process_document_folder(self, document_folder_path: str, skip_butter: bool = False) -> List[ProcessedPage]:
+    def _process_document_folder(self, document_folder_path: str, skip_butter: bool = False, toast: Optional[Toast] = None) -> List[ProcessedPage]:
         """
         🍇 INTERNAL: Process document folder → JSON pages  
         Internal pipeline method - not intended for direct user calls
+        With toast, final_output.json is written already converted to row-based tables
         """
         doc_folder = Path(document_folder_path)
         if not doc_folder.exists():
@@ -495,7 +1229,7 @@ JSON OUTPUT:"""
         # Decide which markdown folder to use
         if skip_butter:
             md_folder = doc_folder / "01_parsed_markdown"
-            print(f"⏩ SKIP BUTTER ENABLED: Using raw markdown from {md_folder}")
+            logger.info("⏩ SKIP BUTTER ENABLED: Using raw markdown from %s", md_folder)
         else:
             md_folder = doc_folder / "02_enhanced_markdown"
         if not md_folder.exists():
@@ -506,54 +1240,56 @@ JSON OUTPUT:"""
         cleaned_json_folder.mkdir(exist_ok=True)
         
         # FIND ALL MARKDOWN FILES
-        md_files = list(md_folder.glob("*.md"))
+        md_files = _list_markdown_files(md_folder)
         if not md_files:
             raise ValueError(f"No markdown files found in: {md_folder}")
         
-        print(f"FOUND {len(md_files)} MARKDOWN FILES TO PROCESS IN DOCUMENT FOLDER ({md_folder.name})")
+        logger.info("FOUND %s MARKDOWN FILES TO PROCESS IN DOCUMENT FOLDER (%s)", len(md_files), md_folder.name)
         
-        # PROCESS EACH FILE AND SAVE IMMEDIATELY
-        processed_pages = []
-        skipped_pages = []
-        for md_file in sorted(md_files):
-            try:
-                processed_page = self.process_file(str(md_file))
-                if processed_page is None:
-                    # Page was skipped due to error
-                    skipped_pages.append({
-                        "filename": md_file.name,
-                        "error": "Processing failed - page skipped",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    print(f"⚠️  SKIPPED: {md_file.name} (processing failed)")
-                    continue
-                    
-                processed_pages.append(processed_page)
-                
-                # SAVE EACH PROCESSED PAGE IMMEDIATELY (PAGE-WISE SAVING)
-                self._save_single_processed_page(processed_page, cleaned_json_folder, doc_folder.name)
-                
-                print(f"✅ PROCESSED AND SAVED: {md_file.name}")
-            except Exception as e:
-                print(f"❌ FAILED TO PROCESS {md_file.name}: {e}")
-                skipped_pages.append({
-                    "filename": md_file.name,
-                    "error": str(e),
-                    "timestamp": datetime.now().isoformat()
-                })
-                continue
+        # CLEAN ALL FILES (CONCURRENTLY OR AS ONE BATCH), SAVING EACH PAGE AS IT ARRIVES
+        processed_pages, skipped_pages = self._clean_and_save_files(md_files, cleaned_json_folder, doc_folder.name, self.use_batch_api)
+        
+        self._finish_document_folder(doc_folder, md_files, processed_pages, skipped_pages, toast)
+        return processed_pages
+    
+    def _process_streamed_document_folder(self, document_folder_path: str, cleaned: Dict[Path, Union[Optional[ProcessedPage], BaseException]], toast: Optional[Toast] = None) -> List[ProcessedPage]:
+        """
+        🍇 INTERNAL: Finish stage 3 for pages already cleaned while Butter was still running
+        Any enhanced file that did not arrive through the stream is cleaned now
+        """
+        doc_folder = Path(document_folder_path)
+        md_folder = doc_folder / "02_enhanced_markdown"
+        cleaned_json_folder = doc_folder / "03_cleaned_json"
+        
+        md_files = _list_markdown_files(md_folder)
+        if not md_files:
+            raise ValueError(f"No markdown files found in: {md_folder}")
+        
+        missing = [md_file for md_file in md_files if md_file not in cleaned]
+        if missing:
+            logger.info("CLEANING %s ENHANCED FILES NOT SEEN DURING ENHANCEMENT", len(missing))
+            cleaned = dict(cleaned)
+            results = self._process_and_save_files(missing, cleaned_json_folder, doc_folder.name)
+            cleaned.update(zip(missing, results))
+        
+        processed_pages, skipped_pages = self._collect_results(md_files, [cleaned[md_file] for md_file in md_files])
+        self._finish_document_folder(doc_folder, md_files, processed_pages, skipped_pages, toast)
+        return processed_pages
+    
+    def _finish_document_folder(self, doc_folder: Path, md_files: List[Path], processed_pages: List[ProcessedPage], skipped_pages: List[Dict[str, Any]], toast: Optional[Toast] = None):
+        """Write the combined output and metadata once every page of a document is cleaned"""
+        cleaned_json_folder = doc_folder / "03_cleaned_json"
         
         # CREATE FINAL COMBINED OUTPUT
         final_output_file = doc_folder / "final_output.json"
-        self._save_final_combined_output(processed_pages, final_output_file)
+        self._save_final_combined_output(processed_pages, final_output_file, toast)
         
         # UPDATE DOCUMENT METADATA
         self._update_document_metadata_cleaning(doc_folder, "cleaning", processed_pages, skipped_pages)
         
-        print(f"🎉 STAGE 3 COMPLETE - PROCESSED {len(processed_pages)}/{len(md_files)} FILES")
-        print(f"   📄 Individual JSON files saved in: {cleaned_json_folder}")
-        print(f"   📋 Final combined output: {final_output_file}")
-        return processed_pages
+        logger.info("🎉 STAGE 3 COMPLETE - PROCESSED %s/%s FILES", len(processed_pages), len(md_files))
+        logger.info("   📄 Individual JSON files saved in: %s", cleaned_json_folder)
+        logger.info("   📋 Final combined output: %s", final_output_file)
 
     def _save_single_processed_page(self, processed_page: ProcessedPage, output_folder: Path, document_id: str):
         """Save a single processed page as JSON immediately after processing"""
@@ -563,29 +1299,33 @@ JSON OUTPUT:"""
         processed_page.processing_metadata["document_id"] = document_id
         processed_page.processing_metadata["stage"] = "03_cleaned_json"
         
-        # CONVERT TO SERIALIZABLE FORMAT
-        page_data = asdict(processed_page)
+        # SAVE INDIVIDUAL JSON FILE, RECORDING WHICH MARKDOWN IT WAS BUILT FROM
+        write_json(output_file, processed_page)
+        if processed_page.raw_content_path:
+            record_source(output_file, processed_page.raw_content_path)
         
-        # SAVE INDIVIDUAL JSON FILE
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(page_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"SAVED CLEANED PAGE JSON: {output_file}")
+        logger.info("SAVED CLEANED PAGE JSON: %s", output_file)
 
-    def _save_final_combined_output(self, processed_pages: List[ProcessedPage], output_file: Path):
-        """Save the final combined JSON output for the entire document"""
+    def _save_final_combined_output(self, processed_pages: List[ProcessedPage], output_file: Path, toast: Optional[Toast] = None):
+        """
+        Save the final combined JSON output for the entire document
+        
+        With toast, each page's tables are converted to row-based form as the page
+        is written, so the file never has to be read back and rewritten by Stage 4.
+        """
         # CREATE COMPREHENSIVE FINAL OUTPUT
+        keywords = _unique_keywords(processed_pages)
         final_data = {
             "document_info": {
                 "document_id": processed_pages[0].processing_metadata.get("document_id", "unknown") if processed_pages else "unknown",
                 "processed_at": datetime.now().isoformat(),
                 "total_pages": len(processed_pages),
                 "total_tables": sum(len(page.tables) for page in processed_pages),
-                "total_keywords": len(set().union(*[page.keywords for page in processed_pages])) if processed_pages else 0,
+                "total_keywords": len(keywords),
                 "processing_pipeline": ["01_parsed_markdown", "02_enhanced_markdown", "03_cleaned_json"]
             },
             "document_summary": {
-                "combined_keywords": list(set().union(*[page.keywords for page in processed_pages])) if processed_pages else [],
+                "combined_keywords": list(keywords),
                 "page_titles": [page.title for page in processed_pages],
                 "table_summary": [
                     {
@@ -596,26 +1336,28 @@ JSON OUTPUT:"""
                     }
                     for page in processed_pages
                 ]
-            },
-            "pages": [asdict(page) for page in processed_pages]
+            }
         }
         
-        # SAVE FINAL COMBINED OUTPUT
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(final_data, f, indent=2, ensure_ascii=False)
+        # SAVE FINAL COMBINED OUTPUT, ENCODING ONE PAGE AT A TIME RATHER THAN THE WHOLE DOCUMENT AT ONCE
+        if toast is None:
+            encoded_pages = (jsonio.dumps(page, indent=True) for page in processed_pages)
+        else:
+            final_data["toast_info"] = toast.toast_info()
+            encoded_pages = (jsonio.dumps(toast.convert_page(_page_dict(page)), indent=True) for page in processed_pages)
+        _write_json_with_pages(output_file, final_data, encoded_pages)
         
-        print(f"💾 SAVED FINAL COMBINED OUTPUT: {output_file}")
-        print(f"   📊 {final_data['document_info']['total_pages']} pages")
-        print(f"   📋 {final_data['document_info']['total_tables']} tables total")
-        print(f"   🔍 {final_data['document_info']['total_keywords']} unique keywords")
+        logger.info("💾 SAVED FINAL COMBINED OUTPUT: %s", output_file)
+        logger.info("   📊 %s pages", final_data['document_info']['total_pages'])
+        logger.info("   📋 %s tables total", final_data['document_info']['total_tables'])
+        logger.info("   🔍 %s unique keywords", final_data['document_info']['total_keywords'])
 
     def _update_document_metadata_cleaning(self, doc_folder: Path, stage: str, processed_pages: List[ProcessedPage], skipped_pages: List[Dict]):
         """Update the document metadata with cleaning stage info"""
         metadata_file = doc_folder / "document_metadata.json"
         
         if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = read_json(metadata_file)
             
             # ENSURE stages_completed FIELD EXISTS
             if "stages_completed" not in metadata:
@@ -630,7 +1372,7 @@ JSON OUTPUT:"""
                 "processed_at": datetime.now().isoformat(),
                 "pages_processed": len(processed_pages),
                 "total_tables_extracted": sum(len(page.tables) for page in processed_pages),
-                "unique_keywords": len(set().union(*[page.keywords for page in processed_pages])) if processed_pages else 0,
+                "unique_keywords": len(_unique_keywords(processed_pages)),
                 "processing_summary": {
                     page.page_id: {
                         "title": page.title,
@@ -647,13 +1389,12 @@ JSON OUTPUT:"""
             metadata["final_output_ready"] = True
             
             # SAVE UPDATED METADATA
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            write_json(metadata_file, metadata)
             
-            print(f"UPDATED DOCUMENT METADATA: {metadata_file}")
-            print(f"🎉 PIPELINE COMPLETE - ALL STAGES FINISHED")
+            logger.info("UPDATED DOCUMENT METADATA: %s", metadata_file)
+            logger.info("🎉 PIPELINE COMPLETE - ALL STAGES FINISHED")
         else:
-            print(f"WARNING: No metadata file found at {metadata_file}")
+            logger.warning("WARNING: No metadata file found at %s", metadata_file)
 
     def _strip_butter_metadata(self, markdown_content: str) -> str:
         """
@@ -0,0 +1,81 @@
+"""
+📄 JSON I/O - Fast JSON Reading And Writing
+===========================================
+
+Uses orjson when it is installed (pip install "pbj-pipeline[fast]") and falls
+back to the standard library json module otherwise. Output is always UTF-8
+with non-ASCII characters kept as-is. Dataclass instances serialize directly
+(no dataclasses.asdict deep copy needed) with either backend.
+"""
+
+import os
+import json
+import mmap
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # OPTIONAL SPEEDUP
+    orjson = None
+
+# ORJSON'S DECODE ERROR SUBCLASSES THIS ONE, SO A SINGLE except COVERS BOTH BACKENDS
+JSONDecodeError = json.JSONDecodeError
+
+
+def _default(obj: Any) -> Any:
+    """Serialize dataclasses for the stdlib backend one level at a time (no deep copy)"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string (two-space indented if indent is True)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=_default)
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file"""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def read_json_mapped(path: Union[str, Path]) -> Any:
+    """
+    Read and parse a JSON file through a read-only memory map
+    
+    With orjson the mapped pages are parsed in place, so large files are
+    never copied into a bytes object first; the stdlib backend reads normally.
+    """
+    if orjson is None:
+        return read_json(path)
+    
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if os.fstat(fd).st_size == 0:
+            return loads(b"")  # mmap CANNOT MAP AN EMPTY FILE; LET THE PARSER RAISE
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()  # THE MAP CANNOT CLOSE WHILE A VIEW IS EXPORTED
+    finally:
+        os.close(fd)
+
+
+def write_json(path: Union[str, Path], obj: Any, indent: bool = True):
+    """Serialize to a JSON file"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(obj, indent=indent))
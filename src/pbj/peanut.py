@@ -7,17 +7,114 @@ and returns clean markdown documents optimized for technical and table-heavy con
 """
 
 import os
-import json
+import logging
+import random
+import shutil
 import asyncio
+import hashlib
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Mapping, Union
 from dataclasses import dataclass
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 from llama_parse import LlamaParse, ResultType
 
 # IMPORT OUR CONFIGURATION SYSTEM
 from .config import PipelineConfig, create_config
+from .jsonio import read_json, write_json
+from .aio import LoopRunner
+from .cache import file_hash
+
+logger = logging.getLogger(__name__)
+
+# HTTP STATUSES AND ERROR TEXT THAT MEAN "TRY AGAIN LATER" RATHER THAN "THIS PDF FAILED"
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_RETRYABLE_MESSAGES = ("rate limit", "quota", "too many requests", "429", "503")
+
+
+# CHARACTERS PER WRITE WHEN SAVING MARKDOWN, SO A LARGE PAGE IS NEVER ENCODED IN ONE PIECE
+_WRITE_CHUNK_CHARS = 1 << 20
+
+# EVERY PDF FILE STARTS WITH THIS HEADER
+_PDF_MAGIC = b"%PDF-"
+
+# UPPER BOUND ON THREADS WRITING ONE DOCUMENT'S FILES
+_SAVE_WORKERS = 8
+
+# PANTRY OF PROMPT FILES SHIPPED WITH THE PACKAGE
+_PANTRY_PATH = Path(__file__).parent / "pantry"
+
+
+@lru_cache(maxsize=4)
+def _load_pantry_prompts(pantry_path: Path) -> Mapping[str, str]:
+    """
+    Read the LlamaParse prompts once per process (prompts do not change while running)
+    
+    Returns a read-only mapping because every Peanut shares the cached result.
+    """
+    system_prompt_path = pantry_path / "pea.txt"
+    user_prompt_path = pantry_path / "nut.txt"
+    
+    # CHECK IF FILES EXIST
+    if not system_prompt_path.exists():
+        raise FileNotFoundError(f"System prompt file not found: {system_prompt_path}")
+    if not user_prompt_path.exists():
+        raise FileNotFoundError(f"User prompt file not found: {user_prompt_path}")
+    
+    # LOAD PROMPTS FROM SIMPLE TEXT FILES
+    with open(system_prompt_path, 'r', encoding='utf-8') as f:
+        system_prompt = f.read().strip()
+    
+    with open(user_prompt_path, 'r', encoding='utf-8') as f:
+        user_prompt = f.read().strip()
+    
+    return MappingProxyType({
+        'system_prompt': system_prompt,
+        'user_prompt': user_prompt
+    })
+
+
+def _copy_source_pdf(source: Union[str, Path], dest: Path, hardlink: bool = False):
+    """Place the source PDF in the output folder without copying metadata"""
+    if hardlink:
+        try:
+            if dest.exists():
+                dest.unlink()
+            os.link(source, dest)
+            return
+        except OSError:
+            pass  # DIFFERENT FILESYSTEM OR NO LINK SUPPORT: COPY INSTEAD
+    # copyfile USES THE KERNEL FAST PATH (sendfile / fcopyfile / CopyFileW) AND SKIPS copystat
+    shutil.copyfile(source, dest)
+
+
+def _part_filenames(stem: str, count: int) -> List[str]:
+    """Markdown filenames for the parts of one PDF (a single part keeps the plain stem)"""
+    if count == 1:
+        return [stem + ".md"]
+    part_name = (stem + "_part_{}.md").format
+    return [part_name(i) for i in range(1, count + 1)]
+
+
+def _write_markdown(file_path: Union[str, Path], content: str):
+    """Write markdown in chunks (encoded 1M characters at a time)"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for start in range(0, len(content), _WRITE_CHUNK_CHARS):
+            f.write(content[start:start + _WRITE_CHUNK_CHARS])
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a LlamaParse error is transient (throttling or a server error)"""
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status_code in _RETRYABLE_STATUS_CODES:
+        return True
+    message = str(error).lower()
+    return any(text in message for text in _RETRYABLE_MESSAGES)
+
 
 @dataclass
 class ParsedDocument:
@@ -57,10 +154,26 @@ class Peanut:
         # LOAD PROMPTS FROM CONFIG FILE
         prompts = self._load_prompts()
         
+        # EVERYTHING BESIDES THE PDF THAT SHAPES LLAMAPARSE'S OUTPUT, FOR PARSE CACHE KEYS
+        self._settings_hash = hashlib.sha256("\0".join([
+            prompts['system_prompt'],
+            prompts['user_prompt'],
+            str(self.config.use_premium_mode),
+            self.config.page_separator
+        ]).encode("utf-8")).hexdigest()[:16]
+        
         # VALIDATE API KEY BEFORE CREATING PARSER
         if not self.config.llamaparse_api_key:
             raise ValueError("LlamaParse API key is required but not found in configuration")
         
+        # ONE EVENT LOOP FOR THE LIFETIME OF THIS INSTANCE INSTEAD OF ONE PER PDF, AND ONE
+        # CONNECTION POOL ON IT FOR EVERY UPLOAD AND STATUS POLL (AN ASYNC POOL BELONGS TO
+        # THE LOOP THAT OPENED ITS CONNECTIONS, SO IT IS NOT SHARED BETWEEN PEANUTS)
+        self._runner = LoopRunner()
+        self._async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+        
         # CONFIGURE LLAMAPARSE WITH OPTIMIZED SETTINGS FOR TECHNICAL DOCUMENTS
         # USING NEW API PARAMETERS INSTEAD OF DEPRECATED parsing_instruction
         self.parser = LlamaParse(
@@ -90,35 +203,73 @@ class Peanut:
             skip_diagonal_text=False,  # DON'T SKIP DIAGONAL TEXT THAT MIGHT BE CHECKMARKS
             
             max_timeout=self.config.max_timeout,  # CONFIGURABLE TIMEOUT
+            custom_client=self._async_http_client  # REUSE CONNECTIONS ACROSS PDFS
         )
         
         # STORE MODE FOR REPORTING
         self.use_premium = self.config.use_premium_mode
     
-    def _load_prompts(self):
+    def _load_prompts(self) -> Mapping[str, str]:
         """Load prompts from pantry - much cleaner approach"""
-        # GET PANTRY PATH RELATIVE TO THIS MODULE
-        pantry_path = Path(__file__).parent / "pantry"
-        system_prompt_path = pantry_path / "pea.txt"
-        user_prompt_path = pantry_path / "nut.txt"
-        
-        # CHECK IF FILES EXIST
-        if not system_prompt_path.exists():
-            raise FileNotFoundError(f"System prompt file not found: {system_prompt_path}")
-        if not user_prompt_path.exists():
-            raise FileNotFoundError(f"User prompt file not found: {user_prompt_path}")
-        
-        # LOAD PROMPTS FROM SIMPLE TEXT FILES
-        with open(system_prompt_path, 'r', encoding='utf-8') as f:
-            system_prompt = f.read().strip()
-        
-        with open(user_prompt_path, 'r', encoding='utf-8') as f:
-            user_prompt = f.read().strip()
+        return _load_pantry_prompts(_PANTRY_PATH)
+    
+    def _check_pdf_file(self, pdf_file: Path):
+        """Raise ValueError for an empty, oversize or non-PDF file"""
+        size = pdf_file.stat().st_size
+        if size == 0:
+            raise ValueError(f"PDF file is empty: {pdf_file}")
+        if size > self.config.max_pdf_bytes:
+            raise ValueError(
+                f"PDF file is {size} bytes, over the {self.config.max_pdf_bytes} byte limit "
+                f"(max_pdf_bytes): {pdf_file}"
+            )
+        with open(pdf_file, "rb") as f:
+            if f.read(len(_PDF_MAGIC)) != _PDF_MAGIC:
+                raise ValueError(f"File does not start with a PDF header: {pdf_file}")
+    
+    def _parse_cache_path(self, pdf_file: Path) -> Optional[Path]:
+        """Cache file for this PDF's content under the current parse settings (None if caching is off)"""
+        if not self.config.parse_cache:
+            return None
+        key = f"{file_hash(pdf_file)}_{self._settings_hash}"
+        return Path(self.config.cache_dir) / "parses" / key[:2] / f"{key}.json"
+    
+    def _load_cached_parse(self, cache_path: Path, pdf_file: Path) -> Optional[List[ParsedDocument]]:
+        """Rebuild ParsedDocuments from a cached parse, or None on a miss"""
+        try:
+            entries = read_json(cache_path)
+        except (OSError, ValueError):
+            return None  # MISSING OR UNREADABLE ENTRY: PARSE AGAIN
         
-        return {
-            'system_prompt': system_prompt,
-            'user_prompt': user_prompt
-        }
+        # NAME THE PARTS AFTER THIS PDF (THE SAME CONTENT MAY HAVE BEEN CACHED UNDER ANOTHER NAME)
+        return [
+            ParsedDocument(
+                content=entry["content"],
+                filename=filename,
+                parse_timestamp=datetime.fromisoformat(entry["parse_timestamp"]),
+                parsing_time_seconds=entry["parsing_time_seconds"]
+            )
+            for entry, filename in zip(entries, _part_filenames(pdf_file.stem, len(entries)))
+        ]
+    
+    def _save_cached_parse(self, cache_path: Path, parsed_docs: List[ParsedDocument]):
+        """Store a parse atomically (write a temp file, then rename) so readers never see half a file"""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        write_json(temp_path, [
+            {
+                "content": doc.content,
+                "parse_timestamp": doc.parse_timestamp.isoformat(),
+                "parsing_time_seconds": doc.parsing_time_seconds
+            }
+            for doc in parsed_docs
+        ], indent=False)
+        os.replace(temp_path, cache_path)
+    
+    def clear_cache(self):
+        """Forget every cached parse"""
+        shutil.rmtree(Path(self.config.cache_dir) / "parses", ignore_errors=True)
+        logger.info("🗄️  CLEARED PARSE CACHE: %s", Path(self.config.cache_dir) / "parses")
     
     async def parse_pdf_async(self, pdf_path: str) -> List[ParsedDocument]:
         """
@@ -138,15 +289,26 @@ class Peanut:
         if not pdf_file.suffix.lower() == '.pdf':
             raise ValueError(f"File must be a PDF: {pdf_path}")
         
+        # REJECT FILES LLAMAPARSE WOULD FAIL ON BEFORE PAYING FOR THE UPLOAD
+        self._check_pdf_file(pdf_file)
+        
+        # UNCHANGED PDF AND SETTINGS: REUSE THE EARLIER PARSE INSTEAD OF CALLING LLAMAPARSE
+        cache_path = self._parse_cache_path(pdf_file)
+        if cache_path is not None:
+            cached_docs = self._load_cached_parse(cache_path, pdf_file)
+            if cached_docs:
+                logger.info("🗄️  PARSE CACHE HIT: %s (%s DOCUMENT(S))", pdf_file.name, len(cached_docs))
+                return cached_docs
+        
         # START PROCESSING WITH TIMING
         mode_text = "PREMIUM" if self.use_premium else "BALANCED"
-        print(f"STARTING PDF PARSING WITH {mode_text} MODE: {pdf_file.name}")
+        logger.info("STARTING PDF PARSING WITH %s MODE: %s", mode_text, pdf_file.name)
         start_time = datetime.now()
         
         try:
             # SEND PDF TO LLAMAPARSE API - LET LLAMAPARSE HANDLE ALL THE HEAVY LIFTING
-            print("SENDING PDF TO LLAMAPARSE API...")
-            documents = await self.parser.aload_data(str(pdf_file))
+            logger.info("SENDING PDF TO LLAMAPARSE API...")
+            documents = list(await self._aload_with_retry(str(pdf_file)) or ())
             
             # CHECK IF WE GOT ANY CONTENT BACK
             if not documents:
@@ -156,44 +318,99 @@ class Peanut:
             end_time = datetime.now()
             parsing_time = (end_time - start_time).total_seconds()
             
-            # CONVERT LLAMAPARSE DOCUMENTS TO OUR FORMAT
-            parsed_docs = []
-            for i, doc in enumerate(documents):
-                # CREATE PARSED DOCUMENT OBJECT
-                parsed_doc = ParsedDocument(
-                    content=doc.text,  # LLAMAPARSE ALREADY RETURNS CLEAN MARKDOWN WITH PAGE BREAKS
-                    filename=f"{pdf_file.stem}_part_{i+1}.md" if len(documents) > 1 else f"{pdf_file.stem}.md",
-                    parse_timestamp=end_time,
-                    parsing_time_seconds=parsing_time
+            # CONVERT LLAMAPARSE DOCUMENTS TO OUR FORMAT (FILENAMES AND TIMINGS COMPUTED ONCE)
+            # LLAMAPARSE ALREADY RETURNS CLEAN MARKDOWN WITH PAGE BREAKS
+            parsed_docs = [
+                ParsedDocument(doc.text, filename, end_time, parsing_time)
+                for doc, filename in zip(documents, _part_filenames(pdf_file.stem, len(documents)))
+            ]
+            
+            # LOG SUCCESS STATISTICS (ONE LINE REGARDLESS OF PAGE COUNT)
+            logger.info("SUCCESSFULLY PARSED PDF IN %.2f SECONDS", parsing_time)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "EXTRACTED %s DOCUMENT(S), CHARACTERS PER PART: %s",
+                    len(parsed_docs), [len(doc.content) for doc in parsed_docs]
                 )
-                parsed_docs.append(parsed_doc)
             
-            # PRINT SUCCESS STATISTICS
-            print(f"SUCCESSFULLY PARSED PDF IN {parsing_time:.2f} SECONDS")
-            print(f"EXTRACTED {len(parsed_docs)} DOCUMENT(S)")
-            for i, doc in enumerate(parsed_docs):
-                print(f"   - PART {i+1}: {len(doc.content)} CHARACTERS")
+            if cache_path is not None:
+                try:
+                    self._save_cached_parse(cache_path, parsed_docs)
+                except OSError as e:
+                    logger.warning("⚠️  WARNING: Could not cache parse of %s: %s", pdf_file.name, e)
             
             return parsed_docs
             
         except Exception as e:
-            # PRINT ERROR AND RE-RAISE
-            print(f"ERROR PARSING PDF {pdf_file.name}: {str(e)}")
+            # LOG ERROR AND RE-RAISE
+            logger.error("ERROR PARSING PDF %s: %s", pdf_file.name, e)
             raise
     
+    async def _aload_with_retry(self, pdf_path: str):
+        """Upload and parse a PDF, retrying throttled or 5xx failures with jittered exponential backoff"""
+        max_retries = self.config.llamaparse_max_retries
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.parser.aload_data(pdf_path)
+            except Exception as e:
+                if attempt == max_retries or not _is_retryable(e):
+                    raise
+                delay = min(self.config.llamaparse_retry_max_delay, self.config.llamaparse_retry_base_delay * 2 ** attempt)
+                delay += random.uniform(0, 1)
+                logger.warning("⚠️  LLAMAPARSE BUSY (%s), RETRYING IN %.1fs (%s/%s)", e, delay, attempt + 1, max_retries)
+                await asyncio.sleep(delay)
+    
+    async def parse_pdfs_async(self, pdf_paths: List[str]) -> List[Union[List[ParsedDocument], BaseException]]:
+        """
+        Parse several PDFs concurrently, at most config.max_concurrent_parses at a time
+        
+        Args:
+            pdf_paths: Paths to the PDF files
+            
+        Returns:
+            List with one entry per PDF, in input order: its parsed documents, or
+            the exception raised while parsing it
+        """
+        # LLAMAPARSE JOBS ARE NETWORK-BOUND AND TAKE MINUTES, SO OVERLAP THEM
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_parses)
+        
+        async def parse(pdf_path: str) -> List[ParsedDocument]:
+            async with semaphore:
+                return await self.parse_pdf_async(pdf_path)
+        
+        return await asyncio.gather(*[parse(pdf_path) for pdf_path in pdf_paths], return_exceptions=True)
+    
+    def process_batch(self, pdf_paths: List[str]) -> List[Union[List[ParsedDocument], BaseException]]:
+        """
+        🥜 Process several PDFs → Markdown
+        Parses all PDFs concurrently on one event loop; a failed PDF yields its exception
+        """
+        return self._runner.run(self.parse_pdfs_async(pdf_paths))
+    
     def process(self, pdf_path: str) -> List[ParsedDocument]:
         """
         🥜 Process PDF → Markdown
         Main Peanut processing method
         """
-        return asyncio.run(self.parse_pdf_async(pdf_path))
+        return self._runner.run(self.parse_pdf_async(pdf_path))
     
     def process_async(self, pdf_path: str) -> List[ParsedDocument]:
         """
         🥜 Async Process PDF → Markdown
-        Async Peanut processing method
+        Kept for compatibility; same as process (use parse_pdf_async inside a running loop)
         """
-        return asyncio.run(self.parse_pdf_async(pdf_path))
+        return self.process(pdf_path)
+    
+    def close(self):
+        """Close the LlamaParse connection pool and the event loop it runs on"""
+        self._runner.run(self._async_http_client.aclose())
+        self._runner.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def save_parsed_documents(self, parsed_docs: List[ParsedDocument], output_dir: Optional[str] = None, source_pdf_path: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -211,8 +428,9 @@ class Peanut:
             raise ValueError("NO PARSED DOCUMENTS TO SAVE")
         
         # DETERMINE OUTPUT PATH USING CONFIGURATION SYSTEM
-        if source_pdf_path:
-            pdf_filename = Path(source_pdf_path).name
+        source_pdf = Path(source_pdf_path) if source_pdf_path else None
+        if source_pdf is not None:
+            pdf_filename = source_pdf.name
         else:
             pdf_filename = parsed_docs[0].filename.replace('.md', '.pdf')
         
@@ -226,30 +444,43 @@ class Peanut:
         parsed_markdown_folder = document_folder / "01_parsed_markdown"
         parsed_markdown_folder.mkdir(exist_ok=True)
         
-        # COPY ORIGINAL PDF IF PROVIDED
-        if source_pdf_path and Path(source_pdf_path).exists():
-            import shutil
-            pdf_dest = document_folder / Path(source_pdf_path).name
-            shutil.copy2(source_pdf_path, pdf_dest)
-            print(f"📄 COPIED ORIGINAL PDF TO: {pdf_dest}")
+        # DECIDE EVERY DESTINATION UP FRONT SO THE WRITES CAN RUN IN PARALLEL
+        pdf_dest = None
+        if source_pdf is not None and source_pdf.is_file():
+            pdf_dest = document_folder / pdf_filename
         
-        # SAVE PARSED DOCUMENTS
-        saved_files = []
+        # PLAIN STRING JOINS: ONE PATH OBJECT PER FOLDER INSTEAD OF ONE PER PAGE
+        markdown_dir = str(parsed_markdown_folder)
+        file_paths = []
         for i, doc in enumerate(parsed_docs):
             # CREATE FILENAME WITH PAGE NUMBER IF MULTIPLE DOCUMENTS
             if len(parsed_docs) > 1:
                 filename = f"page_{i+1}.md"
             else:
                 filename = doc.filename
+            file_paths.append(os.path.join(markdown_dir, filename))
+        
+        # COPY ORIGINAL PDF AND SAVE PARSED DOCUMENTS CONCURRENTLY (FILE I/O RELEASES THE GIL)
+        workers = min(_SAVE_WORKERS, len(file_paths) + (1 if pdf_dest else 0))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            copy_future = None
+            if pdf_dest:
+                copy_future = pool.submit(_copy_source_pdf, source_pdf_path, pdf_dest, self.config.hardlink_source_pdf)
+            write_futures = [
+                pool.submit(_write_markdown, file_path, doc.content)
+                for file_path, doc in zip(file_paths, parsed_docs)
+            ]
             
-            file_path = parsed_markdown_folder / filename
-            
-            # SAVE MARKDOWN CONTENT
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(doc.content)
+            if copy_future is not None:
+                copy_future.result()
+                logger.info("📄 COPIED ORIGINAL PDF TO: %s", pdf_dest)
             
-            saved_files.append(str(file_path))
-            print(f"💾 SAVED PARSED DOCUMENT: {file_path}")
+            saved_files = []
+            for file_path, future in zip(file_paths, write_futures):
+                future.result()
+                saved_files.append(file_path)
+                logger.debug("💾 SAVED PARSED DOCUMENT: %s", file_path)
+        logger.info("💾 SAVED %s PARSED DOCUMENT(S) TO: %s", len(saved_files), parsed_markdown_folder)
         
         # CREATE METADATA FILE
         metadata = {
@@ -267,15 +498,14 @@ class Peanut:
             },
             "folder_structure": {
                 "main_folder": str(document_folder),
-                "parsed_markdown_folder": str(parsed_markdown_folder)
+                "parsed_markdown_folder": markdown_dir
             }
         }
         
         metadata_file = document_folder / "document_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        write_json(metadata_file, metadata)
         
-        print(f"📋 SAVED METADATA: {metadata_file}")
+        logger.info("📋 SAVED METADATA: %s", metadata_file)
         
         return {
             "main_folder": str(document_folder),
@@ -27,17 +27,29 @@ document_folder/
 
 import os
 import sys
-import json
+import glob
+import queue
+import asyncio
+import logging
 from pathlib import Path
+from dataclasses import replace
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import httpx
 
 # IMPORT OUR PB&J PIPELINE MODULES
 from .peanut import Peanut
-from .butter import Butter
-from .jelly import Jelly
+from .butter import Butter, EnhancedDocument
+from .jelly import Jelly, ProcessedPage
 from .toast import Toast
+from .aio import ApiLimit
 from .config import PipelineConfig, create_config
+from .jsonio import write_json
+
+logger = logging.getLogger(__name__)
 
 class Sandwich:
     """
@@ -72,74 +84,173 @@ class Sandwich:
                 openai_model=openai_model
             )
         
-        # INITIALIZE OUR PB&J COMPONENTS WITH CONFIGURATION
-        # Note: Peanut is created fresh per PDF to avoid LlamaParse job conflicts
-        self.butter = Butter(model=self.config.openai_model, config=self.config)
-        self.jelly = Jelly(model=self.config.openai_model, config=self.config)
-        self.toast = Toast()
+        # PB&J COMPONENTS ARE BUILT ON FIRST USE (SEE THE PROPERTIES BELOW), SO A RUN
+        # THAT NEVER REACHES A STAGE NEVER PAYS FOR ITS CLIENT SETUP
+    
+    @cached_property
+    def _http_client(self) -> httpx.Client:
+        """
+        Synchronous OpenAI connection pool shared by Butter and Jelly
+        
+        Only their blocking calls use it (Batch API uploads, polling and results).
+        Real-time completions go through each stage's own async pool, because the
+        stages run at the same time on separate event loops and an async pool
+        cannot be shared across loops.
+        """
+        return httpx.Client(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+    
+    @cached_property
+    def _api_limit(self) -> ApiLimit:
+        """One OpenAI concurrency and requests-per-minute budget for Butter and Jelly, which run at the same time"""
+        return ApiLimit(self.config.openai_concurrency, self.config.openai_requests_per_minute)
+    
+    @cached_property
+    def peanut(self) -> Peanut:
+        """Stage 1 parser, created on first use (its LlamaParse client and connections serve every PDF)"""
+        return Peanut(config=self.config)
+    
+    @cached_property
+    def butter(self) -> Butter:
+        """Stage 2 enhancer, created on first use"""
+        return Butter(model=self.config.openai_model, config=self.config, http_client=self._http_client, api_limit=self._api_limit)
+    
+    @cached_property
+    def jelly(self) -> Jelly:
+        """Stage 3 cleaner, created on first use"""
+        return Jelly(model=self.config.openai_model, config=self.config, http_client=self._http_client, api_limit=self._api_limit)
+    
+    @cached_property
+    def toast(self) -> Toast:
+        """Stage 4 formatter, created on first use"""
+        return Toast()
+    
+    def _created(self, name: str) -> Optional[Any]:
+        """A lazily built component if it exists yet, without building it"""
+        return self.__dict__.get(name)
+    
+    def close(self):
+        """Close whichever stages were created and the shared synchronous OpenAI connection pool"""
+        for name in ("peanut", "butter", "jelly", "_http_client"):
+            component = self._created(name)
+            if component is not None:
+                component.close()
+    
+    def _unchanged_page_skips(self, name: str) -> int:
+        """Pages a stage has reused so far (0 if the stage was never created)"""
+        component = self._created(name)
+        return component.unchanged_page_skips if component is not None else 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def process(self, pdf_path: str, output_dir: Optional[str] = None, skip_butter: bool = False) -> Dict[str, Any]:
         """
         🥪 Process PDF → Complete JSON pipeline
         Main Sandwich processing method - runs the complete 3-stage PB&J pipeline
         """
-        print("🥪 STARTING COMPLETE PB&J PIPELINE")
-        print("=" * 60)
+        logger.info("🥪 STARTING COMPLETE PB&J PIPELINE")
+        logger.info("=" * 60)
         
         pipeline_start = datetime.now()
         
+        # CONFIG VALUES USED THROUGHOUT THE RUN, READ ONCE
+        cfg = self.config
+        premium = cfg.use_premium_mode
+        model = cfg.openai_model
+        base_out = cfg.output_base_dir
+        
         try:
             # STAGE 1: PEANUT (PARSE) - PDF PROCESSING WITH LLAMAPARSE
-            print("\n🥜 STAGE 1: PEANUT (PARSE) - PDF PROCESSING")
-            print("-" * 40)
+            logger.info("\n🥜 STAGE 1: PEANUT (PARSE) - PDF PROCESSING")
+            logger.info("-" * 40)
             
-            # Create fresh Peanut instance for each PDF to avoid LlamaParse job conflicts
-            peanut = Peanut(config=self.config)
-            parsed_docs = peanut.process(pdf_path)
-            stage1_result = peanut.save_parsed_documents(parsed_docs, output_dir, pdf_path)
+            parsed_docs = self.peanut.process(pdf_path)
+            stage1_result = self.peanut.save_parsed_documents(parsed_docs, output_dir, pdf_path)
             
             document_folder = stage1_result["main_folder"]
-            print(f"✅ PEANUT COMPLETE - Document folder: {document_folder}")
+            
+            # EVERY OUTPUT LOCATION IN THE DOCUMENT FOLDER, BUILT ONCE
+            base = Path(document_folder)
+            final_output = str(base / "final_output.json")
+            summary_file = base / "pipeline_summary.json"
+            subfolders = {
+                "parsed_markdown": str(base / "01_parsed_markdown"),
+                "enhanced_markdown": str(base / "02_enhanced_markdown"),
+                "cleaned_json": str(base / "03_cleaned_json")
+            }
+            logger.info("✅ PEANUT COMPLETE - Document folder: %s", document_folder)
+            
+            # PAGES REUSED BECAUSE THEIR INPUT IS UNCHANGED SINCE AN EARLIER RUN
+            butter_unchanged_before = self._unchanged_page_skips("butter")
+            jelly_unchanged_before = self._unchanged_page_skips("jelly")
             
             enhanced_docs = None
-            if not skip_butter:
-                # STAGE 2: BUTTER (BETTER) - MARKDOWN ENHANCEMENT
-                print("\n🧈 STAGE 2: BUTTER (BETTER) - MARKDOWN ENHANCEMENT")
-                print("-" * 40)
+            if skip_butter:
+                logger.info("\n⏩ SKIPPING BUTTER STAGE -- Using raw markdown from Peanut")
+                
+                # STAGE 3: JELLY (JSON) - DATA CLEANING AND JSON EXTRACTION
+                logger.info("\n🍇 STAGE 3: JELLY (JSON) - DATA EXTRACTION")
+                logger.info("-" * 40)
+                processed_pages = self.jelly._process_document_folder(document_folder, skip_butter=True, toast=self.toast)
+            elif cfg.use_batch_api or cfg.cleaning_group_size > 1:
+                # BATCH RESULTS ARRIVE ALL AT ONCE AND PACKING NEEDS EVERY PAGE UP FRONT,
+                # SO THERE IS NOTHING TO OVERLAP: RUN THE STAGES IN TURN
+                logger.info("\n🧈 STAGE 2: BUTTER (BETTER) - MARKDOWN ENHANCEMENT")
+                logger.info("-" * 40)
                 enhanced_docs = self.butter._process_document_folder(document_folder)
-                print(f"✅ BUTTER COMPLETE - Enhanced {len(enhanced_docs)} documents")
+                logger.info("✅ BUTTER COMPLETE - Enhanced %s documents", len(enhanced_docs))
+                
+                logger.info("\n🍇 STAGE 3: JELLY (JSON) - DATA EXTRACTION")
+                logger.info("-" * 40)
+                processed_pages = self.jelly._process_document_folder(document_folder, toast=self.toast)
             else:
-                print("\n⏩ SKIPPING BUTTER STAGE -- Using raw markdown from Peanut")
-            
-            # STAGE 3: JELLY (JSON) - DATA CLEANING AND JSON EXTRACTION
-            print("\n🍇 STAGE 3: JELLY (JSON) - DATA EXTRACTION")
-            print("-" * 40)
-            processed_pages = self.jelly._process_document_folder(document_folder, skip_butter=skip_butter)
-            print(f"✅ JELLY COMPLETE - Processed {len(processed_pages)} pages")
-            
-            # STAGE 4: TOAST (FORMAT CONVERSION) - CONVERT TO ROW-BASED FORMAT
-            print("\n🍞 STAGE 4: TOAST (FORMAT CONVERSION)")
-            print("-" * 40)
+                # STAGES 2 + 3: BUTTER (BETTER) AND JELLY (JSON), EACH PAGE CLEANED AS SOON AS IT IS ENHANCED
+                logger.info("\n🧈🍇 STAGES 2 + 3: BUTTER (BETTER) → JELLY (JSON), OVERLAPPED PER PAGE")
+                logger.info("-" * 40)
+                # HAND PEANUT'S MARKDOWN OVER IN MEMORY RATHER THAN READING BACK WHAT IT JUST WROTE
+                parsed_pages = {
+                    os.path.basename(saved_file): doc.content
+                    for saved_file, doc in zip(stage1_result["saved_files"], parsed_docs)
+                }
+                enhanced_docs, processed_pages = self._enhance_and_clean(document_folder, parsed_pages)
+                logger.info("✅ BUTTER COMPLETE - Enhanced %s documents", len(enhanced_docs))
+            logger.info("✅ JELLY COMPLETE - Processed %s pages", len(processed_pages))
+            butter_unchanged = self._unchanged_page_skips("butter") - butter_unchanged_before
+            jelly_unchanged = self._unchanged_page_skips("jelly") - jelly_unchanged_before
             
-            # Convert final output to toasted format
-            final_output_path = Path(document_folder) / "final_output.json"
-            if final_output_path.exists():
-                self.toast.convert_file(str(final_output_path))
-                print(f"✅ TOAST COMPLETE - Converted to row-based format")
-            else:
-                print(f"⚠️  TOAST SKIPPED - No final_output.json found")
+            # STAGE 4: TOAST (FORMAT CONVERSION) - APPLIED PAGE BY PAGE AS JELLY WROTE final_output.json,
+            # SO THE COMBINED FILE IS NEVER READ BACK AND REWRITTEN
+            logger.info("\n🍞 STAGE 4: TOAST (FORMAT CONVERSION)")
+            logger.info("-" * 40)
+            logger.info("✅ TOAST COMPLETE - Converted to row-based format")
             
             # PIPELINE COMPLETION SUMMARY
             pipeline_end = datetime.now()
             total_time = (pipeline_end - pipeline_start).total_seconds()
             
-            print("\n🥪 PB&J SANDWICH COMPLETE!")
-            print("=" * 60)
-            print(f"📁 Document Folder: {document_folder}")
-            print(f"⏱️  Total Processing Time: {total_time:.2f} seconds")
-            print(f"📄 Pages Processed: {len(processed_pages)}")
-            print(f"📊 Tables Extracted: {sum(len(page.tables) for page in processed_pages)}")
-            print(f"🔍 Unique Keywords: {len(set().union(*[page.keywords for page in processed_pages])) if processed_pages else 0}")
+            # TOTALS SHARED BY THE LOG AND THE SUMMARY, IN ONE PASS OVER THE PAGES
+            total_tables = 0
+            all_keywords = set()
+            page_titles = []
+            for page in processed_pages:
+                total_tables += len(page.tables)
+                all_keywords.update(page.keywords)
+                page_titles.append(page.title)
+            unique_keywords = len(all_keywords)
+            
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("\n🥪 PB&J SANDWICH COMPLETE!")
+                logger.info("=" * 60)
+                logger.info("📁 Document Folder: %s", document_folder)
+                logger.info("⏱️  Total Processing Time: %.2f seconds", total_time)
+                logger.info("📄 Pages Processed: %s", len(processed_pages))
+                logger.info("📊 Tables Extracted: %s", total_tables)
+                logger.info("🔍 Unique Keywords: %s", unique_keywords)
             
             # CREATE FINAL PIPELINE SUMMARY
             pipeline_summary = {
@@ -148,9 +259,9 @@ class Sandwich:
                     "total_processing_time_seconds": total_time,
                     "pdf_source": pdf_path,
                     "document_folder": document_folder,
-                    "llamaparse_mode": "premium" if self.config.use_premium_mode else "standard",
-                    "openai_model": self.config.openai_model,
-                    "output_base_dir": self.config.output_base_dir,
+                    "llamaparse_mode": "premium" if premium else "standard",
+                    "openai_model": model,
+                    "output_base_dir": base_out,
                     "butter_skipped": skip_butter
                 },
                 "stage_results": {
@@ -160,76 +271,201 @@ class Sandwich:
                     },
                     "stage_2_butter_better": {
                         "documents_enhanced": len(enhanced_docs) if enhanced_docs is not None else 0,
-                        "folder": str(Path(document_folder) / "02_enhanced_markdown")
+                        "pages_unchanged": butter_unchanged,
+                        "folder": subfolders["enhanced_markdown"]
                     },
                     "stage_3_jelly_json": {
                         "pages_processed": len(processed_pages),
-                        "individual_json_folder": str(Path(document_folder) / "03_cleaned_json"),
-                        "final_output": str(Path(document_folder) / "final_output.json")
+                        "pages_unchanged": jelly_unchanged,
+                        "individual_json_folder": subfolders["cleaned_json"],
+                        "final_output": final_output
                     },
                     "stage_4_toast_format": {
                         "format_converted": "column-based to row-based",
-                        "final_output": str(Path(document_folder) / "final_output.json")
+                        "final_output": final_output
                     }
                 },
                 "data_summary": {
                     "total_pages": len(processed_pages),
-                    "total_tables": sum(len(page.tables) for page in processed_pages),
-                    "unique_keywords": len(set().union(*[page.keywords for page in processed_pages])) if processed_pages else 0,
-                    "page_titles": [page.title for page in processed_pages]
+                    "total_tables": total_tables,
+                    "unique_keywords": unique_keywords,
+                    "page_titles": page_titles
                 },
                 "folder_structure": {
                     "main_folder": document_folder,
-                    "original_pdf": str(Path(document_folder) / Path(pdf_path).name),
-                    "metadata": str(Path(document_folder) / "document_metadata.json"),
-                    "final_output": str(Path(document_folder) / "final_output.json"),
-                    "subfolders": {
-                        "parsed_markdown": str(Path(document_folder) / "01_parsed_markdown"),
-                        "enhanced_markdown": str(Path(document_folder) / "02_enhanced_markdown"),
-                        "cleaned_json": str(Path(document_folder) / "03_cleaned_json")
-                    }
+                    "original_pdf": os.path.join(document_folder, os.path.basename(pdf_path)),
+                    "metadata": stage1_result["metadata_file"],
+                    "final_output": final_output,
+                    "subfolders": subfolders
                 }
             }
             
             # SAVE PIPELINE SUMMARY
-            summary_file = Path(document_folder) / "pipeline_summary.json"
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(pipeline_summary, f, indent=2, ensure_ascii=False)
+            write_json(summary_file, pipeline_summary)
             
-            print(f"📋 Pipeline Summary Saved: {summary_file}")
+            logger.info("📋 Pipeline Summary Saved: %s", summary_file)
             
             return pipeline_summary
             
         except Exception as e:
-            print(f"\n❌ PB&J PIPELINE FAILED: {e}")
-            print(f"   Pipeline crashed - check your API keys and document format")
-            print(f"   Error details: {str(e)}")
+            message = str(e)
+            logger.error("\n❌ PB&J PIPELINE FAILED: %s", message)
+            logger.error("   Pipeline crashed - check your API keys and document format")
+            logger.error("   Error details: %s", message)
             # Return partial results instead of crashing
-            return {
-                "pipeline_info": {
-                    "completed_at": datetime.now().isoformat(),
-                    "total_processing_time_seconds": (datetime.now() - pipeline_start).total_seconds(),
-                    "pdf_source": pdf_path,
-                    "document_folder": "PIPELINE_FAILED",
-                    "llamaparse_mode": "premium" if self.config.use_premium_mode else "standard",
-                    "openai_model": self.config.openai_model,
-                    "output_base_dir": self.config.output_base_dir,
-                    "status": "FAILED",
-                    "error": str(e)
-                },
-                "error_info": {
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                    "failed_at_stage": "unknown"
-                }
-            }
+            return _failed_summary(pdf_path, cfg, e, pipeline_start)
 
+    def _enhance_and_clean(self, document_folder: str, parsed_pages: Optional[Dict[str, str]] = None) -> Tuple[List[EnhancedDocument], List[ProcessedPage]]:
+        """
+        Run Butter and Jelly over a document folder at the same time
+        
+        Butter hands each enhanced page (path and text) to a queue once it is saved;
+        Jelly cleans pages from that queue on its own thread and event loop, so cleaning
+        starts with the first enhanced page instead of after the last one, and neither
+        stage reads back markdown the previous one still holds in memory.
+        """
+        enhanced_files: "queue.Queue[Optional[Tuple[Path, Optional[str]]]]" = queue.Queue()
+        doc_folder = Path(document_folder)
+        cleaned_json_folder = doc_folder / "03_cleaned_json"
+        
+        with ThreadPoolExecutor(max_workers=1) as jelly_thread:
+            cleaning = jelly_thread.submit(
+                self.jelly._clean_and_save_stream, enhanced_files, cleaned_json_folder, doc_folder.name
+            )
+            try:
+                enhanced_docs = self.butter._process_document_folder(
+                    document_folder,
+                    on_saved=lambda path, content: enhanced_files.put((path, content)),
+                    parsed_pages=parsed_pages
+                )
+            finally:
+                # END THE STREAM EVEN IF BUTTER FAILED SO THE JELLY THREAD CAN EXIT
+                enhanced_files.put(None)
+            cleaned = cleaning.result()
+        
+        processed_pages = self.jelly._process_streamed_document_folder(document_folder, cleaned, toast=self.toast)
+        return enhanced_docs, processed_pages
+    
     def make(self, pdf_path: str, output_dir: Optional[str] = None, skip_butter: bool = False) -> Dict[str, Any]:
         """
         🥪 Make a complete PB&J sandwich
         User-friendly alias for process() method
         """
         return self.process(pdf_path, output_dir, skip_butter=skip_butter)
+    
+    async def process_async(self, pdf_path: str, output_dir: Optional[str] = None, skip_butter: bool = False) -> Dict[str, Any]:
+        """
+        🥪 Awaitable process() for callers already running an event loop
+        
+        Butter and Jelly drive their own event loops (pages are already sent
+        concurrently, bounded by openai_concurrency), so the pipeline runs in a
+        worker thread and the caller's loop stays free. One call at a time per
+        Sandwich; use process_batch for several PDFs.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.process(pdf_path, output_dir, skip_butter=skip_butter))
+    
+    def process_batch(self, pdf_paths: List[str], output_dir: Optional[str] = None, skip_butter: bool = False, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        🥪 Process several PDFs, each through the whole pipeline in its own worker process
+        
+        Args:
+            pdf_paths: PDF files to process
+            output_dir: Custom output directory (optional)
+            skip_butter: Skip the Butter stage for every PDF
+            workers: Worker processes (defaults to one per CPU, at most one per PDF,
+                and never more than openai_concurrency)
+            
+        Returns:
+            One pipeline summary per PDF, in input order; a PDF that fails gets a
+            FAILED summary instead of stopping the batch
+        """
+        if not pdf_paths:
+            return []
+        workers = min(workers or os.cpu_count() or 1, len(pdf_paths), max(1, self.config.openai_concurrency))
+        
+        # EVERY WORKER HAS ITS OWN LIMITER, SO SPLIT THE OPENAI BUDGET BETWEEN THEM
+        # TO KEEP THE WHOLE BATCH WITHIN THE CONFIGURED CONCURRENCY AND RATE
+        rpm = self.config.openai_requests_per_minute
+        worker_config = replace(
+            self.config,
+            openai_concurrency=max(1, self.config.openai_concurrency // workers),
+            openai_requests_per_minute=rpm / workers if rpm else 0
+        )
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pdf_paths)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_process_one, pdf_path, worker_config, output_dir, skip_butter): index
+                for index, pdf_path in enumerate(pdf_paths)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    # THE WORKER ITSELF DIED (E.G. OUT OF MEMORY); RECORD IT LIKE ANY OTHER FAILURE
+                    results[index] = _failed_summary(pdf_paths[index], self.config, e)
+                logger.info("📦 %s/%s PDFs FINISHED (%s)", done, len(pdf_paths), pdf_paths[index])
+        
+        return results
+
+
+def _failed_summary(pdf_path: str, config: PipelineConfig, error: BaseException, started_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Pipeline summary recorded for a PDF that failed"""
+    now = datetime.now()
+    message = str(error)
+    return {
+        "pipeline_info": {
+            "completed_at": now.isoformat(),
+            "total_processing_time_seconds": (now - started_at).total_seconds() if started_at else 0.0,
+            "pdf_source": pdf_path,
+            "document_folder": "PIPELINE_FAILED",
+            "llamaparse_mode": "premium" if config.use_premium_mode else "standard",
+            "openai_model": config.openai_model,
+            "output_base_dir": config.output_base_dir,
+            "status": "FAILED",
+            "error": message
+        },
+        "error_info": {
+            "error_type": type(error).__name__,
+            "error_message": message,
+            "failed_at_stage": "unknown"
+        }
+    }
+
+
+def _process_one(pdf_path: str, config: PipelineConfig, output_dir: Optional[str], skip_butter: bool) -> Dict[str, Any]:
+    """Run one PDF through a fresh Sandwich (the body of each process_batch worker)"""
+    with Sandwich(config=config, openai_model=config.openai_model) as sandwich:
+        return sandwich.process(pdf_path, output_dir, skip_butter=skip_butter)
+
+
+def _expand_pdf_paths(pdf_path: str) -> List[str]:
+    """
+    Expand a CLI path argument into the list of PDFs to process
+
+    Only globs when the argument still contains wildcard characters (e.g. on
+    Windows, or when quoted), so a literal path is never re-walked on disk.
+    """
+    if not any(ch in pdf_path for ch in "*?["):
+        return [pdf_path]
+    return sorted(glob.glob(pdf_path))
+
+
+def _configure_logging(quiet: bool = False):
+    """
+    Route every pbj.* logger through a single stderr handler
+
+    Library users keep full control of logging; only the CLI installs a handler.
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    pbj_logger = logging.getLogger("pbj")
+    pbj_logger.addHandler(handler)
+    pbj_logger.setLevel(logging.WARNING if quiet else logging.INFO)
+    pbj_logger.propagate = False
 
 
 def main():
@@ -248,12 +484,19 @@ Examples:
   pbj document.pdf --model gpt-4     # Use specific OpenAI model
   pbj document.pdf --premium --model gpt-4-turbo  # Both options
   pbj document.pdf --skip-butter     # Skip Butter stage (Peanut → Jelly)
+  pbj a.pdf b.pdf c.pdf               # Process several PDFs
+  pbj "reports/*.pdf"                # Process every PDF matching a pattern
+  pbj "reports/*.pdf" --workers 4    # ...four PDFs at a time, one process each
+  pbj document.pdf --quiet           # Only show warnings and errors
+  pbj document.pdf --force           # Redo every page, even unchanged ones
+  pbj document.pdf --no-cache        # Send every page to OpenAI, ignoring cached responses
         """
     )
     
     parser.add_argument(
         "pdf_path",
-        help="Path to the PDF file to process"
+        nargs="+",
+        help="Path(s) to the PDF files to process (wildcard patterns are expanded)"
     )
     
     parser.add_argument(
@@ -279,34 +522,84 @@ Examples:
         help="Skip Butter stage and go directly from Peanut to Jelly"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="PDFs to process at once, each in its own process (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-enhance and re-clean pages whose input is unchanged since the last run"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached OpenAI responses for this run (response_cache and enhancement_cache)"
+    )
+    
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only show warnings and errors"
+    )
+    
     args = parser.parse_args()
+    _configure_logging(quiet=args.quiet)
     
-    # Check if PDF file exists
-    if not os.path.exists(args.pdf_path):
-        print(f"❌ Error: PDF file '{args.pdf_path}' not found")
-        sys.exit(1)
+    # EXPAND WILDCARD PATTERNS THE SHELL DID NOT EXPAND
+    pdf_files = []
+    for pdf_path in args.pdf_path:
+        matches = _expand_pdf_paths(pdf_path)
+        if not matches:
+            logger.error("❌ Error: No PDF files match '%s'", pdf_path)
+            sys.exit(1)
+        pdf_files.extend(matches)
+    
+    # Check if PDF files exist
+    for pdf_file in pdf_files:
+        if not os.path.exists(pdf_file):
+            logger.error("❌ Error: PDF file '%s' not found", pdf_file)
+            sys.exit(1)
     
     try:
         # Create and run the pipeline
-        sandwich = Sandwich(
-            use_premium=args.premium,
-            openai_model=args.model
-        )
+        failed = 0
+        # FLAGS ONLY OVERRIDE THE CONFIG WHEN GIVEN, SO CONFIG FILE/ENVIRONMENT VALUES SURVIVE OTHERWISE
+        overrides = {}
+        if args.force:
+            overrides["force_reprocess"] = True
+        if args.no_cache:
+            overrides.update(response_cache=False, enhancement_cache=False)
+        config = create_config(use_premium_mode=args.premium, openai_model=args.model, **overrides)
+        with Sandwich(config=config, use_premium=args.premium, openai_model=args.model) as sandwich:
+            if args.workers > 1 and len(pdf_files) > 1:
+                results = sandwich.process_batch(pdf_files, args.output_dir, skip_butter=args.skip_butter, workers=args.workers)
+            else:
+                results = (sandwich.process(pdf_file, args.output_dir, skip_butter=args.skip_butter) for pdf_file in pdf_files)
+            
+            for result in results:
+                if result.get("pipeline_info", {}).get("status") == "FAILED":
+                    logger.error("\n❌ Pipeline failed: %s", result.get('error_info', {}).get('error_message', 'Unknown error'))
+                    failed += 1
+                else:
+                    logger.info("\n✅ Pipeline completed successfully!")
+                    logger.info("📁 Output saved to: %s", result['pipeline_info']['document_folder'])
         
-        result = sandwich.process(args.pdf_path, args.output_dir, skip_butter=args.skip_butter)
+        if len(pdf_files) > 1:
+            logger.info("\n📦 BATCH COMPLETE: %s/%s PDFs succeeded", len(pdf_files) - failed, len(pdf_files))
         
-        if result.get("pipeline_info", {}).get("status") == "FAILED":
-            print(f"\n❌ Pipeline failed: {result.get('error_info', {}).get('error_message', 'Unknown error')}")
+        if failed:
             sys.exit(1)
-        else:
-            print(f"\n✅ Pipeline completed successfully!")
-            print(f"📁 Output saved to: {result['pipeline_info']['document_folder']}")
             
     except KeyboardInterrupt:
-        print("\n\n⏹️  Pipeline interrupted by user")
+        logger.warning("\n\n⏹️  Pipeline interrupted by user")
         sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
+        logger.error("\n❌ Unexpected error: %s", e)
         sys.exit(1)
 
 
@@ -25,12 +25,17 @@ OUTPUT FORMAT (toasted):
 }
 """
 
-import json
+import os
 import sys
+import logging
 from pathlib import Path
 from typing import Dict, Any, List, Union, Optional
 from datetime import datetime
 
+from .jsonio import read_json_mapped, write_json
+
+logger = logging.getLogger(__name__)
+
 
 class Toast:
     """
@@ -42,7 +47,7 @@ class Toast:
     
     def __init__(self):
         """Initialize the toaster"""
-        print("🍞 TOAST INITIALIZED - Ready to convert JSON formats")
+        logger.debug("🍞 TOAST INITIALIZED - Ready to convert JSON formats")
     
     def convert_table(self, table_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -65,20 +70,24 @@ class Toast:
         rows = table_data.get("rows", [])
         
         # Convert rows from arrays to dictionaries
-        converted_rows = []
-        for row in rows:
-            if isinstance(row, list) and len(row) == len(columns):
-                # Create dictionary mapping column names to values
-                row_dict = dict(zip(columns, row))
-                converted_rows.append(row_dict)
-            else:
-                # If row format is unexpected, keep as is
-                converted_rows.append(row)
+        column_count = len(columns)
+        if all(isinstance(row, list) and len(row) == column_count for row in rows):
+            # UNIFORM TABLE (THE USUAL CASE): BUILD EVERY ROW IN C
+            columns = tuple(columns)
+            converted_rows = list(map(dict, (zip(columns, row) for row in rows)))
+        else:
+            converted_rows = []
+            for row in rows:
+                if isinstance(row, list) and len(row) == column_count:
+                    # Create dictionary mapping column names to values
+                    converted_rows.append(dict(zip(columns, row)))
+                else:
+                    # If row format is unexpected, keep as is
+                    converted_rows.append(row)
         
         # Create new table structure without columns array
-        converted_table = table_data.copy()
+        converted_table = {key: value for key, value in table_data.items() if key != "columns"}
         converted_table["rows"] = converted_rows
-        converted_table.pop("columns", None)  # Remove columns array
         
         return converted_table
     
@@ -107,6 +116,15 @@ class Toast:
         
         return converted_page
     
+    def toast_info(self) -> Dict[str, Any]:
+        """Conversion metadata recorded in toasted output"""
+        return {
+            "converted_at": datetime.now().isoformat(),
+            "converter": "PB&J Toast",
+            "format": "row-based dictionaries",
+            "original_format": "column-based arrays"
+        }
+    
     def convert_pbj_output(self, pbj_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Convert entire PB&J pipeline output
@@ -117,17 +135,12 @@ class Toast:
         Returns:
             Dict: Converted data with row-based table format
         """
-        print("🍞 CONVERTING PB&J OUTPUT TO TOASTED FORMAT")
+        logger.info("🍞 CONVERTING PB&J OUTPUT TO TOASTED FORMAT")
         
         converted_data = pbj_data.copy()
         
         # Add conversion metadata
-        converted_data["toast_info"] = {
-            "converted_at": datetime.now().isoformat(),
-            "converter": "PB&J Toast",
-            "format": "row-based dictionaries",
-            "original_format": "column-based arrays"
-        }
+        converted_data["toast_info"] = self.toast_info()
         
         # Convert pages if they exist
         if "pages" in converted_data and isinstance(converted_data["pages"], list):
@@ -137,7 +150,7 @@ class Toast:
                 converted_pages.append(converted_page)
             converted_data["pages"] = converted_pages
             
-            print(f"✅ CONVERTED {len(converted_pages)} PAGES")
+            logger.info("✅ CONVERTED %s PAGES", len(converted_pages))
         
         # Convert any standalone tables
         if "tables" in converted_data and isinstance(converted_data["tables"], list):
@@ -147,9 +160,9 @@ class Toast:
                 converted_tables.append(converted_table)
             converted_data["tables"] = converted_tables
             
-            print(f"✅ CONVERTED {len(converted_tables)} STANDALONE TABLES")
+            logger.info("✅ CONVERTED %s STANDALONE TABLES", len(converted_tables))
         
-        print("🍞 TOASTING COMPLETE!")
+        logger.info("🍞 TOASTING COMPLETE!")
         return converted_data
     
     def convert_file(self, input_file: str, output_file: Optional[str] = None) -> str:
@@ -169,9 +182,8 @@ class Toast:
             raise FileNotFoundError(f"Input file not found: {input_file}")
         
         # Load input data
-        print(f"🍞 LOADING: {input_path}")
-        with open(input_path, 'r', encoding='utf-8') as f:
-            pbj_data = json.load(f)
+        logger.info("🍞 LOADING: %s", input_path)
+        pbj_data = read_json_mapped(input_path)
         
         # Convert data
         toasted_data = self.convert_pbj_output(pbj_data)
@@ -182,12 +194,13 @@ class Toast:
         else:
             output_path = Path(output_file)
         
-        # Save converted data
-        print(f"🍞 SAVING: {output_path}")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(toasted_data, f, indent=2, ensure_ascii=False)
+        # Save converted data (temp file, then rename, so readers never see half a file)
+        logger.info("🍞 SAVING: %s", output_path)
+        temp_path = output_path.with_suffix(f".{os.getpid()}.tmp")
+        write_json(temp_path, toasted_data)
+        os.replace(temp_path, output_path)
         
-        print(f"✅ TOASTED DATA SAVED: {output_path}")
+        logger.info("✅ TOASTED DATA SAVED: %s", output_path)
         return str(output_path)
     
     def convert_document_folder(self, document_folder: str) -> str:
@@ -0,0 +1,57 @@
+"""
+🔢 Token Counting - Model-Aware Token Budgets
+=============================================
+
+Counts tokens with tiktoken when it is installed (pip install "pbj-pipeline[fast]")
+and falls back to the 4-characters-per-token approximation otherwise.
+"""
+
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import tiktoken
+except ImportError:  # OPTIONAL ACCURACY/SPEEDUP
+    tiktoken = None
+
+# CONTEXT WINDOW PER MODEL FAMILY (LONGEST MATCHING PREFIX WINS)
+CONTEXT_LIMITS = {
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-3.5-turbo": 16385,
+}
+
+DEFAULT_CONTEXT_LIMIT = 8192
+
+
+def context_limit(model: str) -> int:
+    """Context window size for a model name"""
+    best_prefix = ""
+    for prefix in CONTEXT_LIMITS:
+        if model.startswith(prefix) and len(prefix) > len(best_prefix):
+            best_prefix = prefix
+    return CONTEXT_LIMITS.get(best_prefix, DEFAULT_CONTEXT_LIMIT)
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str) -> Optional[Any]:
+    """tiktoken encoding for a model, loaded once per model name"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Number of tokens the model will see for this text"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))